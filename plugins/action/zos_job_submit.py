@@ -8,12 +8,17 @@ __metaclass__ = type
 from ansible.plugins.action import ActionBase
 from ansible.errors import AnsibleError, AnsibleFileNotFound
 from ansible.module_utils._text import to_bytes, to_text
+from ansible_collections.ibm.ibm_zos_core.plugins.module_utils.encode import (
+    decode_jcl,
+)
 import os
 
 
 class ActionModule(ActionBase):
     def run(self, tmp=None, task_vars=None):
-        """ handler for file transfer operations """
+        """ handler for local JCL submission.
+        The local JCL is read on the controller and passed to the module as
+        content, so it is submitted in a single remote module execution. """
         if task_vars is None:
             task_vars = dict()
 
@@ -23,19 +28,14 @@ class ActionModule(ActionBase):
             return result
 
         module_args = self._task.args.copy()
-        if module_args["location"] == "LOCAL":
+        if module_args.get("location") == "LOCAL" and "content" not in module_args:
 
-            source = self._task.args.get("src", None)
-
-            # Get a temporary file on the managed node
-            dest_path = self._execute_module(
-                module_name="tempfile", module_args={}, task_vars=task_vars,
-            ).get("path")
+            source = module_args.pop("src", None)
 
             result["failed"] = True
-            if source is None or dest_path is None:
-                result["msg"] = "src and dest are required"
-            elif source is not None and source.endswith("/"):
+            if source is None:
+                result["msg"] = "src is required"
+            elif source.endswith("/"):
                 result["msg"] = "src must be a file"
             else:
                 del result["failed"]
@@ -55,78 +55,42 @@ class ActionModule(ActionBase):
                 result["msg"] = to_text(u"NOT SUPPORTING THE DIRECTORY.")
                 return result
 
-            changed = False
-            module_return = dict(changed=False)
-
-            if tmp is None or "-tmp-" not in tmp:
-                tmp = self._make_tmp_path()
-
             try:
                 source_full = self._loader.get_real_file(source)
-                source_rel = os.path.basename(source)
             except AnsibleFileNotFound as e:
                 result["failed"] = True
-                result["msg"] = "could not find src=%s, %s" % (source_full, e)
-                self._remove_tmp_path(tmp)
+                result["msg"] = "could not find src=%s, %s" % (source, e)
                 return result
 
-            # if self._connection._shell.path_has_trailing_slash(dest):
-            #     dest_file = self._connection._shell.join_path(dest, source_rel)
-            # else:
-            dest_file = self._connection._shell.join_path(dest_path)
-
-            dest_status = self._execute_remote_stat(
-                dest_file, all_vars=task_vars, follow=False
-            )
-
-            if dest_status["exists"] and dest_status["isdir"]:
-                self._remove_tmp_path(tmp)
+            try:
+                source_bytes = to_bytes(source_full, errors="surrogate_or_strict")
+                with open(source_bytes, "rb") as jcl_file:
+                    data = jcl_file.read()
+            except (IOError, OSError) as e:
                 result["failed"] = True
-                result["msg"] = "can not use content with a dir as dest"
+                result["msg"] = "could not read src=%s, %s" % (source, e)
                 return result
+            finally:
+                self._loader.cleanup_tmp_file(source_full)
 
-            tmp_src = self._connection._shell.join_path(tmp, "source")
-
-            remote_path = None
-            remote_path = self._transfer_file(source_full, tmp_src)
-
-            if remote_path:
-                self._fixup_perms2((tmp, remote_path))
-
-            result = {}
-            copy_module_args = {}
-            module_args = self._task.args.copy()
-            module_args["temp_file"] = dest_path
-
-            copy_module_args.update(
-                dict(
-                    src=tmp_src,
-                    dest=dest_path,
-                    mode="0600",
-                    _original_basename=source_rel,
-                )
-            )
-            result.update(
-                self._execute_module(
-                    module_name="copy",
-                    module_args=copy_module_args,
-                    task_vars=task_vars,
-                )
-            )
-            result.update(
-                self._execute_module(
-                    module_name="zos_job_submit",
-                    module_args=module_args,
-                    task_vars=task_vars,
+            try:
+                module_args["content"] = decode_jcl(
+                    data, module_args.get("encoding", "UTF-8")
                 )
-            )
-        else:
-            result.update(
-                self._execute_module(
-                    module_name="zos_job_submit",
-                    module_args=module_args,
-                    task_vars=task_vars,
+            except ValueError as e:
+                result["failed"] = True
+                result["msg"] = (
+                    "The Local file encoding conversion failed. Please check the source file. "
+                    + to_text(e)
                 )
+                return result
+
+        result.update(
+            self._execute_module(
+                module_name="zos_job_submit",
+                module_args=module_args,
+                task_vars=task_vars,
             )
+        )
 
         return result
@@ -0,0 +1,102 @@
+# Copyright (c) IBM Corporation 2020
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+IBM1047_BASE_CODEC = "cp037"
+
+"""JCL encodings which are converted to IBM-1047, and their codecs"""
+JCL_TEXT_ENCODINGS = {
+    "UTF-8": "utf-8",
+    "ASCII": "iso8859-1",
+    "ISO-8859-1": "iso8859-1",
+}
+
+"""JCL encodings which are submitted unchanged"""
+JCL_EBCDIC_ENCODINGS = ("EBCDIC", "IBM-037", "IBM-1047")
+
+# Python has no IBM-1047 codec. cp037 differs from it in where it places
+# [ ] ^ and their partners Ý ¨ ¬, and in mapping line feed to 0x25 where
+# z/OS UNIX ends lines with NL (0x15). Every difference is a swap of two
+# code points, so the same table converts in both directions.
+_CP037_IBM1047_SWAP_PAIRS = ((0x5F, 0xB0), (0xAD, 0xBA), (0xBB, 0xBD), (0x15, 0x25))
+
+
+def _swap_table(pairs):
+    """Build a translation table which swaps pairs of byte values. The table
+    is built from a bytearray since bytes.maketrans does not exist on Python 2.
+
+    Arguments:
+        pairs {tuple} -- The pairs of byte values to swap.
+
+    Returns:
+        bytes -- The 256 byte translation table.
+    """
+    table = bytearray(range(256))
+    for first, second in pairs:
+        table[first], table[second] = second, first
+    return bytes(table)
+
+
+_CP037_IBM1047_SWAPS = _swap_table(_CP037_IBM1047_SWAP_PAIRS)
+
+
+def to_ibm1047(text, errors="strict"):
+    """Encode text in IBM-1047, the EBCDIC code page used by z/OS UNIX.
+
+    Arguments:
+        text {str} -- The text to encode.
+
+    Keyword Arguments:
+        errors {str} -- The codec error handling scheme. (default: {"strict"})
+
+    Raises:
+        UnicodeEncodeError: When the text contains a character outside of
+        Latin-1 and errors is "strict".
+
+    Returns:
+        bytes -- The encoded text.
+    """
+    return text.encode(IBM1047_BASE_CODEC, errors).translate(_CP037_IBM1047_SWAPS)
+
+
+def from_ibm1047(data, errors="strict"):
+    """Decode IBM-1047 encoded bytes.
+
+    Arguments:
+        data {bytes} -- The bytes to decode.
+
+    Keyword Arguments:
+        errors {str} -- The codec error handling scheme. (default: {"strict"})
+
+    Returns:
+        str -- The decoded text.
+    """
+    return data.translate(_CP037_IBM1047_SWAPS).decode(IBM1047_BASE_CODEC, errors)
+
+
+def decode_jcl(data, encoding):
+    """Decode JCL in one of the encodings supported for local JCL. EBCDIC JCL
+    is decoded so that to_ibm1047 gives back the original bytes.
+
+    Arguments:
+        data {bytes} -- The JCL.
+        encoding {str} -- The encoding of the JCL, ISO-8859-1 when None.
+
+    Raises:
+        ValueError: When the encoding is not supported or the JCL is not valid
+        in the encoding.
+
+    Returns:
+        str -- The decoded JCL.
+    """
+    if encoding in JCL_EBCDIC_ENCODINGS:
+        return from_ibm1047(data)
+    if encoding is None:
+        encoding = "ISO-8859-1"
+    codec = JCL_TEXT_ENCODINGS.get(encoding)
+    if codec is None:
+        raise ValueError("Unsupported encoding " + encoding)
+    return data.decode(codec)
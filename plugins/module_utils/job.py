@@ -5,105 +5,93 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
-from tempfile import NamedTemporaryFile
-from os import chmod, path, remove
-from stat import S_IEXEC, S_IREAD, S_IWRITE
+from tempfile import TemporaryFile
+from subprocess import Popen, PIPE
+from collections import OrderedDict, deque, namedtuple
+from random import random
+from time import monotonic, sleep
 import json
 import re
 from ansible_collections.ibm.ibm_zos_core.plugins.module_utils.better_arg_parser import (
     BetterArgParser,
 )
+from ansible_collections.ibm.ibm_zos_core.plugins.module_utils.script import (
+    cached_script,
+)
 
+# Number of spool lines written in each lines record of the job output script
+JOB_OUTPUT_BATCH_SIZE = 100
 
-def job_output(module, job_id=None, owner=None, job_name=None, dd_name=None):
-    """Get the output from a z/OS job based on various search criteria.
+JOB_STATUS_ACTIVE = "ACTIVE"
+JOB_STATUS_CC = "CC"
+JOB_STATUS_ABEND = "ABEND"
+JOB_STATUS_JCLERR = "JCLERR"
+JOB_STATUS_CANCELED = "CANCELED"
+JOB_STATUS_UNKNOWN = "UNKNOWN"
 
-    Arguments:
-        module {AnsibleModule} -- The AnsibleModule object from the running module.
+# Number of distinct status strings remembered by classify_job_status()
+JOB_STATUS_CACHE_SIZE = 1024
 
-    Keyword Arguments:
-        job_id {str} -- The job ID to search for (default: {''})
-        owner {str} -- The owner of the job (default: {''})
-        job_name {str} -- The job name search for (default: {''})
-        dd_name {str} -- The data definition to retrieve (default: {''})
+# Seconds between the first polls of poll_with_backoff(), growing by
+# POLL_BACKOFF_FACTOR after each poll up to POLL_MAX_INTERVAL
+POLL_INITIAL_INTERVAL = 0.05
+POLL_MAX_INTERVAL = 5
+POLL_BACKOFF_FACTOR = 2
+# Fraction by which each interval is randomly shortened
+POLL_JITTER = 0.25
 
-    Raises:
-        RuntimeError: When job output cannot be retrieved successfully but job exists.
-        RuntimeError: When no job output is found
-
-    Returns:
-        dict[str, list[dict]] -- The output information for a given job.
-    """
-
-    arg_defs = dict(
-        job_id=dict(arg_type="qualifier_pattern"),
-        owner=dict(arg_type="qualifier_pattern"),
-        job_name=dict(arg_type="qualifier_pattern"),
-        dd_name=dict(arg_type=_ddname_pattern),
-    )
-
-    parser = BetterArgParser(arg_defs)
-    parsed_args = parser.parse_args(
-        {"job_id": job_id, "owner": owner, "job_name": job_name, "dd_name": dd_name}
-    )
-
-    job_id = parsed_args.get("job_id") or ""
-    job_name = parsed_args.get("job_name") or ""
-    owner = parsed_args.get("owner") or ""
-    ddname = parsed_args.get("ddname") or ""
-
-    job_detail_json = {}
-    rc, out, err = _get_job_json_str(module, job_id, owner, job_name, dd_name)
-    if rc != 0:
-        raise RuntimeError(
-            "Failed to retrieve job output. RC: {0} Error: {1}".format(
-                str(rc), str(err)
-            )
-        )
-    if not out:
-        raise RuntimeError("Failed to retrieve job output. No job output found.")
-    job_detail_json = json.loads(out, strict=False)
-    for job in job_detail_json.get("jobs"):
-        job["ret_code"] = {} if job.get("ret_code") is None else job.get("ret_code")
-        job["ret_code"]["code"] = _get_return_code_num(
-            job.get("ret_code", {}).get("msg", "")
-        )
-        job["ret_code"]["msg_code"] = _get_return_code_str(
-            job.get("ret_code", {}).get("msg", "")
-        )
-        job["ret_code"]["msg_txt"] = ""
-    return job_detail_json
+JobStatus = namedtuple("JobStatus", ["status", "code", "return_code"])
 
+# A single pattern for every status, the name of the alternative which
+# matched selects the handler in _JOB_STATUS_HANDLERS.
+_JOB_STATUS_REGEX = re.compile(
+    r"\s*(?:"
+    r"(?P<cc>CC\s*(?P<cc_code>[0-9]+))"
+    r"|(?P<abend>ABEND\s*\(?\s*(?P<abend_code>[SU][0-9A-F]+)?)"
+    r"|(?P<jclerr>JCL\s*ERR)"
+    r"|(?P<canceled>CANCEL+ED)"
+    r"|(?P<active>AC(?:TIVE)?\b)"
+    r")",
+    re.IGNORECASE,
+)
 
-def _get_job_json_str(module, job_id="", owner="", job_name="", dd_name=""):
-    """Generate JSON output string containing Job info from SDSF.
-    Writes a temporary REXX script to the USS filesystem to gather output.
+_JOB_STATUS_HANDLERS = {
+    "cc": lambda match: JobStatus(
+        JOB_STATUS_CC, match.group("cc_code"), int(match.group("cc_code"))
+    ),
+    "abend": lambda match: JobStatus(
+        JOB_STATUS_ABEND,
+        match.group("abend_code") and match.group("abend_code").upper(),
+        None,
+    ),
+    "jclerr": lambda match: JobStatus(JOB_STATUS_JCLERR, None, None),
+    "canceled": lambda match: JobStatus(JOB_STATUS_CANCELED, None, None),
+    "active": lambda match: JobStatus(JOB_STATUS_ACTIVE, None, None),
+}
 
-    Arguments:
-        module {AnsibleModule} -- The AnsibleModule object from the running module.
+_job_status_cache = {}
 
-    Keyword Arguments:
-        job_id {str} -- The job ID to search for (default: {''})
-        owner {str} -- The owner of the job (default: {''})
-        job_name {str} -- The job name search for (default: {''})
-        dd_name {str} -- The data definition to retrieve (default: {''})
-
-    Returns:
-        tuple[int, str, str] -- RC, STDOUT, and STDERR from the REXX script.
-    """
-    get_job_detail_json_rexx = """/* REXX */
+# Writes job output as one JSON record per line. JOBID may be a comma
+# separated list of job IDs, all of which are retrieved in one SDSF session. Each job record is followed
+# by a record for each of its ddnames, each followed by records holding up
+# to batch lines of its spool, so records can be processed as they arrive.
+# Only the lines in the window selected by start, max and tail are browsed,
+# and no spool is browsed at all when content is N. CURSORS lists the next
+# line to read for ddnames already read by an earlier call, as a comma
+# separated list of jobid/dsid/line, and overrides the window for those ddnames.
+# When DDNAMES is N only the job records are written.
+JOB_OUTPUT_REXX = """/* REXX */
 arg options
 parse var options param
 upper param
 parse var param 'JOBID=' jobid ' OWNER=' owner,
-' JOBNAME=' jobname ' DDNAME=' ddname
+' JOBNAME=' jobname ' DDNAME=' ddname ' BATCH=' batch,
+' START=' start ' MAX=' maxlines ' TAIL=' tail ' CONTENT=' content,
+' CURSORS=' cursors ' DDNAMES=' listdd
 
 rc=isfcalls('ON')
 
-jobid = strip(jobid,'L')
-if (jobid <> '') then do
-ISFFILTER='JobID EQ '||jobid
-end
+jobids = strip(jobid)
 owner = strip(owner,'L')
 if (owner <> '') then do
 ISFOWNER=owner
@@ -116,82 +104,142 @@ ddname = strip(ddname,'L')
 if (ddname == '?') then do
 ddname = ''
 end
+batch = strip(batch)
+if datatype(batch,'W') <> 1 then do
+batch = 100
+end
+start = strip(start)
+if datatype(start,'W') <> 1 then do
+start = 1
+end
+maxlines = strip(maxlines)
+if datatype(maxlines,'W') <> 1 then do
+maxlines = 0
+end
+tail = strip(tail)
+if datatype(tail,'W') <> 1 then do
+tail = 0
+end
+content = strip(content)
+listdd = strip(listdd)
+cursors = strip(cursors)
+cursor. = 0
+do while cursors <> ''
+    parse var cursors cjobid '/' cdsid '/' cline ',' cursors
+    if datatype(cline,'W') == 1 then do
+    call value 'CURSOR.'||strip(cjobid)||'_'||strip(cdsid), cline
+    end
+end
+
+do until jobids == ''
+    parse var jobids jobid ',' jobids
+    call writeJobs strip(jobid)
+end
+
+rc=isfcalls('OFF')
+
+return 0
 
+/* Write the jobs matching a single job ID, or all jobs when it is empty */
+writeJobs:
+parse arg jobid
+drop ISFFILTER
+if (jobid <> '') then do
+ISFFILTER='JobID EQ '||jobid
+end
 Address SDSF "ISFEXEC ST (ALTERNATE DELAYED)"
 if rc<>0 then do
-Say '{"jobs":[]}'
-Exit 0
-end
-if isfrows == 0 then do
-Say '{"jobs":[]}'
+return
 end
-else do
-Say '{"jobs":['
 do ix=1 to isfrows
-    linecount = 0
-    if ix<>1 then do
-    Say ','
+    record = '{"type":"job"'
+    record = record||',"job_id":"'||value('JOBID'||"."||ix)||'"'
+    record = record||',"job_name":"'||value('JNAME'||"."||ix)||'"'
+    record = record||',"subsystem":"'||value('ESYSID'||"."||ix)||'"'
+    record = record||',"owner":"'||value('OWNERID'||"."||ix)||'"'
+    record = record||',"ret_code":{"msg":"'||value('RETCODE'||"."||ix)||'"}'
+    record = record||',"class":"'||value('JCLASS'||"."||ix)||'"'
+    record = record||',"content_type":"'||value('JTYPE'||"."||ix)||'"'
+    Say record||'}'
+    if listdd == 'N' then do
+    iterate
     end
-    Say '{'
-    Say '"'||'job_id'||'":"'||value('JOBID'||"."||ix)||'",'
-    Say '"'||'job_name'||'":"'||value('JNAME'||"."||ix)||'",'
-    Say '"'||'subsystem'||'":"'||value('ESYSID'||"."||ix)||'",'
-    Say '"'||'owner'||'":"'||value('OWNERID'||"."||ix)||'",'
-    Say '"'||'ret_code'||'":{"'||'msg'||'":"'||value('RETCODE'||"."||ix)||'"},'
-    Say '"'||'class'||'":"'||value('JCLASS'||"."||ix)||'",'
-    Say '"'||'content_type'||'":"'||value('JTYPE'||"."||ix)||'",'
     Address SDSF "ISFACT ST TOKEN('"TOKEN.ix"') PARM(NP ?)",
 "("prefix JDS_
-    lrc=rc
-    if lrc<>0 | JDS_DDNAME.0 == 0 then do
-    Say '"ddnames":[]'
+    if rc<>0 then do
+    iterate
     end
-    else do
-    Say '"ddnames":['
     do jx=1 to JDS_DDNAME.0
-        if jx<>1 & ddname == '' then do
-        Say ','
+        if ddname <> '' & ddname <> value('JDS_DDNAME'||"."||jx) then do
+        iterate
         end
-        if ddname == '' | ddname == value('JDS_DDNAME'||"."||jx) then do
-        Say '{'
-        Say '"'||'ddname'||'":"'||value('JDS_DDNAME'||"."||jx)||'",'
-        Say '"'||'record_count'||'":"'||value('JDS_RECCNT'||"."||jx)||'",'
-        Say '"'||'id'||'":"'||value('JDS_DSID'||"."||jx)||'",'
-        Say '"'||'stepname'||'":"'||value('JDS_STEPN'||"."||jx)||'",'
-        Say '"'||'procstep'||'":"'||value('JDS_PROCS'||"."||jx)||'",'
-        Say '"'||'byte_count'||'":"'||value('JDS_BYTECNT'||"."||jx)||'",'
-        Say '"'||'content'||'":['
-        Address SDSF "ISFBROWSE ST TOKEN('"token.ix"')"
-        untilline = linecount + JDS_RECCNT.jx
-        startingcount = linecount + 1
-        do kx=linecount+1 to  untilline
-            if kx<>startingcount then do
-            Say ','
-            end
-            linecount = linecount + 1
-            Say '"'||escapeNewLine(escapeDoubleQuote(isfline.kx))||'"'
+        record = '{"type":"dd"'
+        record = record||',"ddname":"'||value('JDS_DDNAME'||"."||jx)||'"'
+        record = record||',"record_count":"'||value('JDS_RECCNT'||"."||jx)||'"'
+        record = record||',"id":"'||value('JDS_DSID'||"."||jx)||'"'
+        record = record||',"stepname":"'||value('JDS_STEPN'||"."||jx)||'"'
+        record = record||',"procstep":"'||value('JDS_PROCS'||"."||jx)||'"'
+        record = record||',"byte_count":"'||value('JDS_BYTECNT'||"."||jx)||'"'
+        Say record||'}'
+        if content <> 'N' then do
+        call writeLines value('JDS_TOKEN'||"."||jx),,
+value('JDS_RECCNT'||"."||jx),,
+value('CURSOR.'||value('JOBID'||"."||ix)||'_'||value('JDS_DSID'||"."||jx))
         end
-        Say ']'
-        Say '}'
+    end
+end
+return
+
+/* Browse the selected lines of a spool data set, batch lines at a time,
+   followed by the number of the next line to read */
+writeLines:
+parse arg ddtoken, reccnt, resume
+isfstartline = start
+if tail > 0 & datatype(reccnt,'W') == 1 then do
+isfstartline = max(1, reccnt - tail + 1)
+end
+if resume > 0 then do
+isfstartline = resume
+end
+remaining = maxlines
+do forever
+    isflinelim = batch
+    if maxlines > 0 then do
+        if remaining <= 0 then do
+        leave
         end
-        else do
-            linecount = linecount + JDS_RECCNT.jx
+        isflinelim = min(batch, remaining)
+    end
+    Address SDSF "ISFBROWSE ST TOKEN('"ddtoken"')"
+    if rc<>0 | isfline.0 == 0 then do
+    leave
+    end
+    record = '{"type":"lines","start":'||isfstartline||',"lines":['
+    do kx=1 to isfline.0
+        if kx<>1 then do
+        record = record||','
         end
+        record = record||'"'||escapeNewLine(escapeJson(isfline.kx))||'"'
     end
-    Say ']'
+    Say record||']}'
+    remaining = remaining - isfline.0
+    isfstartline = isfstartline + isfline.0
+    if isfline.0 < isflinelim then do
+    leave
     end
-    Say '}'
-end
-Say ']}'
 end
+Say '{"type":"end","next_line":'||isfstartline||'}'
+return
 
-rc=isfcalls('OFF')
-
-return 0
-
-escapeDoubleQuote: Procedure
+escapeJson: Procedure
 Parse Arg string
 out=''
+Do While Pos('\\',string)<>0
+Parse Var string prefix '\\' string
+out=out||prefix||'\\\\'
+End
+string=out||string
+out=''
 Do While Pos('"',string)<>0
 Parse Var string prefix '"' string
 out=out||prefix||'\\"'
@@ -202,26 +250,669 @@ escapeNewLine: Procedure
 Parse Arg string
 Return translate(string, '4040'x, '1525'x)
 """
+
+
+def job_output(
+    module,
+    job_id=None,
+    owner=None,
+    job_name=None,
+    dd_name=None,
+    start_line=None,
+    max_lines=None,
+    tail_lines=None,
+    content=True,
+    search=None,
+    search_literal=False,
+    search_before=None,
+    search_after=None,
+    cursors=None,
+):
+    """Get the output from a z/OS job based on various search criteria.
+
+    Arguments:
+        module {AnsibleModule} -- The AnsibleModule object from the running module.
+
+    Keyword Arguments:
+        job_id {str} -- The job ID to search for (default: {''})
+        owner {str} -- The owner of the job (default: {''})
+        job_name {str} -- The job name search for (default: {''})
+        dd_name {str} -- The data definition to retrieve (default: {''})
+        start_line {int} -- The first line of each ddname to retrieve, starting at 1. (default: {1})
+        max_lines {int} -- The maximum number of lines to retrieve for each ddname,
+        0 for no limit. (default: {0})
+        tail_lines {int} -- Retrieve only the last tail_lines lines of each ddname,
+        cannot be used with start_line. (default: {None})
+        content {bool} -- Whether to retrieve the spool content of each ddname. When False,
+        only the ddname information is retrieved and spool is never browsed. (default: {True})
+        search {str} -- Only keep the lines matching this regular expression,
+        along with their line numbers. (default: {None})
+        search_literal {bool} -- Whether search is a literal string instead of a
+        regular expression. (default: {False})
+        search_before {int} -- Number of lines to keep before each matching line. (default: {0})
+        search_after {int} -- Number of lines to keep after each matching line. (default: {0})
+        cursors {list[str]} -- Cursors returned for ddnames by an earlier call. Only the
+        lines written to those ddnames since that call are retrieved. (default: {None})
+
+    Raises:
+        ValueError: When an argument is invalid.
+        RuntimeError: When job output cannot be retrieved successfully.
+
+    Returns:
+        dict[str, list[dict]] -- The output information for a given job.
+    """
+    jobs = _get_jobs(
+        module,
+        dict(arg_type="qualifier_pattern"),
+        {
+            "job_id": job_id,
+            "owner": owner,
+            "job_name": job_name,
+            "dd_name": dd_name,
+            "start_line": start_line,
+            "max_lines": max_lines,
+            "tail_lines": tail_lines,
+            "content": content,
+            "search": search,
+            "search_literal": search_literal,
+            "search_before": search_before,
+            "search_after": search_after,
+            "cursors": cursors,
+        },
+    )
+    return {"jobs": jobs}
+
+
+def job_outputs(
+    module,
+    job_ids,
+    owner=None,
+    job_name=None,
+    dd_name=None,
+    start_line=None,
+    max_lines=None,
+    tail_lines=None,
+    content=True,
+    search=None,
+    search_literal=False,
+    search_before=None,
+    search_after=None,
+    cursors=None,
+):
+    """Get the output from several z/OS jobs at once. All jobs
+    are retrieved by a single process in one SDSF session.
+
+    Arguments:
+        module {AnsibleModule} -- The AnsibleModule object from the running module.
+        job_ids {list[str]} -- The job IDs to retrieve.
+
+    Keyword Arguments:
+        owner {str} -- The owner of the jobs (default: {''})
+        job_name {str} -- The job name search for (default: {''})
+        dd_name {str} -- The data definition to retrieve (default: {''})
+        start_line {int} -- The first line of each ddname to retrieve, starting at 1. (default: {1})
+        max_lines {int} -- The maximum number of lines to retrieve for each ddname,
+        0 for no limit. (default: {0})
+        tail_lines {int} -- Retrieve only the last tail_lines lines of each ddname,
+        cannot be used with start_line. (default: {None})
+        content {bool} -- Whether to retrieve the spool content of each ddname. (default: {True})
+        search {str} -- Only keep the lines matching this regular expression. (default: {None})
+        search_literal {bool} -- Whether search is a literal string. (default: {False})
+        search_before {int} -- Number of lines to keep before each matching line. (default: {0})
+        search_after {int} -- Number of lines to keep after each matching line. (default: {0})
+        cursors {list[str]} -- Cursors returned for ddnames by an earlier call. (default: {None})
+
+    Raises:
+        ValueError: When an argument is invalid.
+        RuntimeError: When job output cannot be retrieved successfully.
+
+    Returns:
+        dict[str, dict] -- The output information for each job found, keyed by job ID.
+        Job IDs which could not be found are not included.
+    """
+    jobs = _get_jobs(
+        module,
+        dict(arg_type="list", elements="qualifier", required=True),
+        {
+            "job_id": job_ids,
+            "owner": owner,
+            "job_name": job_name,
+            "dd_name": dd_name,
+            "start_line": start_line,
+            "max_lines": max_lines,
+            "tail_lines": tail_lines,
+            "content": content,
+            "search": search,
+            "search_literal": search_literal,
+            "search_before": search_before,
+            "search_after": search_after,
+            "cursors": cursors,
+        },
+    )
+    return dict((job.get("job_id"), job) for job in jobs)
+
+
+def job_statuses(module, job_ids):
+    """Get the return code information of several z/OS jobs at once,
+    without retrieving any of their ddnames.
+
+    Arguments:
+        module {AnsibleModule} -- The AnsibleModule object from the running module.
+        job_ids {list[str]} -- The job IDs to retrieve.
+
+    Raises:
+        ValueError: When an argument is invalid.
+        RuntimeError: When job information cannot be retrieved successfully.
+
+    Returns:
+        dict[str, dict] -- The return code information of each job found, in the
+        format of ret_code in job_output(), keyed by job ID.
+    """
+    jobs = _get_jobs(
+        module,
+        dict(arg_type="list", elements="qualifier", required=True),
+        {"job_id": job_ids, "content": False, "ddnames": False},
+    )
+    return dict((job.get("job_id"), job.get("ret_code")) for job in jobs)
+
+
+def wait_for_jobs(module, job_ids, timeout=None, count=None, **poll_options):
+    """Wait until none of several z/OS jobs is waiting or running anymore,
+    or until at least count of them are done.
+    The status of all unfinished jobs is retrieved at once on each poll,
+    backing off between polls with poll_with_backoff().
+
+    Arguments:
+        module {AnsibleModule} -- The AnsibleModule object from the running module.
+        job_ids {list[str]} -- The job IDs to wait for.
+
+    Keyword Arguments:
+        timeout {float} -- Maximum number of seconds to wait, None to wait
+        until the jobs are done. (default: {None})
+        count {int} -- Number of jobs which must be done, None for all of them. (default: {None})
+        poll_options -- Any further keyword arguments for poll_with_backoff().
+
+    Raises:
+        ValueError: When an argument is invalid.
+        RuntimeError: When job information cannot be retrieved successfully.
+
+    Returns:
+        dict[str, float] -- For each job ID, the number of seconds after which
+        the job was seen done, or None when it was still unfinished at the timeout.
+    """
+    return _poll_job_statuses(module, job_ids, is_job_done, timeout, count, poll_options)
+
+
+def wait_for_jobs_visible(module, job_ids, timeout=None, **poll_options):
+    """Wait until JES knows about several just submitted z/OS jobs.
+    The status of all jobs not found yet is retrieved at once on each poll,
+    backing off between polls with poll_with_backoff().
+
+    Arguments:
+        module {AnsibleModule} -- The AnsibleModule object from the running module.
+        job_ids {list[str]} -- The job IDs to look for.
+
+    Keyword Arguments:
+        timeout {float} -- Maximum number of seconds to wait, None to wait
+        until all of the jobs are found. (default: {None})
+        poll_options -- Any further keyword arguments for poll_with_backoff().
+
+    Raises:
+        ValueError: When an argument is invalid.
+        RuntimeError: When job information cannot be retrieved successfully.
+
+    Returns:
+        dict[str, float] -- For each job ID, the number of seconds after which
+        the job was found, or None when it was still not found at the timeout.
+    """
+    return _poll_job_statuses(
+        module,
+        job_ids,
+        lambda ret_code: ret_code is not None,
+        timeout,
+        None,
+        poll_options,
+    )
+
+
+def _poll_job_statuses(module, job_ids, is_done, timeout, count, poll_options):
+    """Poll the status of several jobs at once until at least count of them are done.
+
+    Arguments:
+        module {AnsibleModule} -- The AnsibleModule object from the running module.
+        job_ids {list[str]} -- The job IDs to poll.
+        is_done {callable} -- Decides from the return code information of a job,
+        None when it was not found, whether the job is done.
+        timeout {float} -- Maximum number of seconds to poll, None for no limit.
+        count {int} -- Number of jobs which must be done, None for all of them.
+        poll_options {dict} -- Any further keyword arguments for poll_with_backoff().
+
+    Returns:
+        dict[str, float] -- For each job ID, the number of seconds after which
+        the job was done, or None when it was not done at the timeout.
+    """
+    clock = poll_options.get("clock", monotonic)
+    start = clock()
+    finished = dict((job_id.upper(), None) for job_id in job_ids)
+    if count is None:
+        count = len(finished)
+
+    def enough_done():
+        pending = [job_id for job_id, elapsed in finished.items() if elapsed is None]
+        statuses = job_statuses(module, pending)
+        now = clock() - start
+        for job_id in pending:
+            if is_done(statuses.get(job_id)):
+                finished[job_id] = now
+        done = len(finished) - list(finished.values()).count(None)
+        return finished if done >= count else None
+
+    poll_with_backoff(enough_done, timeout, **poll_options)
+    return finished
+
+
+def is_job_done(ret_code):
+    """Determine if a job has finished, from its return code information.
+
+    Arguments:
+        ret_code {dict} -- The return code information of the job, as in job_output(),
+        None when the job could not be found.
+
+    Returns:
+        bool -- True if the job is no longer waiting or running.
+    """
+    if not ret_code or not (ret_code.get("msg") or "").strip():
+        return False
+    return classify_job_status(ret_code.get("msg")).status != JOB_STATUS_ACTIVE
+
+
+def assert_valid_return_code(max_rc, found_rc):
+    """Make sure a job ended with an acceptable return code.
+
+    Arguments:
+        max_rc {int} -- The highest acceptable return code.
+        found_rc {Union[int, str]} -- The return code of the job, None when it has none.
+
+    Raises:
+        JobReturnCodeError: When the job has no return code or it is greater than max_rc.
+    """
+    if found_rc is None or max_rc < int(found_rc):
+        raise JobReturnCodeError(max_rc, found_rc)
+
+
+def _get_jobs(module, job_id_def, args):
+    """Validate the search criteria and retrieve the matching jobs.
+
+    Arguments:
+        module {AnsibleModule} -- The AnsibleModule object from the running module.
+        job_id_def {dict} -- The argument definition for job_id.
+        args {dict} -- The search criteria, as passed to job_output().
+
+    Raises:
+        ValueError: When an argument is invalid.
+        RuntimeError: When job output cannot be retrieved successfully.
+
+    Returns:
+        list[dict] -- The output information for each job.
+    """
+    arg_defs = dict(
+        job_id=job_id_def,
+        owner=dict(arg_type="qualifier_pattern"),
+        job_name=dict(arg_type="qualifier_pattern"),
+        dd_name=dict(arg_type=_ddname_pattern),
+        start_line=dict(arg_type=_line_number),
+        max_lines=dict(arg_type=_line_count),
+        tail_lines=dict(arg_type=_line_count),
+        content=dict(arg_type="bool", default=True),
+        search=dict(arg_type="str"),
+        search_literal=dict(arg_type="bool", default=False),
+        search_before=dict(arg_type=_line_count),
+        search_after=dict(arg_type=_line_count),
+        cursors=dict(arg_type="list", elements=_cursor_pattern),
+        ddnames=dict(arg_type="bool", default=True),
+        mutually_exclusive=[["start_line", "tail_lines"]],
+    )
+
+    parser = BetterArgParser(arg_defs)
+    parsed_args = parser.parse_args(args)
+
+    job_id = parsed_args.get("job_id")
+    if isinstance(job_id, list) and not job_id:
+        # an empty list of job IDs must not select every job
+        return []
+    job_id = job_id or ""
+    if isinstance(job_id, list):
+        # each job ID is searched for once, in the order requested
+        job_id = ",".join(OrderedDict.fromkeys(name.upper() for name in job_id))
+    job_name = parsed_args.get("job_name") or ""
+    owner = parsed_args.get("owner") or ""
+    start_line = parsed_args.get("start_line") or 1
+    max_lines = parsed_args.get("max_lines") or 0
+    tail_lines = parsed_args.get("tail_lines") or 0
+    content = parsed_args.get("content")
+    search = parsed_args.get("search")
+
+    records = _get_job_records(
+        module,
+        job_id,
+        owner,
+        job_name,
+        args.get("dd_name"),
+        start_line=start_line,
+        max_lines=max_lines,
+        tail_lines=tail_lines,
+        content=content,
+        cursors=parsed_args.get("cursors"),
+        ddnames=parsed_args.get("ddnames"),
+    )
+    if search:
+        records = _search_job_records(
+            records,
+            _search_pattern(search, parsed_args.get("search_literal")),
+            parsed_args.get("search_before") or 0,
+            parsed_args.get("search_after") or 0,
+        )
+    jobs = _build_jobs(records)
+    for job in jobs:
+        job["ret_code"] = {} if job.get("ret_code") is None else job.get("ret_code")
+        job["ret_code"]["code"] = _get_return_code_num(
+            job.get("ret_code", {}).get("msg", "")
+        )
+        job["ret_code"]["msg_code"] = _get_return_code_str(
+            job.get("ret_code", {}).get("msg", "")
+        )
+        job["ret_code"]["msg_txt"] = ""
+    return jobs
+
+
+def _search_pattern(search, literal=False):
+    """Compile the pattern used to search spool lines.
+
+    Arguments:
+        search {str} -- A regular expression, or a literal string.
+
+    Keyword Arguments:
+        literal {bool} -- Whether search is a literal string. (default: {False})
+
+    Raises:
+        ValueError: When search is not a valid regular expression.
+
+    Returns:
+        Pattern -- The compiled pattern.
+    """
+    if literal:
+        search = re.escape(search)
     try:
+        return re.compile(search)
+    except re.error as e:
+        raise ValueError(
+            'Invalid regular expression "{0}" for search. {1}'.format(search, str(e))
+        )
+
+
+def _search_job_records(records, pattern, before=0, after=0):
+    """Filter the spool lines records of job output, as they are read,
+    keeping only the lines matching a pattern and the requested number of
+    lines around them. Kept lines are tagged with their line numbers.
+
+    Arguments:
+        records {iterable[dict]} -- Job, ddname and spool line records, in the order written.
+        pattern {Pattern} -- The compiled pattern lines must match.
+
+    Keyword Arguments:
+        before {int} -- Number of lines to keep before each matching line. (default: {0})
+        after {int} -- Number of lines to keep after each matching line. (default: {0})
+
+    Yields:
+        dict -- The job and ddname records, and spool lines records holding
+        only the kept lines.
+    """
+    pending = deque(maxlen=before)
+    remaining = 0
+    for record in records:
+        if record.get("type") != "lines":
+            # context never spans ddnames
+            pending.clear()
+            remaining = 0
+            if record.get("type") == "dd":
+                record["line_numbers"] = []
+            yield record
+            continue
+        numbers = []
+        lines = []
+        number = record.get("start", 1)
+        for line in record.get("lines", []):
+            if pattern.search(line):
+                for pending_number, pending_line in pending:
+                    numbers.append(pending_number)
+                    lines.append(pending_line)
+                pending.clear()
+                numbers.append(number)
+                lines.append(line)
+                remaining = after
+            elif remaining > 0:
+                numbers.append(number)
+                lines.append(line)
+                remaining -= 1
+            else:
+                pending.append((number, line))
+            number += 1
+        if lines:
+            yield {"type": "lines", "lines": lines, "line_numbers": numbers}
+
+
+def _build_jobs(records):
+    """Assemble job output records, as written by the job output REXX script,
+    into the list of jobs returned by job_output(). Every spool line record
+    is kept in the returned jobs, so memory grows with the number of lines
+    requested; max_lines, tail_lines and cursors bound it.
+
+    Arguments:
+        records {iterable[dict]} -- Job, ddname and spool line records, in the order written.
+
+    Returns:
+        list[dict] -- The output information for each job.
+    """
+    jobs = []
+    job = None
+    dd = None
+    for record in records:
+        record_type = record.pop("type", None)
+        if record_type == "job":
+            job = record
+            job["ddnames"] = []
+            jobs.append(job)
+            dd = None
+        elif record_type == "dd" and job is not None:
+            dd = record
+            dd["content"] = []
+            job["ddnames"].append(dd)
+        elif record_type == "lines" and dd is not None:
+            dd["content"].extend(record.get("lines", []))
+            if "line_numbers" in dd:
+                dd["line_numbers"].extend(record.get("line_numbers", []))
+        elif record_type == "end" and dd is not None:
+            dd["cursor"] = "{0}/{1}/{2}".format(
+                job.get("job_id"), dd.get("id"), record.get("next_line")
+            )
+    return jobs
+
+
+def _get_job_records(
+    module,
+    job_id="",
+    owner="",
+    job_name="",
+    dd_name="",
+    start_line=1,
+    max_lines=0,
+    tail_lines=0,
+    content=True,
+    cursors=None,
+    ddnames=True,
+):
+    """Retrieve job information from SDSF one record at a time.
+    Runs a REXX script, installed once in the USS script cache, which writes a
+    JSON record per line: one for each job, one for each ddname, and
+    one for every JOB_OUTPUT_BATCH_SIZE lines of spool. Records are read
+    from a pipe as they are written, so the script output is not buffered
+    as one document before it is parsed. Spool lines outside of the
+    requested window are never browsed.
+
+    Arguments:
+        module {AnsibleModule} -- The AnsibleModule object from the running module.
+
+    Keyword Arguments:
+        job_id {str} -- The job ID to search for (default: {''})
+        owner {str} -- The owner of the job (default: {''})
+        job_name {str} -- The job name search for (default: {''})
+        dd_name {str} -- The data definition to retrieve (default: {''})
+        start_line {int} -- The first line of each ddname to retrieve. (default: {1})
+        max_lines {int} -- The maximum number of lines to retrieve for each ddname,
+        0 for no limit. (default: {0})
+        tail_lines {int} -- The number of lines to retrieve from the end of each ddname,
+        0 to use start_line instead. (default: {0})
+        content {bool} -- Whether to retrieve spool lines records. (default: {True})
+        cursors {list[str]} -- Cursors of ddnames to resume reading from. (default: {None})
+        ddnames {bool} -- Whether to retrieve ddname records at all. (default: {True})
+
+    Raises:
+        RuntimeError: When job output cannot be retrieved successfully.
+
+    Yields:
+        dict -- A single job, ddname or spool lines record.
+    """
+    if dd_name is None or dd_name == "?":
+        dd_name = ""
+    args = [
+        "jobid=" + job_id,
+        "owner=" + owner,
+        "jobname=" + job_name,
+        "ddname=" + dd_name,
+        "batch=" + str(JOB_OUTPUT_BATCH_SIZE),
+        "start=" + str(start_line),
+        "max=" + str(max_lines),
+        "tail=" + str(tail_lines),
+        "content=" + ("Y" if content else "N"),
+        "cursors=" + ",".join(cursors or []),
+        "ddnames=" + ("Y" if ddnames else "N"),
+    ]
+
+    with cached_script(JOB_OUTPUT_REXX) as script:
+        errors = TemporaryFile()
+        process = Popen([script, " ".join(args)], stdout=PIPE, stderr=errors)
+        try:
+            for record in _read_job_records(process.stdout):
+                yield record
+            rc = process.wait()
+            if rc != 0:
+                errors.seek(0)
+                raise RuntimeError(
+                    "Failed to retrieve job output. RC: {0} Error: {1}".format(
+                        str(rc), errors.read().decode("utf-8", "replace")
+                    )
+                )
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            errors.close()
+
+
+def _read_job_records(stream):
+    """Decode job output records written one JSON document per line.
+
+    Arguments:
+        stream {iterable[bytes]} -- The output of the job output REXX script.
+
+    Yields:
+        dict -- A single job, ddname or spool lines record.
+    """
+    for line in stream:
+        line = line.decode("utf-8", "replace").strip()
+        if line:
+            yield json.loads(line, strict=False)
+
+
+def poll_with_backoff(
+    check,
+    timeout=None,
+    initial_interval=POLL_INITIAL_INTERVAL,
+    max_interval=POLL_MAX_INTERVAL,
+    factor=POLL_BACKOFF_FACTOR,
+    jitter=POLL_JITTER,
+    clock=monotonic,
+    sleep=sleep,
+):
+    """Call check immediately, then again after exponentially growing,
+    randomly jittered intervals until it returns something other than None
+    or timeout seconds have elapsed. Quick operations are noticed right away
+    while long ones are not queried more than once every max_interval seconds.
+
+    Arguments:
+        check {callable} -- Takes no arguments, returns None while polling should continue.
+
+    Keyword Arguments:
+        timeout {float} -- Seconds after which to stop polling, None to poll
+        until check returns a value. (default: {None})
+        initial_interval {float} -- Seconds to wait after the first poll. (default: {POLL_INITIAL_INTERVAL})
+        max_interval {float} -- Maximum number of seconds between polls. (default: {POLL_MAX_INTERVAL})
+        factor {float} -- Growth of the interval after each poll. (default: {POLL_BACKOFF_FACTOR})
+        jitter {float} -- Fraction by which intervals are randomly shortened. (default: {POLL_JITTER})
+        clock {callable} -- Monotonic clock, in seconds. (default: {time.monotonic})
+        sleep {callable} -- Waits for a number of seconds. (default: {time.sleep})
+
+    Returns:
+        tuple[object, float] -- The last value returned by check, None when timed out,
+        and the number of seconds elapsed.
+    """
+    start = clock()
+    interval = initial_interval
+    while True:
+        result = check()
+        elapsed = clock() - start
+        if result is not None or (timeout is not None and elapsed >= timeout):
+            return result, elapsed
+        delay = interval * (1 - jitter * random())
+        if timeout is not None:
+            delay = min(delay, timeout - elapsed)
+        sleep(delay)
+        interval = min(max_interval, interval * factor)
+
 
-        if dd_name is None or dd_name == "?":
-            dd_name = ""
-        jobid_param = "jobid=" + job_id
-        owner_param = "owner=" + owner
-        jobname_param = "jobname=" + job_name
-        ddname_param = "ddname=" + dd_name
+def classify_job_status(status, return_code=None):
+    """Classify the status of a job, as reported by SDSF (eg. "CC 0000",
+    "ABEND S0C4", "JCL ERROR") or by zoautil_py Jobs.list() (eg. "CC" and
+    "0000", "ABENDU0100", "AC", "JCLERR").
 
-        tmp = NamedTemporaryFile(delete=True)
-        with open(tmp.name, "w") as f:
-            f.write(get_job_detail_json_rexx)
-        chmod(tmp.name, S_IEXEC | S_IREAD | S_IWRITE)
-        args = [jobid_param, owner_param, jobname_param, ddname_param]
+    Arguments:
+        status {str} -- The status or return code message of the job.
+
+    Keyword Arguments:
+        return_code {str} -- The return code reported separately from the status,
+        "?" when there is none. (default: {None})
 
-        cmd = [tmp.name, " ".join(args)]
-        rc, out, err = module.run_command(args=cmd)
-    except Exception:
-        raise
-    return rc, out, err
+    Returns:
+        JobStatus -- The status, one of the JOB_STATUS_* values, the completion
+        or abend code as a string, and the completion code as an integer.
+        Codes which do not apply are None.
+    """
+    key = (status, return_code)
+    job_status = _job_status_cache.get(key)
+    if job_status is None:
+        text = status or ""
+        if return_code and return_code != "?":
+            text = "{0} {1}".format(text, return_code)
+        match = _JOB_STATUS_REGEX.match(text)
+        if match is None:
+            job_status = JobStatus(JOB_STATUS_UNKNOWN, None, None)
+        else:
+            job_status = _JOB_STATUS_HANDLERS[match.lastgroup](match)
+        if len(_job_status_cache) >= JOB_STATUS_CACHE_SIZE:
+            _job_status_cache.clear()
+        _job_status_cache[key] = job_status
+    return job_status
 
 
 def _get_return_code_num(rc_str):
@@ -234,11 +925,7 @@ def _get_return_code_num(rc_str):
     Returns:
         Union[int, NoneType] -- Returns integer RC if possible, if not returns NoneType
     """
-    rc = None
-    match = re.search(r"\s*CC\s*([0-9]+)", rc_str)
-    if match:
-        rc = int(match.group(1))
-    return rc
+    return classify_job_status(rc_str).return_code
 
 
 def _get_return_code_str(rc_str):
@@ -251,11 +938,76 @@ def _get_return_code_str(rc_str):
     Returns:
         Union[str, NoneType] -- Returns string RC or ABEND code if possible, if not returns NoneType
     """
-    rc = None
-    match = re.search(r"(?:\s*CC\s*([0-9]+))|(?:ABEND\s*((?:S|U)[0-9]+))", rc_str)
-    if match:
-        rc = match.group(1) or match.group(2)
-    return rc
+    return classify_job_status(rc_str).code
+
+
+def _cursor_pattern(contents, resolve_dependencies):
+    """Resolver for job output cursor type arguments
+
+    Arguments:
+        contents {str} -- The contents of the argument.
+        resolved_dependencies {dict} -- Contains all of the dependencies and their contents,
+        which have already been handled,
+        for use during current arguments handling operations.
+
+    Raises:
+        ValueError: When contents is invalid argument type
+    Returns:
+        str -- The arguments contents after any necessary operations.
+    """
+    if not re.fullmatch(r"[A-Z0-9]{1,8}/[0-9]+/[0-9]+", str(contents), re.IGNORECASE):
+        raise ValueError(
+            'Invalid argument type for "{0}". expected "cursor"'.format(contents)
+        )
+    return str(contents).upper()
+
+
+def _line_number(contents, resolve_dependencies):
+    """Resolver for line number type arguments, the number of a spool line
+    starting at 1.
+
+    Arguments:
+        contents {Union[int, str]} -- The contents of the argument.
+        resolved_dependencies {dict} -- Contains all of the dependencies and their contents,
+        which have already been handled,
+        for use during current arguments handling operations.
+
+    Raises:
+        ValueError: When contents is invalid argument type
+    Returns:
+        int -- The arguments contents after any necessary operations.
+    """
+    if not re.fullmatch(r"\s*[+-]?[0-9]+\s*", str(contents)) or int(contents) < 1:
+        raise ValueError(
+            'Invalid argument "{0}". expected a line number of 1 or greater'.format(
+                contents
+            )
+        )
+    return int(contents)
+
+
+def _line_count(contents, resolve_dependencies):
+    """Resolver for line count type arguments, a number of spool lines
+    which may be 0.
+
+    Arguments:
+        contents {Union[int, str]} -- The contents of the argument.
+        resolved_dependencies {dict} -- Contains all of the dependencies and their contents,
+        which have already been handled,
+        for use during current arguments handling operations.
+
+    Raises:
+        ValueError: When contents is invalid argument type
+    Returns:
+        int -- The arguments contents after any necessary operations.
+    """
+    if not re.fullmatch(r"\s*[+-]?[0-9]+\s*", str(contents)) or int(contents) < 0:
+        raise ValueError(
+            'Invalid argument "{0}". expected a number of lines of 0 or greater'.format(
+                contents
+            )
+        )
+    return int(contents)
 
 
 def _ddname_pattern(contents, resolve_dependencies):
@@ -281,3 +1033,11 @@ def _ddname_pattern(contents, resolve_dependencies):
             )
         )
     return str(contents)
+
+
+class JobReturnCodeError(Exception):
+    def __init__(self, max_rc, found_rc):
+        self.msg = "The return code {0} of the job is unavailable or greater than max_rc {1}.".format(
+            found_rc, max_rc
+        )
+        super(JobReturnCodeError, self).__init__(self.msg)
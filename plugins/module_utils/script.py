@@ -0,0 +1,157 @@
+# Copyright (c) IBM Corporation 2020
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import hashlib
+import os
+import stat
+from contextlib import contextmanager
+from tempfile import gettempdir, mkstemp
+
+SCRIPT_FILE_SUFFIX = ".rexx"
+SCRIPT_FILE_MODE = stat.S_IRWXU
+
+
+def default_script_directory():
+    """Get the per-user directory scripts are installed into.
+
+    Returns:
+        str -- The path of the directory.
+    """
+    return os.path.join(gettempdir(), "ibm_zos_core-scripts-{0}".format(os.getuid()))
+
+
+@contextmanager
+def cached_script(script, directory=None):
+    """Provide an executable file holding a script. The script is installed
+    once into a per-user cache directory, named by the hash of its contents,
+    and reused by every later call. When the cache directory cannot be used
+    safely, the script is written to a temporary file which is removed on exit.
+
+    Arguments:
+        script {str} -- The contents of the script.
+
+    Keyword Arguments:
+        directory {str} -- The cache directory. (default: {default_script_directory()})
+
+    Yields:
+        str -- The absolute path of the executable script.
+    """
+    path = install_script(script, directory)
+    if path is not None:
+        yield path
+        return
+    path = _write_script(script, gettempdir())
+    try:
+        yield path
+    finally:
+        _remove(path)
+
+
+def install_script(script, directory=None):
+    """Install a script into the cache directory, unless an intact
+    copy is already installed. An installed script is trusted when it is
+    a regular file owned by the current user, only accessible by that
+    user and of the expected size; its name already identifies the contents.
+
+    Arguments:
+        script {str} -- The contents of the script.
+
+    Keyword Arguments:
+        directory {str} -- The cache directory. (default: {default_script_directory()})
+
+    Returns:
+        str -- The absolute path of the installed script,
+        None when the cache directory cannot be used.
+    """
+    if directory is None:
+        directory = default_script_directory()
+    directory = os.path.abspath(directory)
+    path = os.path.join(
+        directory,
+        hashlib.sha256(script.encode("utf-8")).hexdigest() + SCRIPT_FILE_SUFFIX,
+    )
+    try:
+        if not _is_private_directory(directory):
+            return None
+        if _is_intact_script(path, len(script)):
+            return path
+        os.rename(_write_script(script, directory), path)
+    except (OSError, IOError):
+        return None
+    return path
+
+
+def _is_private_directory(directory):
+    """Make sure the cache directory exists and cannot be
+    modified by other users, creating it when needed.
+
+    Arguments:
+        directory {str} -- The cache directory.
+
+    Returns:
+        bool -- True if the directory is safe to install scripts into.
+    """
+    try:
+        stats = os.lstat(directory)
+    except (OSError, IOError):
+        os.makedirs(directory, SCRIPT_FILE_MODE)
+        stats = os.lstat(directory)
+    return (
+        stat.S_ISDIR(stats.st_mode)
+        and stats.st_uid == os.getuid()
+        and not stats.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    )
+
+
+def _is_intact_script(path, size):
+    """Check an installed script without reading it.
+
+    Arguments:
+        path {str} -- The path of the installed script.
+        size {int} -- The expected size of the script in bytes.
+
+    Returns:
+        bool -- True if the script can be used as is.
+    """
+    try:
+        stats = os.lstat(path)
+    except (OSError, IOError):
+        return False
+    return (
+        stat.S_ISREG(stats.st_mode)
+        and stats.st_uid == os.getuid()
+        and stat.S_IMODE(stats.st_mode) == SCRIPT_FILE_MODE
+        and stats.st_size == size
+    )
+
+
+def _write_script(script, directory):
+    """Write a script to a new executable file.
+
+    Arguments:
+        script {str} -- The contents of the script.
+        directory {str} -- The directory to create the file in.
+
+    Returns:
+        str -- The path of the new file.
+    """
+    fd, path = mkstemp(suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as script_file:
+            script_file.write(script)
+        os.chmod(path, SCRIPT_FILE_MODE)
+    except Exception:
+        _remove(path)
+        raise
+    return path
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except (OSError, IOError):
+        pass
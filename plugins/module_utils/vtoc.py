@@ -6,18 +6,148 @@ from __future__ import absolute_import, division, print_function
 
 __metaclass__ = type
 
+import errno
+import json
+import os
 import re
+import zlib
+from bisect import bisect_left
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import Popen, PIPE, TimeoutExpired
+from tempfile import TemporaryFile, mkstemp
+from time import monotonic, time
+
+# Number of seconds a VTOC snapshot is considered current
+DEFAULT_SNAPSHOT_TTL = 300
+
+# Upper bound in bytes on the size of all snapshots kept on disk
+DEFAULT_CACHE_MAX_SIZE = 64 * 1024 * 1024
+CACHE_FILE_SUFFIX = ".vtoc"
+CACHE_FORMAT_VERSION = 2
+
+# Number of volumes listed at the same time by get_volume_entries()
+DEFAULT_MAX_WORKERS = 8
+
+# Number of data set names requested by a single LISTVTOC DSNAME statement
+MAX_DSNAMES_PER_STATEMENT = 10
+# Longest name a data set can have, longer names are never looked up
+MAX_DATA_SET_NAME_LENGTH = 44
+# Last column available to utility control statements, column 72 marks a continuation
+CONTROL_STATEMENT_END = 71
+# Continued control statements resume in column 16
+CONTINUATION_INDENT = 15
+
+DATA_SET_SECTION_DELIMITER = "0---------------DATA SET NAME----------------"
+
+# Header rows of the three tables at the start of each data set section
+TABLE_ROW_REGEXES = (
+    re.compile(
+        r"(0-*DATA SET NAME-*\s+)(SER NO\s+)(SEQNO\s+)(DATE.CRE\s+)(DATE.EXP\s+)"
+        r"(DATE.REF\s+)(EXT\s+)(DSORG\s+)(RECFM\s+)(OPTCD\s+)(BLKSIZE[ ]*)"
+    ),
+    re.compile(
+        r"(0SMS.IND\s+)(LRECL\s+)(KEYLEN\s+)(INITIAL ALLOC\s+)(2ND ALLOC\s+)"
+        r"(EXTEND\s+)(LAST BLK\(T-R-L\)\s+)(DIR.REM\s+)(F2 OR F3\(C-H-R\)\s+)(DSCB\(C-H-R\)[ ]*)"
+    ),
+    re.compile(r"([ ]*EATTR[ ]*)"),
+)
+
+# VTOCLIST field name mapped to the result name and the name of the
+# VolumeTableOfContents method used to format its contents. Fields
+# without a result name are formatted into one or more result fields.
+TABLE_FIELDS = {
+    "DATA SET NAME": ("data_set_name", None),
+    "SER NO": ("volume", None),
+    "SEQNO": ("sequence", None),
+    "DATE.CRE": ("creation_date", None),
+    "DATE.EXP": ("expiration_date", None),
+    "DATE.REF": ("last_referenced_date", None),
+    "EXT": ("number_of_extents", None),
+    "DSORG": ("data_set_organization", None),
+    "RECFM": ("record_format", None),
+    "OPTCD": ("option_code", None),
+    "BLKSIZE": ("block_size", None),
+    "SMS.IND": ("sms_attributes", None),
+    "LRECL": ("record_length", None),
+    "KEYLEN": ("key_length", None),
+    "INITIAL ALLOC": ("space_type", None),
+    "2ND ALLOC": ("space_secondary", None),
+    "EXTEND": (None, "_format_extend"),
+    "LAST BLK(T-R-L)": ("last_block_pointer", "_format_last_blk"),
+    "DIR.REM": ("last_directory_block_bytes_used", None),
+    "F2 OR F3(C-H-R)": ("dscb_format_2_or_3", "_format_f2_or_f3"),
+    "DSCB(C-H-R)": ("dscb_format_1_or_8", "_format_dscb"),
+    "EATTR": ("extended_attributes", None),
+}
+
+# Result names of fields holding a number, stored as integers in VtocEntry
+INTEGER_FIELDS = frozenset(
+    [
+        "sequence",
+        "number_of_extents",
+        "block_size",
+        "record_length",
+        "key_length",
+        "space_secondary",
+        "average_block_size",
+        "last_directory_block_bytes_used",
+    ]
+)
+
+CylinderHead = namedtuple("CylinderHead", ["cylinder", "track"])
+# Extent number, first and last cylinder and track, and number of tracks in the extent
+Extent = namedtuple("Extent", ["number", "low", "high", "tracks"])
+FreeExtent = namedtuple("FreeExtent", ["low", "high", "tracks"])
+VolumeContentsDiff = namedtuple("VolumeContentsDiff", ["added", "removed", "changed"])
+# Records of a data set in two snapshots and the names of the fields which differ
+ChangedDataSet = namedtuple("ChangedDataSet", ["previous", "current", "fields"])
+
+# Fields compared when looking for data sets changed between two snapshots
+DIFF_FIELDS = ("data_set_organization", "last_referenced_date", "extents")
+LastBlockPointer = namedtuple("LastBlockPointer", ["track", "block", "bytes_remaining"])
+CylinderHeadRecord = namedtuple("CylinderHeadRecord", ["cylinder", "track", "record"])
+
+# Result names of fields holding a pointer, mapped to the type used in VtocEntry
+POINTER_FIELDS = {
+    "last_block_pointer": LastBlockPointer,
+    "dscb_format_2_or_3": CylinderHeadRecord,
+    "dscb_format_1_or_8": CylinderHeadRecord,
+}
+
+# Tracks per cylinder of 3390 volumes
+TRACKS_PER_CYLINDER = 15
+
+EXTEND_REGEX = re.compile(r"([0-9]+)(AV|BY|KB|MB)")
+LAST_BLK_REGEX = re.compile(r"[ ]*([0-9]+)[ ]+([0-9]+)[ ]+([0-9]+)?")
+CHR_REGEX = re.compile(r"[ ]*([0-9]+)[ ]+([0-9]+)[ ]+([0-9]+)")
+NO_EXTENTS_REGEX = re.compile(r"THE\sABOVE\sDATASET\sHAS\sNO\sEXTENTS")
+EXTENTS_INDENT_REGEX = re.compile(
+    r"(0\s*EXTENTS\s+)(?:(NO\s+)(LOW\(C-H\)\s+)(HIGH\(C-H\)[ ]*))"
+)
+EXTENTS_HEADER_REGEX = re.compile(r"(NO\s+)(LOW\(C-H\)\s+)(HIGH\(C-H\)[ ]*)")
+
+# Upper bound on distinct page layouts remembered by the row and extent parsers
+MAX_CACHED_LAYOUTS = 64
+_TABLE_ROW_LAYOUTS = {}
+_EXTENT_LAYOUTS = {}
 
 
 class VolumeTableOfContents(object):
-    def __init__(self, module):
+    def __init__(self, module, cache=None):
         """Retrieve data set information from the
         volume table of contents (VTOC).
 
         Arguments:
             module {AnsibleModule} -- The AnsibleModule object from currently running module.
+
+        Keyword Arguments:
+            cache {VolumeTableOfContentsCache} -- Snapshot cache shared between lookups.
+            When provided, each volume is listed at most once until the snapshot
+            expires or is invalidated. (default: {None})
         """
         self.module = module
+        self.cache = cache
 
     def get_volume_entry(self, volume):
         """Retrieve VTOC information for all data sets with entries
@@ -30,19 +160,118 @@ class VolumeTableOfContents(object):
             VolumeTableOfContentsError: When any exception is raised during VTOC operations.
 
         Returns:
-            list[dict] -- List of dictionaries holding data set information from VTOC.
+            VolumeContents -- List of VtocEntry records holding data set information from VTOC.
         """
+        if self.cache is not None:
+            data_sets = self.cache.get(volume)
+            if data_sets is not None:
+                return data_sets
         try:
-            stdin = "  LISTVTOC FORMAT,VOL=3390={0}".format(volume.upper())
-            dd = "SYS1.VVDS.V{0}".format(volume.upper())
+            dd, stdin = self._listvtoc_input(volume)
             stdout = self._iehlist(dd, stdin)
             if stdout is None:
                 return None
             data_sets = self._process_output(stdout)
         except Exception as e:
             raise VolumeTableOfContentsError(repr(e))
+        if self.cache is not None:
+            self.cache.put(volume, data_sets)
         return data_sets
 
+    def get_volume_entries(self, volumes, max_workers=DEFAULT_MAX_WORKERS, timeout=None):
+        """Retrieve VTOC information for all data sets with entries
+        on any of the volumes. Volumes are listed concurrently, each by
+        its own IEHLIST call, and the results are merged in the order the
+        volumes were given.
+
+        A volume which cannot be listed does not prevent results from
+        being returned for the others, the reason it failed is recorded
+        in the errors of the returned VolumeContents instead.
+
+        Arguments:
+            volumes {list[str]} -- The names of the volumes.
+
+        Keyword Arguments:
+            max_workers {int} -- Maximum number of volumes listed at the same time.
+            (default: {DEFAULT_MAX_WORKERS})
+            timeout {float} -- Number of seconds to wait for the listing of a single
+            volume before giving up on it. None waits indefinitely. (default: {None})
+
+        Returns:
+            VolumeContents -- List of VtocEntry records holding data set information
+            from the VTOC of every volume that was listed.
+        """
+        volumes = list(dict.fromkeys(volume.upper() for volume in volumes))
+        listings = {}
+        if self.cache is not None:
+            for volume in volumes:
+                data_sets = self.cache.get(volume)
+                if data_sets is not None:
+                    listings[volume] = data_sets
+        pending = [volume for volume in volumes if volume not in listings]
+        results = VolumeContents()
+        if pending:
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+                futures = [
+                    (volume, executor.submit(self._list_volume, volume, timeout))
+                    for volume in pending
+                ]
+                for volume, future in futures:
+                    try:
+                        listings[volume] = future.result()
+                    except VolumeTableOfContentsError as e:
+                        results.errors[volume] = e.msg
+                        continue
+                    if self.cache is not None:
+                        self.cache.put(volume, listings[volume])
+        for volume in volumes:
+            if volume in listings:
+                results.extend(listings[volume])
+        return results
+
+    def iter_volume_entries(self, volume):
+        """Retrieve VTOC information for all data sets with entries
+        on the volume, one data set at a time. IEHLIST output is read
+        incrementally and each data set is yielded as soon as its section
+        of the listing is complete, so callers may stop early once they
+        find the data set they are looking for.
+
+        When a cache is in use, the records are also collected so a full
+        listing can be stored as a snapshot for the volume.
+
+        Arguments:
+            volume {str} -- The name of the volume.
+
+        Raises:
+            VolumeTableOfContentsError: When any exception is raised during VTOC operations.
+
+        Yields:
+            VtocEntry -- Data set information from VTOC.
+        """
+        if self.cache is not None:
+            data_sets = self.cache.get(volume)
+            if data_sets is not None:
+                for data_set in data_sets:
+                    yield data_set
+                return
+        data_sets = VolumeContents() if self.cache is not None else None
+        dd, stdin = self._listvtoc_input(volume)
+        lines = self._iehlist_lines(dd, stdin)
+        try:
+            for section in self._iter_data_set_sections(lines):
+                data_set = self._parse_data_set_lines(section)
+                if data_sets is not None:
+                    data_sets.append(data_set)
+                yield data_set
+        except VolumeTableOfContentsError:
+            raise
+        except Exception as e:
+            raise VolumeTableOfContentsError(repr(e))
+        finally:
+            lines.close()
+        if data_sets is not None:
+            self.cache.put(volume, data_sets)
+
     def get_data_set_entry(self, data_set_name, volume):
         """Retrieve VTOC information for a single data set
         on a volume.
@@ -52,35 +281,337 @@ class VolumeTableOfContents(object):
             volume {str} -- The name of the volume.
 
         Returns:
-            dict -- The information for the data set found in VTOC.
+            VtocEntry -- The information for the data set found in VTOC.
+        """
+        data_sets = self.get_data_set_entries([data_set_name], volume)
+        return self.find_data_set_in_volume_output(data_set_name, data_sets)
+
+    def get_space_map(self, volume, cylinders):
+        """Build a map of the allocated and free space on a volume.
+
+        Arguments:
+            volume {str} -- The name of the volume.
+            cylinders {int} -- The number of cylinders on the volume.
+
+        Raises:
+            VolumeTableOfContentsError: When any exception is raised during VTOC operations.
+
+        Returns:
+            VolumeSpaceMap -- The space map of the volume, None if the volume could not be listed.
         """
-        data_set = None
         data_sets = self.get_volume_entry(volume)
-        for ds in data_sets:
-            if ds.get("data_set_name") == data_set_name.upper():
-                data_set = ds
-                break
-        return data_set
+        if data_sets is None:
+            return None
+        return VolumeSpaceMap(data_sets, cylinders)
+
+    def get_data_set_entries(self, data_set_names, volume):
+        """Retrieve VTOC information for a small number of data sets
+        on a volume. Only the requested data sets are listed, using the
+        DSNAME operand of LISTVTOC, unless a snapshot of the whole volume
+        is already cached or the cache is persistent. When IEHLIST rejects
+        the targeted request the whole volume is listed instead.
+
+        With a cache, the outcome of a targeted listing is kept for each
+        name, found or not. Once a volume has been listed by name, a lookup
+        of names not listed yet lists the whole volume instead, so while the
+        cached listings are valid a volume is listed by name at most once and
+        in full at most once.
+
+        Arguments:
+            data_set_names {list[str]} -- The names of the data sets to retrieve information for.
+            volume {str} -- The name of the volume.
+
+        Raises:
+            VolumeTableOfContentsError: When any exception is raised during VTOC operations.
+
+        Returns:
+            VolumeContents -- List of VtocEntry records for the requested data sets
+            found on the volume, None if the volume could not be listed.
+        """
+        data_set_names = [
+            name
+            for name in dict.fromkeys(name.upper() for name in data_set_names)
+            if len(name) <= MAX_DATA_SET_NAME_LENGTH
+        ]
+        if not data_set_names:
+            return VolumeContents()
+        data_sets = None
+        if self.cache is not None:
+            data_sets = self.cache.get(volume)
+            listed = self.cache.get_data_sets(volume) if data_sets is None else None
+            if listed is not None and all(name in listed for name in data_set_names):
+                return VolumeContents(
+                    [listed[name] for name in data_set_names if listed[name] is not None]
+                )
+            if data_sets is None and (listed is not None or self.cache.persistent):
+                # a full listing answers every later lookup on the volume, and
+                # when the cache is persistent it outlives this module run
+                data_sets = self.get_volume_entry(volume)
+                if data_sets is None:
+                    return None
+        if data_sets is None:
+            try:
+                data_sets = VolumeContents()
+                for start in range(0, len(data_set_names), MAX_DSNAMES_PER_STATEMENT):
+                    dd, stdin = self._listvtoc_input(
+                        volume, data_set_names[start:start + MAX_DSNAMES_PER_STATEMENT]
+                    )
+                    stdout = self._iehlist(dd, stdin)
+                    if stdout is None:
+                        data_sets = None
+                        break
+                    data_sets.extend(self._process_output(stdout))
+            except Exception as e:
+                raise VolumeTableOfContentsError(repr(e))
+            if data_sets is None:
+                data_sets = self.get_volume_entry(volume)
+                if data_sets is None:
+                    return None
+            elif self.cache is not None:
+                self.cache.put_data_sets(
+                    volume, dict((name, data_sets.find(name)) for name in data_set_names)
+                )
+        return VolumeContents(
+            [
+                data_set
+                for data_set in (data_sets.find(name) for name in data_set_names)
+                if data_set is not None
+            ]
+        )
 
     @staticmethod
     def find_data_set_in_volume_output(data_set_name, data_sets):
-        """Takes a list of output dictionaries generated by
+        """Takes a list of records generated by
         get_volume_entry() and retrieves the record for a particular data
         set if present. This method is useful when wanting to avoid multiple
         IEHLIST calls.
 
         Arguments:
             data_set_name {str} -- The name of the data set to retrieve information for.
-            data_sets {list[dict]} -- List of dictionaries holding data set information from VTOC.
+            data_sets {list[VtocEntry]} -- List of records holding data set information from VTOC.
 
         Returns:
-            dict -- The information for the data set found in VTOC.
+            VtocEntry -- The information for the data set found in VTOC.
         """
+        if isinstance(data_sets, VolumeContents):
+            return data_sets.find(data_set_name)
         for data_set in data_sets:
             if data_set.get("data_set_name") == data_set_name.upper():
                 return data_set
         return None
 
+    @staticmethod
+    def diff_volume_entries(previous, current, fields=DIFF_FIELDS):
+        """Compare two snapshots of the same volume, as returned by
+        get_volume_entry(), in a single merge over the records sorted
+        by data set name. LISTVTOC already lists data sets in name order,
+        so sorting the records is normally linear as well.
+
+        Arguments:
+            previous {list[VtocEntry]} -- The older snapshot.
+            current {list[VtocEntry]} -- The newer snapshot.
+
+        Keyword Arguments:
+            fields {tuple[str]} -- Names of the VtocEntry fields compared to decide
+            whether a data set changed. (default: {DIFF_FIELDS})
+
+        Returns:
+            VolumeContentsDiff -- The records of data sets only in the current snapshot,
+            only in the previous snapshot, and a ChangedDataSet for each data set whose
+            fields differ between the two.
+        """
+        def name(data_set):
+            return data_set.data_set_name or ""
+
+        previous = sorted(previous, key=name)
+        current = sorted(current, key=name)
+        added = []
+        removed = []
+        changed = []
+        previous_index = 0
+        current_index = 0
+        while previous_index < len(previous) and current_index < len(current):
+            previous_data_set = previous[previous_index]
+            current_data_set = current[current_index]
+            if name(previous_data_set) < name(current_data_set):
+                removed.append(previous_data_set)
+                previous_index += 1
+            elif name(previous_data_set) > name(current_data_set):
+                added.append(current_data_set)
+                current_index += 1
+            else:
+                changed_fields = [
+                    field
+                    for field in fields
+                    if getattr(previous_data_set, field) != getattr(current_data_set, field)
+                ]
+                if changed_fields:
+                    changed.append(
+                        ChangedDataSet(previous_data_set, current_data_set, changed_fields)
+                    )
+                previous_index += 1
+                current_index += 1
+        removed.extend(previous[previous_index:])
+        added.extend(current[current_index:])
+        return VolumeContentsDiff(added, removed, changed)
+
+    def _listvtoc_input(self, volume, data_set_names=None):
+        """Build the DD and control statement to list the VTOC of a volume.
+
+        Arguments:
+            volume {str} -- The name of the volume.
+
+        Keyword Arguments:
+            data_set_names {list[str]} -- Limit the listing to these data sets.
+            When not provided, all data sets on the volume are listed. (default: {None})
+
+        Returns:
+            tuple[str, str] -- The DD to allocate and the LISTVTOC control statement.
+        """
+        dd = "SYS1.VVDS.V{0}".format(volume.upper())
+        statement = "LISTVTOC FORMAT,VOL=3390={0}".format(volume.upper())
+        if data_set_names:
+            statement += ",DSNAME=({0})".format(
+                ",".join(name.upper() for name in data_set_names)
+            )
+        return dd, self._format_control_statement(statement)
+
+    def _format_control_statement(self, statement):
+        """Lay out a utility control statement over as many lines as needed.
+        Statements are broken after a comma, continued lines are marked
+        in column 72 and resume in column 16.
+
+        Arguments:
+            statement {str} -- The control statement, without leading blanks.
+
+        Returns:
+            str -- The control statement as passed to sysin.
+        """
+        operands = statement.split(",")
+        lines = []
+        line = "  " + operands[0]
+        for index, operand in enumerate(operands[1:], 2):
+            # leave room for the comma which follows the operand, unless it is the last one
+            trailing_comma = 1 if index < len(operands) else 0
+            if len(line) + 1 + len(operand) + trailing_comma > CONTROL_STATEMENT_END:
+                lines.append(line + "," + " " * (CONTROL_STATEMENT_END - len(line) - 1) + "X")
+                line = " " * CONTINUATION_INDENT + operand
+            else:
+                line += "," + operand
+        lines.append(line)
+        return "\n".join(lines)
+
+    def _list_volume(self, volume, timeout=None):
+        """List and parse the VTOC of a single volume without using the
+        AnsibleModule, so it can be called from multiple threads.
+
+        Arguments:
+            volume {str} -- The name of the volume.
+
+        Keyword Arguments:
+            timeout {float} -- Number of seconds to wait for IEHLIST. (default: {None})
+
+        Raises:
+            VolumeTableOfContentsError: When the volume could not be listed or parsed.
+
+        Returns:
+            VolumeContents -- List of VtocEntry records holding data set information from VTOC.
+        """
+        try:
+            dd, stdin = self._listvtoc_input(volume)
+            return self._process_output(self._iehlist_output(dd, stdin, timeout))
+        except VolumeTableOfContentsError:
+            raise
+        except Exception as e:
+            raise VolumeTableOfContentsError(repr(e))
+
+    def _iehlist_command(self, dd):
+        """Build the command used to call IEHLIST.
+
+        Arguments:
+            dd {str} -- Volume information to pass as DD statement.
+
+        Returns:
+            list[str] -- The program and its arguments.
+        """
+        return [
+            "mvscmd",
+            "--pgm=iehlist",
+            "--sysprint=*",
+            "--dd={0}".format(dd),
+            "--sysin=stdin",
+        ]
+
+    def _iehlist_output(self, dd, stdin, timeout=None):
+        """Calls IEHLIST program, stopping it if it does not complete in time.
+
+        Arguments:
+            dd {str} -- Volume information to pass as DD statement.
+            stdin {str} -- Input to stdin.
+
+        Keyword Arguments:
+            timeout {float} -- Number of seconds to wait for IEHLIST. (default: {None})
+
+        Raises:
+            VolumeTableOfContentsError: When IEHLIST times out or ends with a non-zero return code.
+
+        Returns:
+            str -- The sysprint response of IEHLIST.
+        """
+        process = Popen(self._iehlist_command(dd), stdin=PIPE, stdout=PIPE, stderr=PIPE)
+        try:
+            stdout, stderr = process.communicate((stdin + "\n").encode("utf-8"), timeout)
+        except TimeoutExpired:
+            process.kill()
+            process.communicate()
+            raise VolumeTableOfContentsError(
+                "IEHLIST did not complete within {0} seconds.".format(timeout)
+            )
+        if process.returncode != 0:
+            raise VolumeTableOfContentsError(
+                "IEHLIST failed with RC={0}. {1}".format(
+                    process.returncode, stderr.decode("utf-8", "replace").strip()
+                )
+            )
+        return stdout.decode("utf-8", "replace")
+
+    def _iehlist_lines(self, dd, stdin):
+        """Calls IEHLIST program and reads the sysprint response
+        one line at a time as it is produced. Closing the generator
+        before the output is exhausted stops the program.
+
+        Arguments:
+            dd {str} -- Volume information to pass as DD statement.
+            stdin {str} -- Input to stdin.
+
+        Raises:
+            VolumeTableOfContentsError: When IEHLIST ends with a non-zero return code.
+
+        Yields:
+            str -- A single line of the sysprint response of IEHLIST, without line ending.
+        """
+        errors = TemporaryFile()
+        process = Popen(self._iehlist_command(dd), stdin=PIPE, stdout=PIPE, stderr=errors)
+        try:
+            process.stdin.write((stdin + "\n").encode("utf-8"))
+            process.stdin.close()
+            for line in process.stdout:
+                yield line.decode("utf-8", "replace").rstrip("\n")
+            rc = process.wait()
+            if rc != 0:
+                errors.seek(0)
+                raise VolumeTableOfContentsError(
+                    "IEHLIST failed with RC={0}. {1}".format(
+                        rc, errors.read().decode("utf-8", "replace").strip()
+                    )
+                )
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            process.stdout.close()
+            errors.close()
+
     def _iehlist(self, dd, stdin):
         """Calls IEHLIST program.
 
@@ -107,12 +638,11 @@ class VolumeTableOfContents(object):
             stdout {str} -- The output of LISTVTOC.
 
         Returns:
-            list[dict] -- List of dictionaries holding data set information from VTOC.
+            VolumeContents -- List of VtocEntry records holding data set information from VTOC.
         """
-        data_sets = []
-        data_set_strings = self._separate_data_set_sections(stdout)
-        for data_set_string in data_set_strings:
-            data_sets.append(self._parse_data_set_info(data_set_string))
+        data_sets = VolumeContents()
+        for lines in self._iter_data_set_sections(stdout.split("\n")):
+            data_sets.append(self._parse_data_set_lines(lines))
         return data_sets
 
     def _separate_data_set_sections(self, contents):
@@ -124,131 +654,141 @@ class VolumeTableOfContents(object):
         Returns:
             list[str] -- LISTVTOC output separated into sections by data set.
         """
-        delimeter = "0---------------DATA SET NAME----------------"
-        data_sets = re.split(delimeter, contents)
-        fixed_ds = [delimeter + x for x in data_sets[1:]]
-        return fixed_ds
+        return [
+            "\n".join(lines)
+            for lines in self._iter_data_set_sections(contents.split("\n"))
+        ]
+
+    def _iter_data_set_sections(self, lines):
+        """Group lines of LISTVTOC output into data set sections.
+        Each section is yielded as soon as the start of the next
+        section, or the end of the output, is reached.
+
+        Arguments:
+            lines {iterable[str]} -- The lines of LISTVTOC output, without line endings.
+
+        Yields:
+            list[str] -- The lines of a single data set section of the LISTVTOC output.
+        """
+        section = None
+        for line in lines:
+            index = line.find(DATA_SET_SECTION_DELIMITER)
+            if index < 0:
+                if section is not None:
+                    section.append(line)
+                continue
+            if section is not None:
+                if index > 0:
+                    section.append(line[:index])
+                yield section
+            section = [line[index:]]
+        if section is not None:
+            yield section
 
     def _parse_data_set_info(self, data_set_string):
-        """Build dictionaries representing data set information
+        """Build a record representing data set information
         from LISTVTOC output.
 
         Arguments:
             data_set_string {str} -- Single data set section of the LISTVTOC output.
 
         Returns:
-            dict -- Holds data set information from VTOC.
+            VtocEntry -- Holds data set information from VTOC.
+        """
+        return self._parse_data_set_lines(data_set_string.split("\n"))
+
+    def _parse_data_set_lines(self, lines):
+        """Build a record representing data set information
+        from the lines of a single data set section of LISTVTOC output.
+        Extent information is kept unparsed until it is first requested.
+
+        Arguments:
+            lines {list[str]} -- Single data set section of the LISTVTOC output, split into lines.
+
+        Returns:
+            VtocEntry -- Holds data set information from VTOC.
         """
-        lines = data_set_string.split("\n")
         data_set_info = {}
-        regex_for_rows = [
-            (
-                r"(0-*DATA SET NAME-*\s+)(SER NO\s+)(SEQNO\s+)(DATE.CRE\s+)(DATE.EXP\s+)"
-                r"(DATE.REF\s+)(EXT\s+)(DSORG\s+)(RECFM\s+)(OPTCD\s+)(BLKSIZE[ ]*)"
-            ),
-            (
-                r"(0SMS.IND\s+)(LRECL\s+)(KEYLEN\s+)(INITIAL ALLOC\s+)(2ND ALLOC\s+)"
-                r"(EXTEND\s+)(LAST BLK\(T-R-L\)\s+)(DIR.REM\s+)(F2 OR F3\(C-H-R\)\s+)(DSCB\(C-H-R\)[ ]*)"
-            ),
-            r"([ ]*EATTR[ ]*)",
-        ]
-        data_set_info.update(
-            self._parse_table_row(regex_for_rows[0], lines[0], lines[1])
-        )
-        data_set_info.update(
-            self._parse_table_row(regex_for_rows[1], lines[2], lines[3])
-        )
-        data_set_info.update(
-            self._parse_table_row(regex_for_rows[2], lines[4], lines[5])
-        )
-        data_set_info.update(self._parse_extents(lines[6:]))
-        return data_set_info
+        for index, regex in enumerate(TABLE_ROW_REGEXES):
+            data_set_info.update(
+                self._parse_table_row(regex, lines[index * 2], lines[index * 2 + 1])
+            )
+        return VtocEntry(data_set_info, lines[6:])
 
     def _parse_table_row(self, regex, header_row, data_row):
         """Parse out a single row of VTOC table information from
-        VTOCLIST output.
+        VTOCLIST output. Column positions are derived from the header
+        row once per page layout and reused for every following data row.
 
         Arguments:
-            regex {str} -- The regular expression used to parse table row.
+            regex {Pattern} -- The compiled regular expression used to parse the table header.
             header_row {str} -- The row of the table containing headers.
             data_row {str} -- The row of the table containing data.
 
         Returns:
             dict -- Structured data for the row of the table.
         """
-        table_data = {}
-        fields = re.findall(regex, header_row)
-
-        if len(fields) > 0:
-            if isinstance(fields[0], str):
-                fields = [[fields[0]]]
-            count = 0
-            for field in fields[0]:
-                end = count + len(field)
-                table_data[field.strip(" -0")] = data_row[count:end].strip()
-                count += len(field)
-        table_data = self._format_table_data(table_data)
-        return table_data
-
-    def _format_table_data(self, table_data):
-        """Perform additional formatting on table data.
-        This includes separating and renaming fields from
-        their original naming and style in VTOCLIST.
-
-        Arguments:
-            table_data {dict} -- Structured data parsed from VTOCLIST output.
-
-        Returns:
-            dict -- Updated data.
-        """
-        handlers = {
-            "DATA SET NAME": "data_set_name",
-            "SER NO": "volume",
-            "SEQNO": "sequence",
-            "DATE.CRE": "creation_date",
-            "DATE.EXP": "expiration_date",
-            "DATE.REF": "last_referenced_date",
-            "EXT": "number_of_extents",
-            "DSORG": "data_set_organization",
-            "RECFM": "record_format",
-            "OPTCD": "option_code",
-            "BLKSIZE": "block_size",
-            "SMS.IND": "sms_attributes",
-            "LRECL": "record_length",
-            "KEYLEN": "key_length",
-            "INITIAL ALLOC": "space_type",
-            "2ND ALLOC": "space_secondary",
-            "EXTEND": self._format_extend,
-            "LAST BLK(T-R-L)": {
-                "name": "last_block_pointer",
-                "func": self._format_last_blk,
-            },
-            "DIR.REM": "last_directory_block_bytes_used",
-            "F2 OR F3(C-H-R)": {
-                "name": "dscb_format_2_or_3",
-                "func": self._format_f2_or_f3,
-            },
-            "DSCB(C-H-R)": {"name": "dscb_format_1_or_8", "func": self._format_dscb},
-            "EATTR": "extended_attributes",
-        }
         formatted_table_data = {}
-        for key, value in table_data.items():
+        for start, end, name, formatter in self._table_row_layout(regex, header_row):
+            value = data_row[start:end].strip()
             if not value:
                 continue
-            updated_data_item = handlers.get(key, key)
-            if isinstance(updated_data_item, str):  # only need to update name
-                formatted_table_data[updated_data_item] = value
-            elif isinstance(
-                updated_data_item, dict
-            ):  # need to update value, name defined
-                updated_value = updated_data_item.get("func")(value)
-                if not updated_value:
-                    continue
-                formatted_table_data[updated_data_item.get("name")] = updated_value
-            else:  # need to determine name and value
-                formatted_table_data = updated_data_item(value, formatted_table_data)
+            if formatter is None:
+                formatted_table_data[name] = value
+            else:
+                self._format_field_value(name, formatter, value, formatted_table_data)
         return formatted_table_data
 
+    def _table_row_layout(self, regex, header_row):
+        """Determine the column offsets of a table row from its header row.
+        Layouts are cached by header row, since every data set on a
+        LISTVTOC page shares the same headers.
+
+        Arguments:
+            regex {Pattern} -- The compiled regular expression used to parse the table header.
+            header_row {str} -- The row of the table containing headers.
+
+        Returns:
+            tuple[tuple[int, int, str, str]] -- Start offset, end offset, result name
+            and formatter for each column, as described by TABLE_FIELDS.
+        """
+        key = (regex.pattern, header_row)
+        layout = _TABLE_ROW_LAYOUTS.get(key)
+        if layout is None:
+            layout = []
+            fields = regex.findall(header_row)
+            if len(fields) > 0:
+                if isinstance(fields[0], str):
+                    fields = [[fields[0]]]
+                count = 0
+                for field in fields[0]:
+                    end = count + len(field)
+                    field_name = field.strip(" -0")
+                    name, formatter = TABLE_FIELDS.get(field_name, (field_name, None))
+                    layout.append((count, end, name, formatter))
+                    count = end
+            layout = tuple(layout)
+            if len(_TABLE_ROW_LAYOUTS) >= MAX_CACHED_LAYOUTS:
+                _TABLE_ROW_LAYOUTS.clear()
+            _TABLE_ROW_LAYOUTS[key] = layout
+        return layout
+
+    def _format_field_value(self, name, formatter, value, formatted_table_data):
+        """Format the contents of a field which requires more than renaming.
+
+        Arguments:
+            name {str} -- The result name of the field, None if the formatter determines it.
+            formatter {str} -- The name of the method used to format the field contents.
+            value {str} -- The non-empty contents of the field.
+            formatted_table_data {dict} -- The dictionary containing already formatted table data.
+        """
+        if name is not None:  # need to update value, name defined
+            updated_value = getattr(self, formatter)(value)
+            if updated_value:
+                formatted_table_data[name] = updated_value
+        else:  # need to determine name and value
+            getattr(self, formatter)(value, formatted_table_data)
+
     def _format_extend(self, contents, formatted_table_data):
         """Format the extend field from VTOCLIST.
 
@@ -260,7 +800,7 @@ class VolumeTableOfContents(object):
         Returns:
             dict -- The updated formatted_table_data dictionary.
         """
-        matches = re.search(r"([0-9]+)(AV|BY|KB|MB)", contents)
+        matches = EXTEND_REGEX.search(contents)
         original_space_secondary = ""
         average_block_size = ""
         if matches:
@@ -288,7 +828,7 @@ class VolumeTableOfContents(object):
             dict -- Structured data parsed from last blk field contents.
         """
         result = None
-        matches = re.search(r"[ ]*([0-9]+)[ ]+([0-9]+)[ ]+([0-9]+)?", contents)
+        matches = LAST_BLK_REGEX.search(contents)
         if matches:
             result = {}
             result["track"] = matches.group(1)
@@ -307,7 +847,7 @@ class VolumeTableOfContents(object):
             dict -- Structured data parsed from the F2 or F3 field contents.
         """
         result = None
-        matches = re.search(r"[ ]*([0-9]+)[ ]+([0-9]+)[ ]+([0-9]+)", contents)
+        matches = CHR_REGEX.search(contents)
         if matches:
             result = {}
             result["cylinder"] = matches.group(1)
@@ -325,7 +865,7 @@ class VolumeTableOfContents(object):
             dict -- Structured data parsed from the dscb field contents.
         """
         result = None
-        matches = re.search(r"[ ]*([0-9]+)[ ]+([0-9]+)[ ]+([0-9]+)", contents)
+        matches = CHR_REGEX.search(contents)
         if matches:
             result = {}
             result["cylinder"] = matches.group(1)
@@ -333,85 +873,849 @@ class VolumeTableOfContents(object):
             result["record"] = matches.group(3)
         return result
 
-    def _parse_extents(self, lines):
+    @staticmethod
+    def _parse_extents(lines, as_strings=False):
         """Parse and structure extent data from VTOCLIST.
+        Each extent row is decoded in a single pass, using the column
+        positions of the extent header.
 
         Arguments:
-            contents {list[str]} -- Partial contents of single data set section
+            lines {list[str]} -- Partial contents of single data set section
             from VTOCLIST that will contain extent information if data set has
             extents.
 
+        Keyword Arguments:
+            as_strings {bool} -- Return each extent as a dictionary of strings,
+            as done before extents were decoded to integers. (default: {False})
+
         Returns:
-            list[dict] -- Structured data parsed from the extent field contents.
+            dict -- Holds the list of extents, empty when the data set has no extents.
         """
-        extents = []
-        if re.search(r"THE\sABOVE\sDATASET\sHAS\sNO\sEXTENTS", "".join(lines)):
+        if NO_EXTENTS_REGEX.search("".join(lines)):
             return {}
-        regex_for_extents_indent = (
-            r"(0\s*EXTENTS\s+)(?:(NO\s+)(LOW\(C-H\)\s+)(HIGH\(C-H\)[ ]*))"
-        )
-        regex_for_header_row = r"(NO\s+)(LOW\(C-H\)\s+)(HIGH\(C-H\)[ ]*)"
-        indent_group = re.findall(regex_for_extents_indent, lines[0])
-        indent_length = len(indent_group[0][0])
-        header_groups = re.findall(regex_for_header_row, lines[0])
-        regex_for_extents_data = self._extent_regex_builder(
-            indent_length, header_groups
-        )
-        extent_data = re.findall(regex_for_extents_data, "\n".join(lines), re.MULTILINE)
-        if len(extent_data) > 0:
-            extents = self._format_extent_data(extent_data)
+        indent, groups, row_lengths = VolumeTableOfContents._extent_layout(lines[0])
+        extents = []
+        for line in lines[1:]:
+            if (
+                len(line) not in row_lengths
+                or line[:indent].strip()
+                or not line[indent:].replace(" ", "").isdigit()
+            ):
+                continue
+            for number_start, low_start, high_start, end in groups:
+                if end > len(line):
+                    break
+                number = line[number_start:low_start].strip()
+                if not number:
+                    continue
+                low_cylinder, low_track = line[low_start:high_start].split()
+                high_cylinder, high_track = line[high_start:end].split()
+                low = CylinderHead(int(low_cylinder), int(low_track))
+                high = CylinderHead(int(high_cylinder), int(high_track))
+                extents.append(
+                    Extent(
+                        int(number),
+                        low,
+                        high,
+                        (high.cylinder - low.cylinder) * TRACKS_PER_CYLINDER
+                        + high.track
+                        - low.track
+                        + 1,
+                    )
+                )
+        if as_strings:
+            extents = [_extent_to_dict(extent) for extent in extents]
         return {"extents": extents}
 
-    def _extent_regex_builder(self, indent_length, header_groups):
-        """Build regular expressions for parsing extent information.
+    @staticmethod
+    def _extent_layout(header_row):
+        """Determine the column positions of extent rows from the extent header.
+        Layouts are cached by header row.
 
         Arguments:
-            indent_length {int} -- The number of spaces before extent information starts.
-            header_groups {list[tuple]} -- Captured output of header groups identified
-            during VTOCLIST parsing.
+            header_row {str} -- The extent header row of a data set section.
 
         Returns:
-            str -- The regular expression for parsing extent information.
+            tuple[int, list[tuple[int, int, int, int]], frozenset[int]] -- The number of
+            blanks before the first extent, the start of the extent number, low and high
+            columns and the end of each extent, and the lengths of valid extent rows.
         """
-        extent_regex = "^[ ]{{{0}}}".format(str(indent_length))
-        for index, header_group in enumerate(header_groups):
-            group_regex = "([ 0-9]{{{0}}})([ 0-9]{{{1}}})([ 0-9]{{{2}}})".format(
-                *[str(len(x)) for x in header_group]
-            )
-            if index > 0:
-                group_regex = "(?:{0}){{0,1}}".format(group_regex)
-            extent_regex += group_regex
-        extent_regex += "$"
-        return extent_regex
+        layout = _EXTENT_LAYOUTS.get(header_row)
+        if layout is None:
+            indent = len(EXTENTS_INDENT_REGEX.findall(header_row)[0][0])
+            groups = [
+                (match.start(1), match.start(2), match.start(3), match.end(3))
+                for match in EXTENTS_HEADER_REGEX.finditer(header_row)
+            ]
+            layout = (indent, groups, frozenset(group[3] for group in groups))
+            if len(_EXTENT_LAYOUTS) >= MAX_CACHED_LAYOUTS:
+                _EXTENT_LAYOUTS.clear()
+            _EXTENT_LAYOUTS[header_row] = layout
+        return layout
 
-    def _format_extent_data(self, extent_data):
-        """Format the dscb field from VTOCLIST.
+
+def _extent_to_dict(extent):
+    """Convert an extent to the dictionary of strings returned in module results.
+
+    Arguments:
+        extent {Extent} -- The extent to convert.
+
+    Returns:
+        dict -- The extent number and its low and high cylinder and track.
+    """
+    return {
+        "number": str(extent.number),
+        "low": {"cylinder": str(extent.low.cylinder), "track": str(extent.low.track)},
+        "high": {"cylinder": str(extent.high.cylinder), "track": str(extent.high.track)},
+    }
+
+
+class VtocEntry(object):
+    __slots__ = (
+        "data_set_name",
+        "volume",
+        "sequence",
+        "creation_date",
+        "expiration_date",
+        "last_referenced_date",
+        "number_of_extents",
+        "data_set_organization",
+        "record_format",
+        "option_code",
+        "block_size",
+        "sms_attributes",
+        "record_length",
+        "key_length",
+        "space_type",
+        "space_secondary",
+        "original_space_secondary",
+        "average_block_size",
+        "last_block_pointer",
+        "last_directory_block_bytes_used",
+        "dscb_format_2_or_3",
+        "dscb_format_1_or_8",
+        "extended_attributes",
+        "_extent_lines",
+        "_extents",
+    )
+
+    def __init__(self, fields=None, extent_lines=None):
+        """Data set information from a single data set section of
+        LISTVTOC output. Numeric fields are held as integers and pointers
+        as named tuples of integers, fields missing from the listing are None.
+        Extents are parsed from the raw extent lines when first requested.
+
+        Keyword Arguments:
+            fields {dict} -- Formatted table data, as produced by
+            VolumeTableOfContents._parse_table_row(). (default: {None})
+            extent_lines {list[str]} -- The lines of the data set section
+            following the table rows. (default: {None})
+        """
+        for name, value in (fields or {}).items():
+            if name in INTEGER_FIELDS:
+                if value.isdigit():
+                    value = int(value)
+            elif name in POINTER_FIELDS:
+                value = POINTER_FIELDS[name]._make(
+                    [int(value[key]) if key in value else None for key in POINTER_FIELDS[name]._fields]
+                )
+            setattr(self, name, value)
+        if extent_lines:
+            self._extent_lines = extent_lines
+
+    def __getattr__(self, name):
+        # only reached for fields never assigned, which were missing from the listing
+        if name in _VTOC_ENTRY_FIELDS:
+            return None
+        raise AttributeError(name)
+
+    @property
+    def extents(self):
+        """The extents of the data set, parsed on first access.
+
+        Raises:
+            VolumeTableOfContentsError: When the extent lines cannot be parsed.
+
+        Returns:
+            list[Extent] -- The extents of the data set, None when the data set has no extents.
+        """
+        if self._extent_lines is not None:
+            try:
+                self._extents = VolumeTableOfContents._parse_extents(
+                    self._extent_lines
+                ).get("extents")
+            except Exception as e:
+                raise VolumeTableOfContentsError(repr(e))
+            self._extent_lines = None
+        return self._extents
+
+    def to_dict(self):
+        """Convert the record to the dictionary of strings returned in module results.
+
+        Returns:
+            dict -- Holds data set information from VTOC.
+        """
+        data_set_info = {}
+        for name in VtocEntry.__slots__[:-2]:
+            value = self._result_value(name)
+            if value is not None:
+                data_set_info[name] = value
+        extents = self.get("extents")
+        if extents is not None:
+            data_set_info["extents"] = extents
+        return data_set_info
+
+    def get(self, name, default=None):
+        """Retrieve a field in the form returned in module results,
+        so records can be used where a dictionary is expected.
 
         Arguments:
-            extent_data {list[tuple]} -- Captured output of extent data.
+            name {str} -- The result name of the field.
+
+        Keyword Arguments:
+            default -- Returned when the field is not present. (default: {None})
 
         Returns:
-            dict -- Structured data parsed from captured output of extent data.
+            The field contents, or default when the field is not present.
         """
-        extents = []
-        flattened_extent_data = []
-        for extent in extent_data:
-            reduced_extent = [x.strip() for x in extent if x.strip() != ""]
-            flattened_extent_data = flattened_extent_data + reduced_extent
-        for index in range(int(len(flattened_extent_data) / 3)):
-            position = index * 3
-            extent = {}
-            extent["number"] = flattened_extent_data[position]
-            low = re.search(
-                r"[ ]*([0-9]+)[ ]+([0-9]+)", flattened_extent_data[position + 1]
+        if name == "extents":
+            value = self.extents
+            if value is not None:
+                value = [_extent_to_dict(extent) for extent in value]
+        elif name in VtocEntry.__slots__ and not name.startswith("_"):
+            value = self._result_value(name)
+        else:
+            value = None
+        return default if value is None else value
+
+    def __getitem__(self, name):
+        value = self.get(name)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __contains__(self, name):
+        return self.get(name) is not None
+
+    def _result_value(self, name):
+        """Convert a single field back to its form in module results.
+
+        Arguments:
+            name {str} -- The result name of the field.
+
+        Returns:
+            str or dict -- The field contents, None when the field is not present.
+        """
+        value = getattr(self, name)
+        if value is None or isinstance(value, str):
+            return value
+        if isinstance(value, tuple):
+            return dict(
+                (key, str(item)) for key, item in value._asdict().items() if item is not None
             )
-            extent["low"] = {"cylinder": low.group(1), "track": low.group(2)}
-            high = re.search(
-                r"[ ]*([0-9]+)[ ]+([0-9]+)", flattened_extent_data[position + 2]
+        return str(value)
+
+    def _serialize(self):
+        """Convert the record to a list of values, in the order of __slots__,
+        which can be stored as JSON.
+
+        Returns:
+            list -- The value of every field of the record.
+        """
+        return [getattr(self, name) for name in VtocEntry.__slots__]
+
+    @classmethod
+    def _deserialize(cls, values):
+        """Rebuild a record from values produced by _serialize().
+
+        Arguments:
+            values {list} -- The value of every field of the record.
+
+        Raises:
+            ValueError: When values were not produced by _serialize().
+            TypeError: When a value has the wrong type for its field.
+
+        Returns:
+            VtocEntry -- The rebuilt record.
+        """
+        if not isinstance(values, list) or len(values) != len(VtocEntry.__slots__):
+            raise ValueError("Invalid serialized VTOC entry {0!r}".format(values))
+        data_set = cls()
+        for name, value in zip(VtocEntry.__slots__, values):
+            if value is None:
+                continue
+            if name in POINTER_FIELDS:
+                value = POINTER_FIELDS[name]._make(value)
+            elif name == "_extents":
+                value = [
+                    Extent(number, CylinderHead(*low), CylinderHead(*high), tracks)
+                    for number, low, high, tracks in value
+                ]
+            setattr(data_set, name, value)
+        return data_set
+
+    def __eq__(self, other):
+        if not isinstance(other, VtocEntry):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "VtocEntry(data_set_name={0!r}, volume={1!r})".format(
+            self.data_set_name, self.volume
+        )
+
+
+_VTOC_ENTRY_FIELDS = frozenset(VtocEntry.__slots__)
+
+
+class VolumeContents(list):
+    def __init__(self, data_sets=None):
+        """List of data set records from a VTOC listing which also
+        maintains an index by data set name and by high level qualifier.
+        Behaves as a regular list, the indexes are built on first lookup
+        and rebuilt after the list is modified.
+
+        Keyword Arguments:
+            data_sets {list[VtocEntry]} -- Initial data set records. (default: {None})
+        """
+        super(VolumeContents, self).__init__(data_sets or [])
+        # volumes which could not be listed, mapped to the reason
+        self.errors = {}
+        self._names = None
+        self._qualifiers = None
+
+    def find(self, data_set_name):
+        """Retrieve the record for a data set by name.
+
+        Arguments:
+            data_set_name {str} -- The name of the data set to retrieve information for.
+
+        Returns:
+            VtocEntry -- The information for the data set, or None if not present.
+        """
+        if self._names is None:
+            self._build_index()
+        return self._names.get(data_set_name.upper())
+
+    def find_by_pattern(self, pattern):
+        """Retrieve all records whose data set name matches a pattern.
+        Patterns follow the usual z/OS conventions, "*" matches within a
+        single qualifier, "**" matches any number of qualifiers, including
+        none, and "%"
+        matches a single character.
+
+        Arguments:
+            pattern {str} -- The data set name pattern. (e.g "USER.PRIV*.**")
+
+        Returns:
+            list[VtocEntry] -- The matching records, in listing order.
+        """
+        if self._qualifiers is None:
+            self._build_index()
+        pattern = pattern.upper()
+        high_level_qualifier = pattern.split(".")[0]
+        if "*" in high_level_qualifier or "%" in high_level_qualifier:
+            candidates = self
+        else:
+            candidates = self._qualifiers.get(high_level_qualifier, [])
+        regex = re.compile(_data_set_pattern_to_regex(pattern))
+        return [
+            data_set
+            for data_set in candidates
+            if regex.match(data_set.get("data_set_name", ""))
+        ]
+
+    def _build_index(self):
+        """Build the name and high level qualifier indexes."""
+        names = {}
+        qualifiers = {}
+        for data_set in self:
+            name = data_set.get("data_set_name", "")
+            names.setdefault(name, data_set)
+            qualifiers.setdefault(name.split(".")[0], []).append(data_set)
+        self._names = names
+        self._qualifiers = qualifiers
+
+    def _reset_index(self):
+        """Drop the indexes, called after every change to the list."""
+        self._names = None
+        self._qualifiers = None
+
+
+# every list method which changes the contents, clear() and __setslice__ only
+# exist on some Python versions
+_LIST_MUTATORS = (
+    "append", "extend", "insert", "remove", "pop", "clear", "sort", "reverse",
+    "__setitem__", "__delitem__", "__iadd__", "__imul__",
+    "__setslice__", "__delslice__",
+)
+
+
+def _resetting_index(name):
+    """Wrap a list method so that VolumeContents indexes are reset after the
+    list is modified.
+
+    Arguments:
+        name {str} -- The name of the list method.
+
+    Returns:
+        function -- The wrapped method.
+    """
+    method = getattr(list, name)
+
+    def wrapper(self, *args, **kwargs):
+        result = method(self, *args, **kwargs)
+        self._reset_index()
+        return result
+
+    wrapper.__name__ = name
+    return wrapper
+
+
+for _name in _LIST_MUTATORS:
+    if hasattr(list, _name):
+        setattr(VolumeContents, _name, _resetting_index(_name))
+
+
+def _data_set_pattern_to_regex(pattern):
+    """Convert a data set name pattern to a regular expression.
+
+    Arguments:
+        pattern {str} -- The data set name pattern.
+
+    Returns:
+        str -- The equivalent regular expression.
+    """
+    regex = ""
+    index = 0
+    while index < len(pattern):
+        # "**" also matches zero qualifiers, along with the period around it
+        if pattern.startswith(".**", index):
+            regex += r"(\..*)?"
+            index += 3
+            continue
+        if index == 0 and pattern.startswith("**.", index):
+            regex += r"(.*\.)?"
+            index += 3
+            continue
+        if pattern.startswith("**", index):
+            regex += ".*"
+            index += 2
+            continue
+        char = pattern[index]
+        if char == "*":
+            regex += "[^.]*"
+        elif char == "%":
+            regex += "[^.]"
+        else:
+            regex += re.escape(char)
+        index += 1
+    return regex + "$"
+
+
+class VolumeSpaceMap(object):
+    def __init__(self, data_sets, cylinders, tracks_per_cylinder=TRACKS_PER_CYLINDER):
+        """Allocated and free space on a volume, built by merging the extents
+        of every data set in its VTOC. Free areas are indexed by the number of
+        whole cylinders they hold, so fit checks only need a binary search.
+
+        Space used by the volume label and by the VTOC itself is not described
+        by any data set extent, and is reported as free.
+
+        Arguments:
+            data_sets {list[VtocEntry]} -- Records for every data set on the volume,
+            as returned by VolumeTableOfContents.get_volume_entry().
+            cylinders {int} -- The number of cylinders on the volume.
+
+        Keyword Arguments:
+            tracks_per_cylinder {int} -- Tracks per cylinder of the device.
+            (default: {TRACKS_PER_CYLINDER})
+        """
+        self.cylinders = cylinders
+        self.tracks_per_cylinder = tracks_per_cylinder
+        total_tracks = cylinders * tracks_per_cylinder
+        intervals = sorted(
+            (
+                extent.low.cylinder * tracks_per_cylinder + extent.low.track,
+                extent.high.cylinder * tracks_per_cylinder + extent.high.track,
             )
-            extent["high"] = {"cylinder": high.group(1), "track": high.group(2)}
-            extents.append(extent)
-        return extents
+            for data_set in data_sets
+            for extent in (data_set.extents or [])
+        )
+        allocated = []
+        for start, end in intervals:
+            if allocated and start <= allocated[-1][1] + 1:
+                allocated[-1][1] = max(allocated[-1][1], end)
+            else:
+                allocated.append([start, end])
+        self.free_extents = []
+        position = 0
+        for start, end in allocated + [[total_tracks, total_tracks]]:
+            start = min(start, total_tracks)
+            if start > position:
+                self.free_extents.append(self._free_extent(position, start - 1))
+            position = max(position, end + 1)
+        self.free_tracks = sum(extent.tracks for extent in self.free_extents)
+        self.largest_free_extent = max(
+            self.free_extents, key=lambda extent: extent.tracks, default=None
+        )
+        self._free_cylinders = sorted(
+            self._whole_cylinders(extent) for extent in self.free_extents
+        )
+
+    @property
+    def largest_free_cylinders(self):
+        """The number of whole cylinders in the largest contiguous free area.
+
+        Returns:
+            int -- The number of cylinders.
+        """
+        return self._free_cylinders[-1] if self._free_cylinders else 0
+
+    @property
+    def fragmentation_index(self):
+        """Measure of how scattered the free space on the volume is,
+        from 0 when all free space is contiguous up towards 1000 as it is
+        split into smaller areas.
+
+        Returns:
+            int -- The fragmentation index.
+        """
+        if not self.free_tracks:
+            return 0
+        return int(1000 * (1 - self.largest_free_extent.tracks / self.free_tracks))
+
+    def fits(self, cylinders, extents=1):
+        """Determine whether an allocation of whole cylinders fits in the
+        free space of the volume.
+
+        Arguments:
+            cylinders {int} -- The number of cylinders to allocate.
+
+        Keyword Arguments:
+            extents {int} -- The number of free areas the allocation may be
+            split over. (default: {1})
+
+        Returns:
+            bool -- If the allocation fits.
+        """
+        if extents <= 1:
+            return bisect_left(self._free_cylinders, cylinders) < len(self._free_cylinders)
+        return sum(self._free_cylinders[-extents:]) >= cylinders
+
+    def _free_extent(self, start, end):
+        """Build a free extent from absolute track numbers.
+
+        Arguments:
+            start {int} -- The first free track.
+            end {int} -- The last free track.
+
+        Returns:
+            FreeExtent -- The free area.
+        """
+        return FreeExtent(
+            CylinderHead(*divmod(start, self.tracks_per_cylinder)),
+            CylinderHead(*divmod(end, self.tracks_per_cylinder)),
+            end - start + 1,
+        )
+
+    def _whole_cylinders(self, extent):
+        """Count the complete cylinders within a free extent.
+
+        Arguments:
+            extent {FreeExtent} -- The free area.
+
+        Returns:
+            int -- The number of cylinders.
+        """
+        first = extent.low.cylinder + (1 if extent.low.track else 0)
+        last = extent.high.cylinder - (
+            0 if extent.high.track == self.tracks_per_cylinder - 1 else 1
+        )
+        return max(0, last - first + 1)
+
+
+class VolumeTableOfContentsCache(object):
+    # snapshots are only kept for the life of the process
+    persistent = False
+
+    def __init__(self, ttl=DEFAULT_SNAPSHOT_TTL):
+        """Hold VTOC snapshots keyed by volume serial so multiple
+        lookups against the same volume only require a single LISTVTOC.
+
+        Keyword Arguments:
+            ttl {int} -- Number of seconds a snapshot remains valid.
+            None disables expiration. (default: {DEFAULT_SNAPSHOT_TTL})
+        """
+        self.ttl = ttl
+        self._snapshots = {}
+        self._data_sets = {}
+
+    def get(self, volume):
+        """Retrieve the snapshot for a volume if present and not expired.
+
+        Arguments:
+            volume {str} -- The name of the volume.
+
+        Returns:
+            VolumeContents -- The cached VTOC information, or None when no valid snapshot exists.
+        """
+        key = volume.upper()
+        snapshot = self._snapshots.get(key)
+        if snapshot is None:
+            return None
+        taken, data_sets = snapshot
+        if self.ttl is not None and monotonic() - taken > self.ttl:
+            del self._snapshots[key]
+            return None
+        return data_sets
+
+    def put(self, volume, data_sets):
+        """Store a snapshot for a volume.
+
+        Arguments:
+            volume {str} -- The name of the volume.
+            data_sets {VolumeContents} -- VTOC information for the volume.
+        """
+        self._snapshots[volume.upper()] = (monotonic(), data_sets)
+
+    def get_data_sets(self, volume):
+        """Retrieve the data sets of a volume listed by name, if not expired.
+
+        Arguments:
+            volume {str} -- The name of the volume.
+
+        Returns:
+            dict[str, VtocEntry] -- The VTOC information keyed by data set name,
+            None for data sets not found on the volume. None when no data sets
+            of the volume have been listed by name.
+        """
+        key = volume.upper()
+        listed = self._data_sets.get(key)
+        if listed is None:
+            return None
+        taken, data_sets = listed
+        if self.ttl is not None and monotonic() - taken > self.ttl:
+            del self._data_sets[key]
+            return None
+        return data_sets
+
+    def put_data_sets(self, volume, data_sets):
+        """Store the data sets of a volume listed by name, together with
+        those listed earlier. Only kept for the life of the process.
+
+        Arguments:
+            volume {str} -- The name of the volume.
+            data_sets {dict[str, VtocEntry]} -- The VTOC information keyed by
+            data set name, None for data sets not found on the volume.
+        """
+        key = volume.upper()
+        listed = self.get_data_sets(key)
+        if listed is None:
+            self._data_sets[key] = (monotonic(), dict(data_sets))
+        else:
+            listed.update(data_sets)
+
+    def invalidate(self, volume=None):
+        """Discard cached snapshots. Should be called after any operation
+        that may change the contents of a VTOC.
+
+        Keyword Arguments:
+            volume {str} -- The volume to invalidate. When not provided,
+            all snapshots are discarded. (default: {None})
+        """
+        if volume is None:
+            self._snapshots.clear()
+            self._data_sets.clear()
+        else:
+            self._snapshots.pop(volume.upper(), None)
+            self._data_sets.pop(volume.upper(), None)
+
+
+class PersistentVolumeTableOfContentsCache(VolumeTableOfContentsCache):
+    persistent = True
+
+    def __init__(self, directory, max_age=DEFAULT_SNAPSHOT_TTL, max_size=DEFAULT_CACHE_MAX_SIZE):
+        """Hold VTOC snapshots in a USS directory so they can be reused
+        by later module runs. Each volume is kept in its own compressed
+        file, written atomically. When the files in the directory grow past
+        max_size the least recently written snapshots are removed.
+
+        Problems reading or writing the directory are not reported, the
+        volume is simply listed again.
+
+        Arguments:
+            directory {str} -- The USS directory holding the snapshots.
+
+        Keyword Arguments:
+            max_age {int} -- Number of seconds a snapshot remains valid.
+            None disables expiration. (default: {DEFAULT_SNAPSHOT_TTL})
+            max_size {int} -- Number of bytes all snapshots together may occupy.
+            (default: {DEFAULT_CACHE_MAX_SIZE})
+        """
+        super(PersistentVolumeTableOfContentsCache, self).__init__(ttl=max_age)
+        self.directory = directory
+        self.max_size = max_size
+
+    def get(self, volume):
+        """Retrieve the snapshot for a volume from memory or disk,
+        if present and not expired.
+
+        Arguments:
+            volume {str} -- The name of the volume.
+
+        Returns:
+            VolumeContents -- The cached VTOC information, or None when no valid snapshot exists.
+        """
+        data_sets = super(PersistentVolumeTableOfContentsCache, self).get(volume)
+        if data_sets is None:
+            snapshot = self._read(volume)
+            if snapshot is not None:
+                age, data_sets = snapshot
+                # keep the age of the snapshot on disk so it expires at the same time
+                self._snapshots[volume.upper()] = (monotonic() - age, data_sets)
+        return data_sets
+
+    def put(self, volume, data_sets):
+        """Store a snapshot for a volume in memory and on disk.
+
+        Arguments:
+            volume {str} -- The name of the volume.
+            data_sets {VolumeContents} -- VTOC information for the volume.
+        """
+        super(PersistentVolumeTableOfContentsCache, self).put(volume, data_sets)
+        try:
+            self._write(volume, data_sets)
+            self._evict()
+        except (OSError, IOError):
+            pass
+
+    def invalidate(self, volume=None):
+        """Discard cached snapshots, in memory and on disk.
+
+        Keyword Arguments:
+            volume {str} -- The volume to invalidate. When not provided,
+            all snapshots are discarded. (default: {None})
+        """
+        super(PersistentVolumeTableOfContentsCache, self).invalidate(volume)
+        if volume is None:
+            paths = [path for path, dummy in self._snapshot_files()]
+        else:
+            paths = [self._path(volume)]
+        for path in paths:
+            self._remove(path)
+
+    def _path(self, volume):
+        return os.path.join(self.directory, volume.upper() + CACHE_FILE_SUFFIX)
+
+    def _read(self, volume):
+        """Load the snapshot for a volume from disk.
+
+        Arguments:
+            volume {str} -- The name of the volume.
+
+        Returns:
+            tuple[float, VolumeContents] -- The age of the snapshot in seconds
+            and its contents, None when there is no valid snapshot. A snapshot
+            which cannot be loaded is removed and treated as missing.
+        """
+        path = self._path(volume)
+        try:
+            with open(path, "rb") as snapshot_file:
+                age = time() - os.fstat(snapshot_file.fileno()).st_mtime
+                if self.ttl is not None and age > self.ttl:
+                    snapshot = None
+                else:
+                    snapshot = json.loads(zlib.decompress(snapshot_file.read()).decode("utf-8"))
+        except (OSError, IOError) as e:
+            if e.errno != errno.ENOENT:
+                self._remove(path)
+            return None
+        except (ValueError, zlib.error):
+            snapshot = None
+        data_sets = None
+        if (
+            isinstance(snapshot, dict)
+            and snapshot.get("version") == CACHE_FORMAT_VERSION
+            and snapshot.get("fields") == list(VtocEntry.__slots__)
+            and isinstance(snapshot.get("data_sets"), list)
+        ):
+            try:
+                data_sets = VolumeContents(
+                    [VtocEntry._deserialize(values) for values in snapshot.get("data_sets")]
+                )
+            except (TypeError, ValueError):
+                data_sets = None
+        if data_sets is None:
+            self._remove(path)
+            return None
+        return age, data_sets
+
+    def _write(self, volume, data_sets):
+        """Write the snapshot for a volume to disk, replacing any previous one.
+
+        Arguments:
+            volume {str} -- The name of the volume.
+            data_sets {VolumeContents} -- VTOC information for the volume.
+        """
+        snapshot = {
+            "version": CACHE_FORMAT_VERSION,
+            "fields": list(VtocEntry.__slots__),
+            "data_sets": [data_set._serialize() for data_set in data_sets],
+        }
+        contents = zlib.compress(json.dumps(snapshot, separators=(",", ":")).encode("utf-8"))
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory, 0o700)
+        fd, temporary_path = mkstemp(suffix=".tmp", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as snapshot_file:
+                snapshot_file.write(contents)
+            os.rename(temporary_path, self._path(volume))
+        except Exception:
+            self._remove(temporary_path)
+            raise
+
+    def _evict(self):
+        """Remove the oldest snapshots until all snapshots fit in max_size bytes."""
+        snapshots = sorted(self._snapshot_files(), key=lambda snapshot: snapshot[1].st_mtime)
+        size = sum(stats.st_size for dummy, stats in snapshots)
+        for path, stats in snapshots:
+            if size <= self.max_size:
+                break
+            self._remove(path)
+            size -= stats.st_size
+
+    def _snapshot_files(self):
+        """Find the snapshots stored in the cache directory.
+
+        Returns:
+            list[tuple[str, stat_result]] -- The path and status of each snapshot file.
+        """
+        snapshots = []
+        try:
+            names = os.listdir(self.directory)
+        except (OSError, IOError):
+            return snapshots
+        for name in names:
+            if name.endswith(CACHE_FILE_SUFFIX):
+                path = os.path.join(self.directory, name)
+                try:
+                    snapshots.append((path, os.stat(path)))
+                except (OSError, IOError):
+                    pass
+        return snapshots
+
+    def _remove(self, path):
+        try:
+            os.remove(path)
+        except (OSError, IOError):
+            pass
 
 
 class VolumeTableOfContentsError(Exception):
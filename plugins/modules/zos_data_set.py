@@ -143,6 +143,29 @@ options:
     required: false
     default: false
     version_added: "2.9"
+  vtoc_cache_dir:
+    description:
+      - >
+        A USS directory where volume table of contents listings are kept between module runs.
+        When provided, listings of a volume taken by previous tasks are reused instead of
+        listing the volume again.
+      - The directory is created if it does not exist.
+      - If not provided, listings are only reused within a single module run.
+    type: path
+    required: false
+    version_added: "2.9"
+  vtoc_cache_max_age:
+    description:
+      - >
+        The number of seconds a volume table of contents listing kept in I(vtoc_cache_dir)
+        remains valid.
+      - >
+        Listings are also discarded when M(zos_data_set) changes the volume,
+        but not when the volume is changed by other means.
+    type: int
+    required: false
+    default: 300
+    version_added: "2.9"
   batch:
     description:
       - Batch can be used to perform operations on multiple data sets in a single module call.
@@ -370,6 +393,14 @@ EXAMPLES = r"""
   zos_data_set:
     name: user.private.libs
     state: uncataloged
+
+- name: Catalog a data set present on volume 222222, reusing volume listings taken in the last 10 minutes.
+  zos_data_set:
+    name: user.private.libs
+    state: cataloged
+    volume: "222222"
+    vtoc_cache_dir: /tmp/vtoc_cache
+    vtoc_cache_max_age: 600
 """
 RETURN = r"""
 message:
@@ -395,7 +426,10 @@ import tempfile
 from math import ceil
 from collections import OrderedDict
 from ansible_collections.ibm.ibm_zos_core.plugins.module_utils.vtoc import (
+    MAX_DATA_SET_NAME_LENGTH,
+    PersistentVolumeTableOfContentsCache,
     VolumeTableOfContents,
+    VolumeTableOfContentsCache,
 )
 
 try:
@@ -735,6 +769,14 @@ class DataSetHandler(object):
         """
 
         self.module = module
+        if module.params.get("vtoc_cache_dir"):
+            cache = PersistentVolumeTableOfContentsCache(
+                module.params.get("vtoc_cache_dir"),
+                module.params.get("vtoc_cache_max_age"),
+            )
+        else:
+            cache = VolumeTableOfContentsCache()
+        self.vtoc = VolumeTableOfContents(module, cache)
 
     def perform_data_set_operations(self, name, state, **extra_args):
         """ Calls functions to perform desired operations on
@@ -762,12 +804,15 @@ class DataSetHandler(object):
         present, changed = self._attempt_catalog_if_necessary(
             name, extra_args.get("volume")
         )
-        if present:
-            if not replace:
-                return changed
-            self._replace_data_set(name, ds_create_args)
-        else:
-            self._create_data_set(name, ds_create_args)
+        if present and not replace:
+            return changed
+        try:
+            if present:
+                self._replace_data_set(name, ds_create_args)
+            else:
+                self._create_data_set(name, ds_create_args)
+        finally:
+            self.vtoc.cache.invalidate()
         return True
 
     def _ensure_data_set_absent(self, name, **extra_args):
@@ -777,7 +822,10 @@ class DataSetHandler(object):
             name, extra_args.get("volume")
         )
         if present:
-            self._delete_data_set(name)
+            try:
+                self._delete_data_set(name)
+            finally:
+                self.vtoc.cache.invalidate()
             return True
         return False
 
@@ -917,18 +965,27 @@ class DataSetHandler(object):
         Returns:
             bool -- If data set was found in table of contents for volume.
         """
-        vtoc = VolumeTableOfContents(self.module)
-        data_sets = vtoc.get_volume_entry(volume)
-        data_set = VolumeTableOfContents.find_data_set_in_volume_output(name, data_sets)
-        if data_set is not None:
-            return True
-        vsam_name = name + ".data"
-        vsam_data_set = VolumeTableOfContents.find_data_set_in_volume_output(
-            vsam_name, data_sets
+        data_sets = self.vtoc.get_data_set_entries(
+            self._vtoc_lookup_names(name), volume
         )
-        if vsam_data_set is not None:
-            return True
-        return False
+        return bool(data_sets)
+
+    def _vtoc_lookup_names(self, name):
+        """Get the names to look up in a VTOC for a data set. A VSAM cluster
+        has no VTOC entry of its own, so its data component is looked up as well,
+        unless that name would be too long to exist.
+
+        Arguments:
+            name {str} -- The name of the data set.
+
+        Returns:
+            list[str] -- The names to look up.
+        """
+        name = name.upper()
+        vsam_name = name + ".DATA"
+        if len(vsam_name) > MAX_DATA_SET_NAME_LENGTH:
+            return [name]
+        return [name, vsam_name]
 
     def _replace_data_set(self, name, extra_args):
         """Attempts to replace an existing data set.
@@ -1004,10 +1061,13 @@ class DataSetHandler(object):
             name {str} -- The name of the data set to catalog
             volume {str} -- The volume the data set resides on
         """
-        if self._is_data_set_vsam(name, volume):
-            self._catalog_vsam_data_set(name, volume)
-        else:
-            self._catalog_non_vsam_data_set(name, volume)
+        try:
+            if self._is_data_set_vsam(name, volume):
+                self._catalog_vsam_data_set(name, volume)
+            else:
+                self._catalog_non_vsam_data_set(name, volume)
+        finally:
+            self.vtoc.cache.invalidate(volume)
 
     def _catalog_non_vsam_data_set(self, name, volume):
         """Catalog a non-VSAM data set.
@@ -1097,10 +1157,13 @@ class DataSetHandler(object):
         Arguments:
             name {str} -- The name of the data set to uncatalog.
         """
-        if self._is_data_set_vsam(name):
-            self._uncatalog_vsam_data_set(name)
-        else:
-            self._uncatalog_non_vsam_data_set(name)
+        try:
+            if self._is_data_set_vsam(name):
+                self._uncatalog_vsam_data_set(name)
+            else:
+                self._uncatalog_non_vsam_data_set(name)
+        finally:
+            self.vtoc.cache.invalidate()
         return
 
     def _uncatalog_non_vsam_data_set(self, name):
@@ -1185,9 +1248,10 @@ class DataSetHandler(object):
         Returns:
             bool -- If the data set is VSAM.
         """
-        vtoc = VolumeTableOfContents(self.module)
-        data_sets = vtoc.get_volume_entry(volume)
-        vsam_name = name + ".DATA"
+        vsam_name = name.upper() + ".DATA"
+        data_sets = self.vtoc.get_data_set_entries(
+            self._vtoc_lookup_names(name), volume
+        )
         data_set = VolumeTableOfContents.find_data_set_in_volume_output(
             vsam_name, data_sets
         )
@@ -1196,7 +1260,7 @@ class DataSetHandler(object):
                 name, data_sets
             )
         if data_set is not None:
-            if data_set.get("data_set_organization", "") == "VS":
+            if data_set.data_set_organization == "VS":
                 return True
         return False
 
@@ -1311,6 +1375,8 @@ def run_module():
         # ),
         replace=dict(type="bool", default=False,),
         volume=dict(type="str", required=False),
+        vtoc_cache_dir=dict(type="path", required=False),
+        vtoc_cache_max_age=dict(type="int", default=300),
         # unsafe_writes=dict(
         #     type='bool',
         #     default=False
@@ -1338,10 +1404,11 @@ def run_module():
 
     try:
         data_set_param_list = get_individual_data_set_parameters(module.params)
+        # a single handler is shared so VTOC snapshots are reused across the batch
+        data_set_handler = DataSetHandler(module)
 
         for data_set_params in data_set_param_list:
             parameters = process_special_parameters(data_set_params, parameter_handlers)
-            data_set_handler = DataSetHandler(module)
             result["changed"] = data_set_handler.perform_data_set_operations(
                 **parameters
             ) or result.get("changed", False)
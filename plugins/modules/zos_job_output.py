@@ -30,6 +30,11 @@ description:
     like "*".
   - If there is no ddname, or if ddname="?", output of all the ddnames under
     the given job will be displayed.
+  - The lines displayed for each ddname can be limited with I(start_line),
+    I(max_lines) and I(tail_lines), lines outside of the selection are not
+    read from the spool.
+  - With I(search), only the lines matching the search, and any requested
+    lines around them, are returned along with their line numbers.
 version_added: "2.9"
 author: "Jack Ho (@jacklotusho)"
 options:
@@ -54,6 +59,58 @@ options:
       - Data definition name. (e.g "JESJCL", "?")
     type: str
     required: false
+  start_line:
+    description:
+      - The first line of each data definition to display, starting at 1.
+      - When not provided, lines are displayed from the first line.
+      - Mutually exclusive with I(tail_lines).
+    type: int
+    required: false
+  max_lines:
+    description:
+      - The maximum number of lines to display for each data definition.
+      - When not provided, or 0, all remaining lines are displayed.
+    type: int
+    required: false
+  tail_lines:
+    description:
+      - Display only the last I(tail_lines) lines of each data definition.
+      - When not provided, or 0, lines are displayed from I(start_line).
+      - Mutually exclusive with I(start_line).
+    type: int
+    required: false
+  search:
+    description:
+      - A regular expression the displayed lines must match.
+      - The search is applied to the lines selected by I(start_line),
+        I(max_lines) and I(tail_lines).
+    type: str
+    required: false
+  search_literal:
+    description:
+      - Treat I(search) as a literal string instead of a regular expression.
+    type: bool
+    required: false
+    default: false
+  search_before:
+    description:
+      - The number of lines to display before each line matching I(search).
+    type: int
+    required: false
+  search_after:
+    description:
+      - The number of lines to display after each line matching I(search).
+    type: int
+    required: false
+  cursors:
+    description:
+      - The I(cursor) values returned for data definitions by an earlier
+        call.
+      - Only the lines written to those data definitions since that call are
+        displayed, which allows the output of a running job to be followed.
+    type: list
+    elements: str
+    required: false
 """
 
 EXAMPLES = r"""
@@ -72,6 +129,30 @@ EXAMPLES = r"""
     job_name: "*"
     owner: "IBMUSER"
     ddname: "?"
+
+- name: Last 200 lines of SYSPRINT
+  zos_job_output:
+    job_id: "JOB01234"
+    ddname: "SYSPRINT"
+    tail_lines: 200
+
+- name: First 20 lines of the job log
+  zos_job_output:
+    job_id: "JOB01234"
+    ddname: "JESMSGLG"
+    max_lines: 20
+
+- name: Allocation messages and the line following each of them
+  zos_job_output:
+    job_id: "JOB01234"
+    search: "^ IEF2[0-9]{2}I"
+    search_after: 1
+
+- name: Follow the SYSPRINT of a running job
+  zos_job_output:
+    job_id: "JOB01234"
+    ddname: "SYSPRINT"
+    cursors: "{{ previous_output.jobs | map(attribute='ddnames') | flatten | map(attribute='cursor') | list }}"
 """
 
 RETURN = r"""
@@ -165,6 +246,21 @@ jobs:
                "         6 //SYSUT2   DD SYSOUT=*                                                          ",
                "         7 //                                                                              "
              ]
+        line_numbers:
+          description:
+             The line number of each line in I(content). Only returned when
+             I(search) is used.
+          type: list
+          elements: int
+          sample: [ 7, 8 ]
+        cursor:
+          description:
+             Opaque position following the last line read from the data
+             definition, to be passed in I(cursors) to read only newer
+             lines. Also returned when no lines were read, in which case it
+             points at the first line of the requested window.
+          type: str
+          sample: JOB00134/102/5
     ret_code:
       description:
          Return code output collected from job log.
@@ -339,20 +435,54 @@ def run_module():
         job_name=dict(type="str", required=False),
         owner=dict(type="str", required=False),
         ddname=dict(type="str", required=False),
+        start_line=dict(type="int", required=False),
+        max_lines=dict(type="int", required=False),
+        tail_lines=dict(type="int", required=False),
+        search=dict(type="str", required=False),
+        search_literal=dict(type="bool", required=False, default=False),
+        search_before=dict(type="int", required=False),
+        search_after=dict(type="int", required=False),
+        cursors=dict(type="list", elements="str", required=False),
     )
 
-    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+    module = AnsibleModule(
+        argument_spec=module_args,
+        mutually_exclusive=[["start_line", "tail_lines"]],
+        supports_check_mode=True,
+    )
 
     job_id = module.params.get("job_id")
     job_name = module.params.get("job_name")
     owner = module.params.get("owner")
     ddname = module.params.get("ddname")
+    start_line = module.params.get("start_line")
+    max_lines = module.params.get("max_lines")
+    tail_lines = module.params.get("tail_lines")
+    search = module.params.get("search")
+    search_literal = module.params.get("search_literal")
+    search_before = module.params.get("search_before")
+    search_after = module.params.get("search_after")
+    cursors = module.params.get("cursors")
 
     if not job_id and not job_name and not owner:
         module.fail_json(msg="Please provide a job_id or job_name or owner")
 
     try:
-        results = job_output(module, job_id, owner, job_name, ddname)
+        results = job_output(
+            module,
+            job_id,
+            owner,
+            job_name,
+            ddname,
+            start_line=start_line,
+            max_lines=max_lines,
+            tail_lines=tail_lines,
+            search=search,
+            search_literal=search_literal,
+            search_before=search_before,
+            search_after=search_after,
+            cursors=cursors,
+        )
         results["changed"] = False
     except Exception as e:
         module.fail_json(msg=repr(e))
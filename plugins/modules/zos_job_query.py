@@ -141,6 +141,14 @@ try:
 except Exception:
     Jobs = ""
 from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.ibm.ibm_zos_core.plugins.module_utils.job import (
+    JOB_STATUS_ABEND,
+    JOB_STATUS_ACTIVE,
+    JOB_STATUS_CANCELED,
+    JOB_STATUS_CC,
+    JOB_STATUS_JCLERR,
+    classify_job_status,
+)
 import re
 from time import sleep
 
@@ -223,33 +231,23 @@ def query_jobs(params, count=0):
 
 def parsing_jobs(jobs_raw):
     jobs = []
-    status = ""
     ret_code = {}
     for job in jobs_raw:
         status_raw = job.get("status")
-        if "AC" in status_raw:
-            # the job is active
+        status = classify_job_status(status_raw, job.get("return"))
+        if status.status == JOB_STATUS_ACTIVE:
             ret_code = "null"
-        elif "CC" in status_raw:
-            # status = 'Completed normally'
-            ret_code = {
-                "msg": status_raw + " " + job.get("return"),
-                "code": job.get("return"),
-            }
-        elif status_raw == "ABEND":
-            # status = 'Ended abnormally'
-            ret_code = {
-                "msg": status_raw + " " + job.get("return"),
-                "code": job.get("return"),
-            }
-        elif "ABENDU" in status_raw:
-            # status = 'Ended abnormally'
-            if job.get("return") == "?":
-                ret_code = {"msg": status_raw, "code": status_raw[5:]}
+        elif status.status in (JOB_STATUS_CC, JOB_STATUS_ABEND):
+            # 'Completed normally' or 'Ended abnormally'
+            if status_raw in (JOB_STATUS_CC, JOB_STATUS_ABEND):
+                ret_code = {
+                    "msg": status_raw + " " + job.get("return"),
+                    "code": job.get("return"),
+                }
             else:
-                ret_code = {"msg": status_raw, "code": job.get("return")}
-        elif "CANCELED" or "JCLERR" in status_raw:
-            # status = status_raw
+                code = status.code if status.code is not None else job.get("return")
+                ret_code = {"msg": status_raw, "code": code}
+        elif status.status in (JOB_STATUS_CANCELED, JOB_STATUS_JCLERR):
             ret_code = {"msg": status_raw, "code": "null"}
         else:
             # status = 'Unknown'
@@ -26,7 +26,7 @@ description:
 version_added: "2.9"
 options:
   src:
-    required: true
+    required: false
     type: str
     description:
       - The source directory or data set containing the JCL to submit.
@@ -35,6 +35,32 @@ options:
       - Or an USS file. (e.g "/u/tester/demo/sample.jcl")
       - Or an LOCAL file in ansible control node.
         (e.g "/User/tester/ansible-playbook/sample.jcl")
+      - A LOCAL file is read on the control node and submitted like
+        I(content), in a single module execution on the managed node.
+      - One of I(src), I(batch) or I(content) is required.
+  batch:
+    required: false
+    type: list
+    elements: str
+    description:
+      - A list of data sets or USS files containing JCL to submit, in the
+        same format as I(src).
+      - All jobs are submitted first, then, when I(wait=true), they are
+        waited for together, checking the status of all unfinished jobs at
+        once on every poll.
+      - When I(wait=false), the jobs are looked up in JES together for up to
+        10 seconds. Jobs which cannot be found yet are listed in I(message).
+      - Only supported when I(location) is DATA_SET or USS.
+      - Mutually exclusive with I(src).
+  content:
+    required: false
+    type: str
+    description:
+      - The JCL to submit, inline.
+      - The JCL is converted to IBM-1047 and passed to the submit command
+        on standard input, without being written to a file first.
+      - I(location), I(volume) and I(encoding) are ignored.
+      - Mutually exclusive with I(src) and I(batch).
   location:
     required: true
     default: DATA_SET
@@ -55,6 +81,15 @@ options:
     description:
       - Wait for the Job to finish and capture the output. Default is false.
       - User can specify the wait time, see option ``duration_s``.
+  detach:
+    required: false
+    default: false
+    type: bool
+    description:
+      - Return right after the JCL is submitted, with a handle for each job
+        in I(job_handles), without querying JES for the job status or output.
+      - Pass the handles to M(zos_job_wait) to wait for the jobs later on.
+      - Cannot be used with I(wait=true).
   wait_time_s:
     required: false
     default: 60
@@ -98,8 +133,8 @@ options:
       - IBM-1047
     description:
       - The encoding of the local JCL file on the ansible control node.
-      - If it is UTF-8, ASCII, ISO-8859-1, the file will be converted to EBCDIC
-        on the z/OS platform.
+      - If it is UTF-8, ASCII, ISO-8859-1, the file will be converted to
+        IBM-1047 on the z/OS platform.
       - If it is EBCDIC, IBM-037, IBM-1047, the file will be unchanged when
         submitted on the z/OS platform.
 """
@@ -430,6 +465,20 @@ changed:
   description: Indicates if any changes were made during module operation.
   type: bool
   returned: success
+job_handles:
+  description:
+    - A handle for each submitted job, to be passed to M(zos_job_wait).
+    - The handle holds the job ID and the I(max_rc) the job must not exceed.
+  returned: when I(detach=true)
+  type: list
+  elements: dict
+  sample: [ { "job_id": "JOB00134", "max_rc": 4 } ]
+job_ids:
+  description: The job IDs of the jobs submitted from I(batch), in the same order.
+  returned: when I(batch) is used
+  type: list
+  elements: str
+  sample: [ "JOB00134", "JOB00135" ]
 message:
   description: The output message that the sample module generates.
   returned: success
@@ -462,6 +511,20 @@ EXAMPLES = r"""
     encoding: UTF-8
     volume:
 
+- name: Submit inline JCL
+  zos_job_submit:
+    content: |
+      //HELLO    JOB (T043JM,JM00,1,0,0,0),'HELLO WORLD',CLASS=R,
+      //             MSGCLASS=X,MSGLEVEL=1
+      //STEP0001 EXEC PGM=IEBGENER
+      //SYSIN    DD DUMMY
+      //SYSPRINT DD SYSOUT=*
+      //SYSUT1   DD *
+      HELLO, WORLD
+      /*
+      //SYSUT2   DD SYSOUT=*
+    wait: true
+
 - name: Submit uncatalogued PDS job
   zos_job_submit:
     src: TEST.UNCATLOG.JCL(SAMPLE)
@@ -475,28 +538,72 @@ EXAMPLES = r"""
     location: DATA_SET
     wait: true
     wait_time_s: 30
+
+- name: Submit a batch of jobs and wait for all of them to finish
+  zos_job_submit:
+    batch:
+      - TEST.UTILs(STEP1)
+      - TEST.UTILs(STEP2)
+      - TEST.UTILs(STEP3)
+    location: DATA_SET
+    wait: true
+    wait_time_s: 600
+    max_rc: 4
+
+- name: Submit independent jobs without waiting for them
+  zos_job_submit:
+    src: "TEST.UTILs({{ item }})"
+    location: DATA_SET
+    detach: true
+    max_rc: 4
+  loop: [ LOAD1, LOAD2, LOAD3 ]
+  register: submitted
+
+- name: Wait for all of the submitted jobs
+  zos_job_wait:
+    jobs: "{{ submitted.results | map(attribute='job_handles') | flatten }}"
+    wait_time_s: 600
 """
 
 from ansible.module_utils.basic import AnsibleModule
-from pipes import quote
 
 try:
     from zoautil_py import Jobs
 except Exception:
     Jobs = ""
-from time import sleep
-from os import chmod, path, remove
-from tempfile import NamedTemporaryFile
+from time import monotonic
+from os import path
 import re
-from ansible_collections.ibm.ibm_zos_core.plugins.module_utils.job import job_output
+from ansible_collections.ibm.ibm_zos_core.plugins.module_utils.job import (
+    JOB_STATUS_ABEND,
+    JOB_STATUS_ACTIVE,
+    JOB_STATUS_CANCELED,
+    JOB_STATUS_CC,
+    JOB_STATUS_JCLERR,
+    JOB_STATUS_UNKNOWN,
+    JobReturnCodeError,
+    assert_valid_return_code,
+    classify_job_status,
+    job_output,
+    job_outputs,
+    poll_with_backoff,
+    wait_for_jobs,
+    wait_for_jobs_visible,
+)
 from ansible_collections.ibm.ibm_zos_core.plugins.module_utils.better_arg_parser import (
     BetterArgParser,
 )
-from stat import S_IEXEC, S_IREAD, S_IWRITE
+from ansible_collections.ibm.ibm_zos_core.plugins.module_utils.script import (
+    cached_script,
+)
+from ansible_collections.ibm.ibm_zos_core.plugins.module_utils.encode import (
+    to_ibm1047,
+)
 
-"""time between job query checks to see if a job has completed, default 1 second"""
-POLLING_INTERVAL = 1
-POLLING_COUNT = 60
+"""seconds to wait for a submitted job to be known to JES"""
+JOB_QUERY_TIMEOUT = 10
+
+DSN_REGEX = r"^(([A-Z]{1}[A-Z0-9]{0,7})([.]{1})){1,21}[A-Z]{1}[A-Z0-9]{0,7}([(]([A-Z]{1}[A-Z0-9]{0,7})[)]){0,1}?$"
 
 
 def submit_pds_jcl(src):
@@ -512,6 +619,19 @@ def submit_pds_jcl(src):
 def submit_uss_jcl(src, module):
     """ Submit uss jcl. Use uss command submit -j jclfile. """
     rc, stdout, stderr = module.run_command(["submit", "-j", src])
+    return submitted_job_id(rc, stdout, stderr)
+
+
+def submit_jcl_stdin(jcl, module):
+    """ Submit IBM-1047 encoded JCL bytes on the standard input of submit -j. """
+    rc, stdout, stderr = module.run_command(
+        ["submit", "-j"], data=jcl, binary_data=True
+    )
+    return submitted_job_id(rc, stdout, stderr)
+
+
+def submitted_job_id(rc, stdout, stderr):
+    """ Get the job ID printed by submit -j, raising exceptions on failure. """
     if rc != 0:
         raise SubmitJCLError("SUBMIT JOB FAILED:  Stderr :" + stderr)
     if "Error" in stderr:
@@ -545,26 +665,130 @@ SAY X
     return jobId
 
 
+def submit_jcl(src, location, volume, module):
+    """ Submit JCL from a data set or an USS file and return the job ID. """
+    if location == "USS":
+        return submit_uss_jcl(src, module)
+    if not re.fullmatch(DSN_REGEX, src, re.IGNORECASE):
+        raise SubmitJCLError(
+            "The parameter src for data set is not a valid name pattern: " + src
+        )
+    if volume:
+        return submit_jcl_in_volume(src, volume, module)
+    return submit_pds_jcl(src)
+
+
+def job_handles(job_ids, max_rc):
+    """ Build the handles returned for jobs which are not waited for. """
+    return [dict(job_id=job_id, max_rc=max_rc) for job_id in job_ids]
+
+
+def run_batch(
+    module, batch, location, volume, wait, wait_time_s, return_output, max_rc, detach
+):
+    """ Submit every JCL in batch, then wait for all of the jobs together. """
+    result = dict(changed=False)
+    if location not in ("DATA_SET", "USS"):
+        module.fail_json(
+            msg="The option batch is only supported when location is DATA_SET or USS.",
+            **result
+        )
+    job_ids = []
+    try:
+        for src in batch:
+            job_ids.append(submit_jcl(src, location, volume, module))
+    except SubmitJCLError as e:
+        result["changed"] = len(job_ids) > 0
+        result["job_ids"] = job_ids
+        module.fail_json(msg=repr(e), **result)
+    result["changed"] = True
+    result["job_ids"] = job_ids
+    if detach:
+        result["job_handles"] = job_handles(job_ids, max_rc)
+        result["message"] = {"stdout": "Submit JCL operation succeeded."}
+        module.exit_json(**result)
+
+    start = monotonic()
+    finished = dict((job_id.upper(), None) for job_id in job_ids)
+    visible = finished
+    try:
+        if wait is True:
+            finished = wait_for_jobs(module, job_ids, wait_time_s)
+        else:
+            visible = wait_for_jobs_visible(module, job_ids, JOB_QUERY_TIMEOUT)
+        outputs = job_outputs(module, job_ids, content=return_output)
+    except Exception as e:
+        module.fail_json(msg=repr(e), **result)
+    duration = int(round(monotonic() - start))
+
+    result["jobs"] = []
+    for job_id in job_ids:
+        job = outputs.get(job_id.upper())
+        if job is None:
+            job = dict(
+                job_id=job_id,
+                ddnames=[],
+                ret_code={
+                    "msg_txt": "No job can be located with this job ID: " + job_id
+                },
+            )
+        if not return_output:
+            job["ddnames"] = []
+        elapsed = finished.get(job_id.upper())
+        job["duration"] = duration if elapsed is None else int(round(elapsed))
+        result["jobs"].append(job)
+    result["duration"] = duration
+
+    unfinished = [
+        job_id for job_id in job_ids if finished.get(job_id.upper()) is None
+    ]
+    invisible = [job_id for job_id in job_ids if visible.get(job_id.upper()) is None]
+    if wait is True and unfinished:
+        result["message"] = {
+            "stdout": "Submit JCL operation succeeded but jobs {0} are long running jobs. Timeout is {1} seconds.".format(
+                ", ".join(unfinished), wait_time_s
+            )
+        }
+    elif wait is not True and invisible:
+        result["message"] = {
+            "stdout": "Submit JCL operation succeeded but jobs {0} can not be queried from JES yet (TIMEOUT={1}s).".format(
+                ", ".join(invisible), JOB_QUERY_TIMEOUT
+            )
+        }
+    else:
+        result["message"] = {"stdout": "Submit JCL operation succeeded."}
+
+    if wait is True and max_rc is not None:
+        failed = []
+        for job in result.get("jobs"):
+            try:
+                assert_valid_return_code(max_rc, job.get("ret_code").get("code"))
+            except JobReturnCodeError:
+                failed.append(job.get("job_id"))
+        if failed:
+            module.fail_json(
+                msg="The return code of jobs {0} is greater than max_rc {1} or unavailable.".format(
+                    ", ".join(failed), max_rc
+                ),
+                **result
+            )
+    module.exit_json(**result)
+
+
 def copy_rexx_and_run(script, src, vol, module):
-    delete_on_close = True
-    tmp_file = NamedTemporaryFile(delete=delete_on_close)
-    with open(tmp_file.name, "w") as f:
-        f.write(script)
-    chmod(tmp_file.name, S_IEXEC | S_IREAD | S_IWRITE)
-    pathName = path.dirname(tmp_file.name)
-    scriptName = path.basename(tmp_file.name)
-    rc, stdout, stderr = module.run_command(["./" + scriptName, src, vol], cwd=pathName)
+    with cached_script(script) as script_path:
+        rc, stdout, stderr = module.run_command([script_path, src, vol])
     return rc, stdout, stderr
 
 
-def get_job_info(module, jobId, return_output):
+def get_job_info(module, jobId, return_output, known=False):
+    """ Get the output of a submitted job. Unless the job is known to
+    already be listed by JES, wait for it to be listed first. """
     result = dict()
-    try:
-        output = query_jobs_status(jobId)
-    except SubmitJCLError:
-        raise
+    if not known:
+        query_jobs_status(jobId)
 
-    result = job_output(module, job_id=jobId)
+    result = job_output(module, job_id=jobId, content=return_output)
 
     if not return_output:
         for job in result.get("jobs", []):
@@ -576,94 +800,76 @@ def get_job_info(module, jobId, return_output):
 
 
 def query_jobs_status(jobId):
-    timeout = 10
-    output = None
-    while output is None and timeout > 0:
+    def find_job():
         try:
-            output = Jobs.list(job_id=jobId)
-            sleep(1)
-            timeout = timeout - 1
+            return Jobs.list(job_id=jobId) or None
         except IndexError:
-            pass
+            return None
         except Exception as e:
-            raise SubmitJCLError(
-                repr(e)
-                + """
-            The output is """
-                + output
-            )
-    if output is None and timeout == 0:
+            raise SubmitJCLError(repr(e))
+
+    output, elapsed = poll_with_backoff(find_job, JOB_QUERY_TIMEOUT)
+    if output is None:
         raise SubmitJCLError(
-            "THE JOB CAN NOT BE QUERIED FROM JES (TIMEOUT=10s). PLEASE CHECK THE ZOS SYSTEM. IT IS SLOW TO RESPONSE."
+            "THE JOB CAN NOT BE QUERIED FROM JES (TIMEOUT={0}s). PLEASE CHECK THE ZOS SYSTEM. IT IS SLOW TO RESPONSE.".format(
+                JOB_QUERY_TIMEOUT
+            )
         )
     return output
 
 
-def parsing_job(job_raw):
-    ret_code = {}
-    status_raw = job_raw.get("status")
-    if "AC" in status_raw:
-        # the job is active
-        ret_code = {
-            "msg": "ACTIVE",
-            "code": "null",
-            "msg_detail": "Submit JCL operation succeeded.The job is still running.",
-        }
-    elif "CC" in status_raw:
-        # status = 'Completed normally'
-        ret_code = {
-            "msg": status_raw + " " + job_raw.get("return"),
-            "code": job_raw.get("return"),
-            "msg_detail": "Submit JCL operation succeeded.",
-        }
-    elif status_raw == "ABEND":
-        # status = 'Ended abnormally'
-        ret_code = {
-            "msg": status_raw + " " + job_raw.get("return"),
-            "code": job_raw.get("return"),
-            "msg_detail": "Submit JCL operation succeeded. But the job is ended abnormally.",
-        }
-    elif "ABENDU" in status_raw:
-        # status = 'Ended abnormally'
-        if job_raw.get("return") == "?":
-            ret_code = {
-                "msg": status_raw,
-                "code": status_raw[5:],
-                "msg_detail": "Submit JCL operation succeeded but the job is ended abnormally",
-            }
-        else:
-            ret_code = {
-                "msg": status_raw,
-                "code": job_raw.get("return"),
-                "msg_detail": "Submit JCL operation succeeded but the job is ended abnormally.",
-            }
-    elif "CANCELED" in status_raw:
-        # status = status_raw
-        ret_code = {
-            "msg": status_raw,
-            "code": "null",
-            "msg_detail": "Submit JCL operation succeeded but the job was canceled.",
-        }
-    elif "JCLERR" in status_raw:
-        ret_code = {
-            "msg": "JCL ERROR",
-            "code": "null",
-            "msg_detail": "Submit JCL operation succeeded but the job has a JCL ERROR.",
-        }
-    else:
-        # status = 'Unknown'
-        ret_code = {
-            "msg": status_raw,
-            "code": job_raw.get("return"),
-            "msg_detail": "Submit JCL operation succeeded. Please check the job status.",
-        }
+def wait_for_job(jobId, wait_time_s):
+    """ Poll JES, backing off between polls, until the job is listed and no longer active.
+    Returns the last status of the job, or None when it is still not listed or active
+    after wait_time_s seconds. """
 
-    return ret_code
+    def job_done():
+        try:
+            jobs = Jobs.list(job_id=jobId)
+        except IndexError:
+            return None
+        except Exception as e:
+            raise SubmitJCLError(repr(e))
+        if not jobs:
+            return None
+        status = classify_job_status(jobs[0].get("status"), jobs[0].get("return"))
+        if status.status == JOB_STATUS_ACTIVE:
+            return None
+        return jobs
 
+    jobs, elapsed = poll_with_backoff(job_done, wait_time_s)
+    return jobs
 
-def assert_valid_return_code(max_rc, found_rc):
-    if found_rc is None or max_rc < int(found_rc):
-        raise SubmitJCLError("")
+
+JOB_STATUS_DETAILS = {
+    JOB_STATUS_ACTIVE: "Submit JCL operation succeeded.The job is still running.",
+    JOB_STATUS_CC: "Submit JCL operation succeeded.",
+    JOB_STATUS_ABEND: "Submit JCL operation succeeded. But the job is ended abnormally.",
+    JOB_STATUS_CANCELED: "Submit JCL operation succeeded but the job was canceled.",
+    JOB_STATUS_JCLERR: "Submit JCL operation succeeded but the job has a JCL ERROR.",
+    JOB_STATUS_UNKNOWN: "Submit JCL operation succeeded. Please check the job status.",
+}
+
+
+def parsing_job(job_raw):
+    status_raw = job_raw.get("status")
+    status = classify_job_status(status_raw, job_raw.get("return"))
+    ret_code = {
+        "msg": status_raw,
+        "code": job_raw.get("return"),
+        "msg_detail": JOB_STATUS_DETAILS.get(status.status),
+    }
+    if status.status == JOB_STATUS_ACTIVE:
+        ret_code.update(msg="ACTIVE", code="null")
+    elif status.status in (JOB_STATUS_CANCELED, JOB_STATUS_JCLERR):
+        ret_code.update(code="null")
+        if status.status == JOB_STATUS_JCLERR:
+            ret_code.update(msg="JCL ERROR")
+    elif status_raw in (JOB_STATUS_CC, JOB_STATUS_ABEND):
+        ret_code.update(msg=status_raw + " " + job_raw.get("return"))
+    elif status.status == JOB_STATUS_ABEND and job_raw.get("return") == "?":
+        ret_code.update(code=status.code)
+    return ret_code
 
 
 def data_set_or_path_type(contents, resolve_dependencies):
@@ -692,7 +898,9 @@ def encoding_type(contents, resolve_dependencies):
 def run_module():
 
     module_args = dict(
-        src=dict(type="str", required=True),
+        src=dict(type="str", required=False),
+        batch=dict(type="list", elements="str", required=False),
+        content=dict(type="str", required=False),
         wait=dict(type="bool", required=False),
         location=dict(
             type="str", default="DATA_SET", choices=["DATA_SET", "USS", "LOCAL"],
@@ -706,13 +914,20 @@ def run_module():
         return_output=dict(type="bool", required=False, default=True),
         wait_time_s=dict(type="int", default=60),
         max_rc=dict(type="int", required=False),
-        temp_file=dict(type="path", required=False),
+        detach=dict(type="bool", required=False, default=False),
     )
 
-    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+    module = AnsibleModule(
+        argument_spec=module_args,
+        mutually_exclusive=[["src", "batch", "content"]],
+        required_one_of=[["src", "batch", "content"]],
+        supports_check_mode=True,
+    )
 
     arg_defs = dict(
-        src=dict(arg_type=data_set_or_path_type, required=True),
+        src=dict(arg_type=data_set_or_path_type, required=False),
+        batch=dict(arg_type="list", elements=data_set_or_path_type, required=False),
+        content=dict(arg_type="str", required=False),
         wait=dict(arg_type="bool", required=False),
         location=dict(
             arg_type="str", default="DATA_SET", choices=["DATA_SET", "USS", "LOCAL"],
@@ -722,7 +937,7 @@ def run_module():
         return_output=dict(arg_type="bool", default=True),
         wait_time_s=dict(arg_type="int", required=False, default=60),
         max_rc=dict(arg_type="int", required=False),
-        temp_file=dict(arg_type="path", required=False),
+        detach=dict(arg_type="bool", default=False),
     )
 
     parser = BetterArgParser(arg_defs)
@@ -737,10 +952,13 @@ def run_module():
     return_output = parsed_args.get("return_output")
     wait_time_s = parsed_args.get("wait_time_s")
     max_rc = parsed_args.get("max_rc")
-    # get temporary file names for copied files
-    temp_file = parsed_args.get("temp_file")
-    if temp_file:
-        temp_file_2 = NamedTemporaryFile(delete=True)
+    detach = parsed_args.get("detach")
+    content = parsed_args.get("content")
+
+    if detach and wait:
+        module.fail_json(
+            msg="The options detach and wait cannot both be true.", **result
+        )
 
     if wait_time_s <= 0:
         module.fail_json(
@@ -748,12 +966,36 @@ def run_module():
             **result
         )
 
-    DSN_REGEX = r"^(([A-Z]{1}[A-Z0-9]{0,7})([.]{1})){1,21}[A-Z]{1}[A-Z0-9]{0,7}([(]([A-Z]{1}[A-Z0-9]{0,7})[)]){0,1}?$"
+    batch = parsed_args.get("batch")
+    if batch:
+        run_batch(
+            module,
+            batch,
+            location,
+            volume,
+            wait,
+            wait_time_s,
+            return_output,
+            max_rc,
+            detach,
+        )
 
     # calculate the job elapse time
     duration = 0
+    timed_out = False
     try:
-        if location == "DATA_SET":
+        if content is not None:
+            try:
+                if not content.endswith("\n"):
+                    content += "\n"
+                jcl = to_ibm1047(content)
+            except ValueError as e:
+                module.fail_json(
+                    msg="The JCL content cannot be converted to IBM-1047: " + str(e),
+                    **result
+                )
+            jobId = submit_jcl_stdin(jcl, module)
+        elif location == "DATA_SET":
             data_set_name_pattern = re.compile(DSN_REGEX, re.IGNORECASE)
             check = data_set_name_pattern.fullmatch(src)
             if check:
@@ -769,38 +1011,11 @@ def run_module():
         elif location == "USS":
             jobId = submit_uss_jcl(src, module)
         else:
-            # For local file, it has been copied to the temp directory in action plugin.
-            encoding = parsed_args.get("encoding")
-            if encoding == "EBCDIC" or encoding == "IBM-037" or encoding == "IBM-1047":
-                jobId = submit_uss_jcl(temp_file, module)
-            # 'UTF-8' 'ASCII' encoding will be converted.
-            elif (
-                encoding == "UTF-8"
-                or encoding == "ISO-8859-1"
-                or encoding == "ASCII"
-                or encoding is None
-            ):
-                (conv_rc, stdout, stderr) = module.run_command(
-                    "iconv -f ISO8859-1 -t IBM-1047 %s > %s"
-                    % (quote(temp_file), quote(temp_file_2.name)),
-                    use_unsafe_shell=True,
-                )
-                if conv_rc == 0:
-                    jobId = submit_uss_jcl(temp_file_2.name, module)
-                else:
-                    module.fail_json(
-                        msg="The Local file encoding conversion failed. Please check the source file."
-                        + stderr,
-                        **result
-                    )
-            else:
-                module.fail_json(
-                    msg=(
-                        "The Local file encoding format is not supported."
-                        "The supported encoding is UTF-8, ASCII, ISO-8859-1, EBCDIC, IBM-037, IBM-1047. Default is UTF-8."
-                    ),
-                    **result
-                )
+            # Local JCL is read by the action plugin and passed in content.
+            module.fail_json(
+                msg="The option src is not supported for LOCAL JCL without the zos_job_submit action plugin.",
+                **result
+            )
     except SubmitJCLError as e:
         module.fail_json(msg=repr(e), **result)
     if jobId is None or jobId == "":
@@ -811,22 +1026,24 @@ def run_module():
         )
 
     result["job_id"] = jobId
+    if detach:
+        result["job_handles"] = job_handles([jobId], max_rc)
+        result["message"] = {"stdout": "Submit JCL operation succeeded."}
+        result["changed"] = True
+        module.exit_json(**result)
+
     if wait is True:
+        start = monotonic()
         try:
-            waitJob = query_jobs_status(jobId)
+            timed_out = wait_for_job(jobId, wait_time_s) is None
         except SubmitJCLError as e:
             module.fail_json(msg=repr(e), **result)
-        while waitJob[0].get("status") == "AC":  # AC means in progress
-            sleep(1)
-            duration = duration + 1
-            waitJob = Jobs.list(job_id=jobId)
-            if waitJob[0].get("status") == "CC":  # CC means completed
-                break
-            if duration == wait_time_s:  # Long running task. timeout return
-                break
+        duration = int(round(monotonic() - start))
 
     try:
-        result = get_job_info(module, jobId, return_output)
+        result = get_job_info(
+            module, jobId, return_output, known=wait is True and not timed_out
+        )
         if wait is True and return_output is True and max_rc is not None:
             assert_valid_return_code(
                 max_rc, result.get("jobs")[0].get("ret_code").get("code")
@@ -835,11 +1052,8 @@ def run_module():
         module.fail_json(msg=repr(e), **result)
     except Exception as e:
         module.fail_json(msg=repr(e), **result)
-    finally:
-        if temp_file:
-            remove(temp_file)
     result["duration"] = duration
-    if duration == wait_time_s:
+    if timed_out:
         result["message"] = {
             "stdout": "Submit JCL operation succeeded but it is a long running job. Timeout is "
             + str(wait_time_s)
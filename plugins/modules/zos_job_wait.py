@@ -0,0 +1,265 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+
+# Copyright (c) IBM Corporation 2020
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+ANSIBLE_METADATA = {
+    "metadata_version": "1.1",
+    "status": ["preview"],
+    "supported_by": "community",
+}
+
+DOCUMENTATION = r"""
+---
+module: zos_job_wait
+short_description: Wait for submitted jobs
+description:
+  - Wait for jobs submitted with M(zos_job_submit) and I(detach=true) to
+    finish, and collect their output.
+  - The status of all unfinished jobs is checked at once on every poll.
+    Polls start right away and back off exponentially up to a few seconds
+    apart.
+  - Fails when the jobs are not done within I(wait_time_s), or when a
+    finished job exceeds its maximum return code.
+version_added: "2.9"
+author: "Xiao Yuan Ma (@bjmaxy)"
+options:
+  jobs:
+    description:
+      - The handles of the jobs to wait for, as returned in I(job_handles)
+        by M(zos_job_submit).
+    type: list
+    elements: dict
+    required: true
+    suboptions:
+      job_id:
+        description:
+          - The z/OS job ID of the job. (e.g "JOB00134")
+        type: str
+        required: true
+      max_rc:
+        description:
+          - The maximum return code the job may end with without failing
+            the module.
+          - Overrides the I(max_rc) option for this job.
+        type: int
+        required: false
+  wait_for:
+    description:
+      - Whether to wait for all of the jobs to finish, or for any one of them.
+    type: str
+    required: false
+    default: all
+    choices:
+      - all
+      - any
+  wait_time_s:
+    description:
+      - The maximum number of seconds to wait for the jobs.
+    type: int
+    required: false
+    default: 60
+  max_rc:
+    description:
+      - The maximum return code for jobs whose handle has no I(max_rc).
+      - When neither is provided, return codes are not checked.
+    type: int
+    required: false
+  return_output:
+    description:
+      - Whether to return the DD output of the jobs.
+      - If false, an empty list will be returned in ddnames field.
+    type: bool
+    required: false
+    default: true
+"""
+
+EXAMPLES = r"""
+- name: Submit jobs without waiting for them
+  zos_job_submit:
+    src: "TEST.UTILs({{ item }})"
+    location: DATA_SET
+    detach: true
+    max_rc: 4
+  loop: [ LOAD1, LOAD2, LOAD3 ]
+  register: submitted
+
+- name: Wait for all of the jobs to finish
+  zos_job_wait:
+    jobs: "{{ submitted.results | map(attribute='job_handles') | flatten }}"
+    wait_time_s: 600
+    return_output: false
+
+- name: Wait for the first of two jobs to finish
+  zos_job_wait:
+    jobs:
+      - job_id: JOB00134
+      - job_id: JOB00135
+        max_rc: 8
+    wait_for: any
+"""
+
+RETURN = r"""
+jobs:
+  description:
+    - The output of each job, in the order of I(jobs), in the same format as
+      the jobs returned by M(zos_job_output).
+    - Each job also has a I(duration), the number of seconds after which it
+      was found done, or null when it was not done.
+  returned: success
+  type: list
+  elements: dict
+  sample:
+    [
+      {
+        "class": "R",
+        "content_type": "JOB",
+        "ddnames": [],
+        "duration": 12,
+        "job_id": "JOB00134",
+        "job_name": "HELLO",
+        "owner": "OMVSADM",
+        "ret_code": {
+          "code": 0,
+          "msg": "CC 0000",
+          "msg_code": "0000",
+          "msg_txt": ""
+        },
+        "subsystem": "STL1"
+      }
+    ]
+finished:
+  description: The IDs of the jobs which are done.
+  returned: always
+  type: list
+  elements: str
+  sample: [ "JOB00134" ]
+pending:
+  description: The IDs of the jobs which are still waiting or running.
+  returned: always
+  type: list
+  elements: str
+  sample: [ "JOB00135" ]
+duration:
+  description: The number of seconds waited.
+  returned: always
+  type: int
+  sample: 12
+changed:
+  description: Indicates if any changes were made during module operation.
+  type: bool
+  returned: always
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+from ansible_collections.ibm.ibm_zos_core.plugins.module_utils.job import (
+    JobReturnCodeError,
+    assert_valid_return_code,
+    job_outputs,
+    wait_for_jobs,
+)
+from time import monotonic
+
+
+def run_module():
+    module_args = dict(
+        jobs=dict(
+            type="list",
+            elements="dict",
+            required=True,
+            options=dict(
+                job_id=dict(type="str", required=True),
+                max_rc=dict(type="int", required=False),
+            ),
+        ),
+        wait_for=dict(type="str", default="all", choices=["all", "any"]),
+        wait_time_s=dict(type="int", default=60),
+        max_rc=dict(type="int", required=False),
+        return_output=dict(type="bool", default=True),
+    )
+
+    module = AnsibleModule(argument_spec=module_args, supports_check_mode=True)
+
+    handles = module.params.get("jobs")
+    wait_for = module.params.get("wait_for")
+    wait_time_s = module.params.get("wait_time_s")
+    max_rc = module.params.get("max_rc")
+    return_output = module.params.get("return_output")
+
+    result = dict(changed=False, finished=[], pending=[])
+
+    if wait_time_s <= 0:
+        module.fail_json(
+            msg="The option wait_time_s is not valid it just be greater than 0.",
+            **result
+        )
+    if not handles:
+        module.fail_json(msg="Please provide at least one job to wait for.", **result)
+
+    job_ids = [handle.get("job_id").upper() for handle in handles]
+    start = monotonic()
+    try:
+        finished = wait_for_jobs(
+            module, job_ids, wait_time_s, count=1 if wait_for == "any" else None
+        )
+        outputs = job_outputs(module, job_ids, content=return_output)
+    except Exception as e:
+        module.fail_json(msg=repr(e), **result)
+    result["duration"] = int(round(monotonic() - start))
+
+    result["jobs"] = []
+    failed = []
+    for handle, job_id in zip(handles, job_ids):
+        job = outputs.get(job_id)
+        if job is None:
+            job = dict(job_id=job_id, ddnames=[], ret_code={})
+        if not return_output:
+            job["ddnames"] = []
+        elapsed = finished.get(job_id)
+        job["duration"] = None if elapsed is None else int(round(elapsed))
+        result["jobs"].append(job)
+        if elapsed is None:
+            if job_id not in result["pending"]:
+                result["pending"].append(job_id)
+            continue
+        if job_id not in result["finished"]:
+            result["finished"].append(job_id)
+        job_max_rc = handle.get("max_rc")
+        if job_max_rc is None:
+            job_max_rc = max_rc
+        if job_max_rc is not None:
+            try:
+                assert_valid_return_code(
+                    job_max_rc, job.get("ret_code", {}).get("code")
+                )
+            except JobReturnCodeError:
+                failed.append(job_id)
+
+    if not result["finished"] or (wait_for == "all" and result["pending"]):
+        module.fail_json(
+            msg="The jobs {0} did not finish within {1} seconds.".format(
+                ", ".join(result["pending"]), wait_time_s
+            ),
+            **result
+        )
+    if failed:
+        module.fail_json(
+            msg="The return code of jobs {0} is unavailable or greater than max_rc.".format(
+                ", ".join(failed)
+            ),
+            **result
+        )
+    module.exit_json(**result)
+
+
+def main():
+    run_module()
+
+
+if __name__ == "__main__":
+    main()
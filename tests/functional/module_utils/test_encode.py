@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) IBM Corporation 2020
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ibm_zos_core.plugins.module_utils.encode import (
+    decode_jcl,
+    from_ibm1047,
+    to_ibm1047,
+)
+import pytest
+
+LATIN_1 = "".join(chr(code) for code in range(256))
+
+
+def test_to_ibm1047_code_points():
+    assert to_ibm1047("//HELLO JOB\n") == (
+        b"\x61\x61\xc8\xc5\xd3\xd3\xd6\x40\xd1\xd6\xc2\x15"
+    )
+    assert to_ibm1047("[]^\xac\xdd\xa8") == b"\xad\xbd\x5f\xb0\xba\xbb"
+    assert to_ibm1047("\x85") == b"\x25"
+    assert to_ibm1047("{}\\|!$#@~") == b"\xc0\xd0\xe0\x4f\x5a\x5b\x7b\x7c\xa1"
+
+
+def test_to_ibm1047_is_one_to_one():
+    encoded = to_ibm1047(LATIN_1)
+    assert len(encoded) == 256
+    assert len(set(bytearray(encoded))) == 256
+
+
+def test_from_ibm1047_round_trip():
+    assert from_ibm1047(to_ibm1047(LATIN_1)) == LATIN_1
+
+
+def test_to_ibm1047_rejects_characters_outside_latin_1():
+    with pytest.raises(UnicodeEncodeError):
+        to_ibm1047("€")
+    assert to_ibm1047("€", errors="replace") == to_ibm1047("?")
+
+
+def test_decode_jcl_text_encodings():
+    assert decode_jcl("//É\n".encode("utf-8"), "UTF-8") == "//É\n"
+    assert decode_jcl(b"//\xc9\n", "ISO-8859-1") == "//É\n"
+    assert decode_jcl(b"//\xc9\n", None) == "//É\n"
+    with pytest.raises(ValueError):
+        decode_jcl(b"//\xc9\n", "UTF-8")
+
+
+@pytest.mark.parametrize("encoding", ["EBCDIC", "IBM-037", "IBM-1047"])
+def test_decode_jcl_ebcdic_is_submitted_unchanged(encoding):
+    data = bytes(bytearray(range(256)))
+    assert to_ibm1047(decode_jcl(data, encoding)) == data
+
+
+def test_decode_jcl_unsupported_encoding():
+    with pytest.raises(ValueError):
+        decode_jcl(b"", "IBM-500")
@@ -0,0 +1,376 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) IBM Corporation 2020
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ibm_zos_core.plugins.module_utils import job
+from ibm_zos_core.plugins.module_utils.job import (
+    JobReturnCodeError,
+    _build_jobs,
+    _cursor_pattern,
+    _read_job_records,
+    _search_job_records,
+    _search_pattern,
+    assert_valid_return_code,
+    classify_job_status,
+    is_job_done,
+    job_output,
+    job_outputs,
+    poll_with_backoff,
+    wait_for_jobs,
+    wait_for_jobs_visible,
+)
+import pytest
+
+JOB_OUTPUT_RECORDS = [
+    b'{"type":"job","job_id":"JOB00123","job_name":"HELLO","subsystem":"","owner":"USER1",'
+    b'"ret_code":{"msg":"CC 0000"},"class":"A","content_type":"JOB"}\n',
+    b'{"type":"dd","ddname":"JESMSGLG","record_count":"3","id":"2","stepname":"JES2",'
+    b'"procstep":"","byte_count":"240"}\n',
+    b'{"type":"lines","lines":["line 1","line \\"2\\""]}\n',
+    b"\n",
+    b'{"type":"lines","lines":["C:\\\\TEMP"]}\n',
+    b'{"type":"dd","ddname":"SYSPRINT","record_count":"0","id":"102","stepname":"STEP1",'
+    b'"procstep":"","byte_count":"0"}\n',
+    b'{"type":"job","job_id":"JOB00124","job_name":"HELLO","subsystem":"","owner":"USER1",'
+    b'"ret_code":{"msg":"ABEND S0C4"},"class":"A","content_type":"JOB"}\n',
+]
+
+
+def test_read_job_records_one_record_per_line():
+    records = list(_read_job_records(iter(JOB_OUTPUT_RECORDS)))
+    assert [record["type"] for record in records] == [
+        "job",
+        "dd",
+        "lines",
+        "lines",
+        "dd",
+        "job",
+    ]
+    assert records[2]["lines"] == ["line 1", 'line "2"']
+    assert records[3]["lines"] == ["C:\\TEMP"]
+
+
+def test_read_job_records_is_incremental():
+    def stream():
+        yield JOB_OUTPUT_RECORDS[0]
+        raise AssertionError("read past the first record")
+
+    records = _read_job_records(stream())
+    assert next(records)["job_id"] == "JOB00123"
+
+
+def test_build_jobs_groups_records():
+    jobs = _build_jobs(_read_job_records(iter(JOB_OUTPUT_RECORDS)))
+    assert len(jobs) == 2
+    assert "type" not in jobs[0]
+    assert jobs[0]["ret_code"] == {"msg": "CC 0000"}
+    assert [dd["ddname"] for dd in jobs[0]["ddnames"]] == ["JESMSGLG", "SYSPRINT"]
+    assert jobs[0]["ddnames"][0]["content"] == ["line 1", 'line "2"', "C:\\TEMP"]
+    assert jobs[0]["ddnames"][1]["content"] == []
+    assert jobs[1]["job_id"] == "JOB00124"
+    assert jobs[1]["ddnames"] == []
+
+
+def test_build_jobs_ignores_orphan_records():
+    records = [
+        {"type": "lines", "lines": ["lost"]},
+        {"type": "dd", "ddname": "LOST"},
+    ]
+    assert _build_jobs(records) == []
+
+
+def test_job_output_rejects_invalid_line_window():
+    with pytest.raises(ValueError):
+        job_output(None, job_id="JOB00123", max_lines="ten")
+
+
+@pytest.mark.parametrize(
+    "line_window",
+    [
+        dict(start_line=0),
+        dict(start_line=-5),
+        dict(max_lines=-1),
+        dict(tail_lines=-200),
+        dict(search="ERROR", search_before=-1),
+        dict(search="ERROR", search_after=-1),
+    ],
+)
+def test_job_output_rejects_line_window_out_of_range(line_window):
+    with pytest.raises(ValueError, match="expected a"):
+        job_output(None, job_id="JOB00123", **line_window)
+
+
+def test_job_output_start_line_and_tail_lines_are_mutually_exclusive():
+    with pytest.raises(ValueError):
+        job_output(None, job_id="JOB00123", start_line=10, tail_lines=200)
+
+
+def test_job_outputs_rejects_invalid_job_ids():
+    with pytest.raises(ValueError):
+        job_outputs(None, ["JOB00123", "NOT A JOB"])
+    with pytest.raises(ValueError):
+        job_outputs(None, None)
+
+
+def search_records(pattern, before=0, after=0):
+    records = [
+        {"type": "job", "job_id": "JOB00123"},
+        {"type": "dd", "ddname": "JESYSMSG"},
+        {"type": "lines", "start": 1, "lines": ["A", "B", "IEF142I 1", "C"]},
+        {"type": "lines", "start": 5, "lines": ["D", "E", "IEF142I 2", "F", "G"]},
+        {"type": "dd", "ddname": "SYSPRINT"},
+        {"type": "lines", "start": 1, "lines": ["H", "I"]},
+    ]
+    return _build_jobs(
+        _search_job_records(iter(records), _search_pattern(pattern), before, after)
+    )[0]["ddnames"]
+
+
+def test_search_job_records_keeps_matching_lines():
+    ddnames = search_records(r"^IEF\d+I")
+    assert ddnames[0]["content"] == ["IEF142I 1", "IEF142I 2"]
+    assert ddnames[0]["line_numbers"] == [3, 7]
+    assert ddnames[1]["content"] == []
+    assert ddnames[1]["line_numbers"] == []
+
+
+def test_search_job_records_context_lines():
+    ddnames = search_records("IEF142I", before=2, after=1)
+    assert ddnames[0]["content"] == [
+        "A", "B", "IEF142I 1", "C", "D", "E", "IEF142I 2", "F"
+    ]
+    assert ddnames[0]["line_numbers"] == [1, 2, 3, 4, 5, 6, 7, 8]
+    ddnames = search_records("IEF142I 1", before=1, after=10)
+    assert ddnames[0]["line_numbers"] == [2, 3, 4, 5, 6, 7, 8, 9]
+    assert ddnames[1]["content"] == []
+
+
+def test_search_pattern_literal():
+    assert _search_pattern("A.B", literal=True).search("A.B")
+    assert not _search_pattern("A.B", literal=True).search("AXB")
+    with pytest.raises(ValueError):
+        _search_pattern("IEF(")
+
+
+def test_build_jobs_cursor_per_ddname():
+    records = [
+        {"type": "job", "job_id": "JOB00123"},
+        {"type": "dd", "ddname": "JESMSGLG", "id": "2"},
+        {"type": "lines", "start": 11, "lines": ["line 11", "line 12"]},
+        {"type": "end", "next_line": 13},
+        {"type": "dd", "ddname": "SYSPRINT", "id": "102"},
+        {"type": "end", "next_line": 1},
+    ]
+    ddnames = _build_jobs(records)[0]["ddnames"]
+    assert ddnames[0]["cursor"] == "JOB00123/2/13"
+    assert ddnames[0]["content"] == ["line 11", "line 12"]
+    assert ddnames[1]["cursor"] == "JOB00123/102/1"
+
+
+def test_build_jobs_cursor_without_lines():
+    records = [
+        {"type": "job", "job_id": "JOB00123"},
+        {"type": "dd", "ddname": "JESMSGLG", "id": "2", "record_count": "12"},
+        {"type": "end", "next_line": 50},
+    ]
+    ddnames = _build_jobs(records)[0]["ddnames"]
+    assert ddnames[0]["content"] == []
+    assert ddnames[0]["cursor"] == "JOB00123/2/50"
+
+
+def test_cursor_pattern():
+    assert _cursor_pattern("job00123/102/13", {}) == "JOB00123/102/13"
+    with pytest.raises(ValueError):
+        _cursor_pattern("JOB00123/102", {})
+    with pytest.raises(ValueError):
+        job_output(None, job_id="JOB00123", cursors=["JOB00123/2/1,JOB1/1/1"])
+
+
+@pytest.mark.parametrize(
+    "status,return_code,expected",
+    [
+        ("CC 0000", None, ("CC", "0000", 0)),
+        ("CC", "0004", ("CC", "0004", 4)),
+        ("ABEND S0C4", None, ("ABEND", "S0C4", None)),
+        ("ABEND", "S222", ("ABEND", "S222", None)),
+        ("ABENDU0100", "?", ("ABEND", "U0100", None)),
+        ("JCL ERROR", None, ("JCLERR", None, None)),
+        ("JCLERR", "?", ("JCLERR", None, None)),
+        ("CANCELED", "?", ("CANCELED", None, None)),
+        ("AC", "?", ("ACTIVE", None, None)),
+        ("CONV ERR", None, ("UNKNOWN", None, None)),
+        ("", None, ("UNKNOWN", None, None)),
+    ],
+)
+def test_classify_job_status(status, return_code, expected):
+    assert tuple(classify_job_status(status, return_code)) == expected
+
+
+class FakeClock(object):
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_poll_with_backoff_checks_immediately():
+    fake = FakeClock()
+    result, elapsed = poll_with_backoff(
+        lambda: "done", 60, clock=fake.clock, sleep=fake.sleep
+    )
+    assert result == "done"
+    assert elapsed == 0
+    assert fake.sleeps == []
+
+
+def test_poll_with_backoff_grows_intervals_up_to_cap():
+    fake = FakeClock()
+    results = iter([None] * 8 + ["done"])
+    result, elapsed = poll_with_backoff(
+        lambda: next(results),
+        initial_interval=1,
+        max_interval=8,
+        factor=2,
+        jitter=0.25,
+        clock=fake.clock,
+        sleep=fake.sleep,
+    )
+    assert result == "done"
+    assert len(fake.sleeps) == 8
+    for delay, interval in zip(fake.sleeps, [1, 2, 4, 8, 8, 8, 8, 8]):
+        assert interval * 0.75 <= delay <= interval
+    assert elapsed == pytest.approx(sum(fake.sleeps))
+
+
+def test_poll_with_backoff_times_out():
+    fake = FakeClock()
+    result, elapsed = poll_with_backoff(
+        lambda: None,
+        10,
+        initial_interval=3,
+        jitter=0,
+        clock=fake.clock,
+        sleep=fake.sleep,
+    )
+    assert result is None
+    assert elapsed == pytest.approx(10)
+    assert fake.sleeps == pytest.approx([3, 5, 2])
+
+
+@pytest.mark.parametrize(
+    "ret_code,done",
+    [
+        (None, False),
+        ({"msg": ""}, False),
+        ({"msg": "AC"}, False),
+        ({"msg": "CC 0000"}, True),
+        ({"msg": "ABEND S0C4"}, True),
+        ({"msg": "JCL ERROR"}, True),
+        ({"msg": "CONV ERR"}, True),
+    ],
+)
+def test_is_job_done(ret_code, done):
+    assert is_job_done(ret_code) is done
+
+
+def test_wait_for_jobs_queries_unfinished_jobs_together(monkeypatch):
+    fake = FakeClock()
+    results = {
+        "JOB00001": ["CC 0000"],
+        "JOB00002": ["", "", "ABEND S0C4"],
+        "JOB00003": ["", "CC 0004"],
+    }
+    queries = []
+
+    def job_statuses(module, job_ids):
+        queries.append(sorted(job_ids))
+        return dict((job_id, {"msg": results[job_id].pop(0)}) for job_id in job_ids)
+
+    monkeypatch.setattr(job, "job_statuses", job_statuses)
+    finished = wait_for_jobs(
+        None,
+        ["job00001", "JOB00002", "JOB00003"],
+        60,
+        initial_interval=1,
+        jitter=0,
+        clock=fake.clock,
+        sleep=fake.sleep,
+    )
+    assert queries == [
+        ["JOB00001", "JOB00002", "JOB00003"],
+        ["JOB00002", "JOB00003"],
+        ["JOB00002"],
+    ]
+    assert finished == {"JOB00001": 0, "JOB00002": 3, "JOB00003": 1}
+
+
+def test_wait_for_jobs_times_out(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(job, "job_statuses", lambda module, job_ids: {})
+    finished = wait_for_jobs(None, ["JOB00001"], 10, clock=fake.clock, sleep=fake.sleep)
+    assert finished == {"JOB00001": None}
+    assert fake.now == pytest.approx(110)
+
+
+def test_wait_for_jobs_visible(monkeypatch):
+    fake = FakeClock()
+    visible = [["JOB00001"], ["JOB00001", "JOB00002"]]
+    queries = []
+
+    def job_statuses(module, job_ids):
+        queries.append(sorted(job_ids))
+        found = visible.pop(0) if visible else []
+        return dict((job_id, {"msg": ""}) for job_id in job_ids if job_id in found)
+
+    monkeypatch.setattr(job, "job_statuses", job_statuses)
+    found = wait_for_jobs_visible(
+        None,
+        ["JOB00001", "JOB00002", "JOB00003"],
+        10,
+        initial_interval=1,
+        jitter=0,
+        clock=fake.clock,
+        sleep=fake.sleep,
+    )
+    assert queries[:3] == [
+        ["JOB00001", "JOB00002", "JOB00003"],
+        ["JOB00002", "JOB00003"],
+        ["JOB00003"],
+    ]
+    assert found == {"JOB00001": 0, "JOB00002": 1, "JOB00003": None}
+
+
+def test_job_outputs_requests_each_job_once_in_order(monkeypatch):
+    requested = []
+
+    def get_job_records(module, job_id, *args, **kwargs):
+        requested.append(job_id)
+        return iter([])
+
+    monkeypatch.setattr(job, "_get_job_records", get_job_records)
+    job_outputs(None, ["JOB00003", "job00001", "JOB00003", "JOB00002", "JOB00001"])
+    assert requested == ["JOB00003,JOB00001,JOB00002"]
+
+
+def test_job_outputs_empty_list_selects_no_job():
+    assert job_outputs(None, []) == {}
+
+
+def test_assert_valid_return_code():
+    assert_valid_return_code(4, 4)
+    assert_valid_return_code(4, "0")
+    with pytest.raises(JobReturnCodeError):
+        assert_valid_return_code(4, 8)
+    with pytest.raises(JobReturnCodeError):
+        assert_valid_return_code(4, None)
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) IBM Corporation 2020
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ibm_zos_core.plugins.module_utils.script import (
+    SCRIPT_FILE_MODE,
+    cached_script,
+    install_script,
+)
+import os
+import stat
+
+SCRIPT = """/* REXX */
+say 'HELLO'
+"""
+
+
+def test_install_script_is_reused(tmpdir):
+    directory = str(tmpdir.join("scripts"))
+    path = install_script(SCRIPT, directory)
+    assert os.path.dirname(path) == directory
+    with open(path) as script_file:
+        assert script_file.read() == SCRIPT
+    assert stat.S_IMODE(os.stat(path).st_mode) == SCRIPT_FILE_MODE
+    mtime = os.stat(path).st_mtime_ns
+    os.utime(path, ns=(mtime - 10 ** 9, mtime - 10 ** 9))
+    assert install_script(SCRIPT, directory) == path
+    assert os.stat(path).st_mtime_ns == mtime - 10 ** 9
+    assert os.listdir(directory) == [os.path.basename(path)]
+
+
+def test_install_script_named_by_contents(tmpdir):
+    directory = str(tmpdir)
+    assert install_script(SCRIPT, directory) != install_script(SCRIPT + "\n", directory)
+
+
+def test_install_script_replaces_damaged_script(tmpdir):
+    directory = str(tmpdir)
+    path = install_script(SCRIPT, directory)
+    with open(path, "w") as script_file:
+        script_file.write("/* REXX */\n")
+    assert install_script(SCRIPT, directory) == path
+    with open(path) as script_file:
+        assert script_file.read() == SCRIPT
+    os.chmod(path, 0o777)
+    assert install_script(SCRIPT, directory) == path
+    assert stat.S_IMODE(os.stat(path).st_mode) == SCRIPT_FILE_MODE
+
+
+def test_install_script_rejects_shared_directory(tmpdir):
+    directory = str(tmpdir)
+    os.chmod(directory, 0o777)
+    assert install_script(SCRIPT, directory) is None
+
+
+def test_cached_script_falls_back_to_temporary_file(tmpdir):
+    directory = str(tmpdir)
+    os.chmod(directory, 0o777)
+    with cached_script(SCRIPT, directory) as path:
+        assert os.path.dirname(path) != directory
+        with open(path) as script_file:
+            assert script_file.read() == SCRIPT
+    assert not os.path.exists(path)
+
+
+def test_cached_script_keeps_installed_script(tmpdir):
+    directory = str(tmpdir)
+    with cached_script(SCRIPT, directory) as path:
+        assert os.path.dirname(path) == directory
+    assert os.path.exists(path)
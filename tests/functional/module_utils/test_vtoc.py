@@ -0,0 +1,804 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) IBM Corporation 2020
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ibm_zos_core.plugins.module_utils.vtoc import (
+    CACHE_FORMAT_VERSION,
+    TABLE_ROW_REGEXES,
+    PersistentVolumeTableOfContentsCache,
+    VolumeContents,
+    VolumeSpaceMap,
+    VolumeTableOfContents,
+    VolumeTableOfContentsCache,
+    VolumeTableOfContentsError,
+    VtocEntry,
+)
+import json
+import os
+import stat
+import time
+import zlib
+import pytest
+
+LISTVTOC_OUTPUT = "\n".join(
+    [
+    "1                                       SYSTEMS SUPPORT UTILITIES---IEHLIST                         PAGE    1",
+    "0    CONTENTS OF VTOC ON VOL USER02  <THIS VOLUME IS NOT CURRENTLY SMS MANAGED>",
+    " THERE IS A 2 LEVEL VTOC INDEX",
+    " DATA SETS ARE LISTED IN ALPHANUMERIC ORDER",
+    "0---------------DATA SET NAME----------------   SER NO SEQNO DATE.CRE DATE.EXP DATE.REF EXT DSORG  RECFM OPTCD  BLKSIZE",
+    " USER.PRIVATE.PDS                               USER02     1 2020.062 00.000   2020.078   1 PO     FB    00     27920",
+    "0SMS.IND LRECL KEYLEN INITIAL ALLOC 2ND ALLOC EXTEND LAST BLK(T-R-L) DIR.REM F2 OR F3(C-H-R) DSCB(C-H-R)",
+    "            80        CYLS                  1 27998AV  0   3  1      21                      17 12  3",
+    "                  EATTR",
+    "                  NS",
+    "0  EXTENTS  NO LOW(C-H)    HIGH(C-H)       NO LOW(C-H)    HIGH(C-H)       NO LOW(C-H)    HIGH(C-H)",
+    "             0  1109  0     1109 14        ",
+    "0---------------DATA SET NAME----------------   SER NO SEQNO DATE.CRE DATE.EXP DATE.REF EXT DSORG  RECFM OPTCD  BLKSIZE",
+    " USER.PRIVATE.SEQ                               USER02     1 2020.062 00.000   2020.078   4 PS     VB    00     27998",
+    "0SMS.IND LRECL KEYLEN INITIAL ALLOC 2ND ALLOC EXTEND LAST BLK(T-R-L) DIR.REM F2 OR F3(C-H-R) DSCB(C-H-R)",
+    " S         137        TRKS                 15 1024KB   12   7                                17 12  4",
+    "                  EATTR",
+    "                  NS",
+    "0  EXTENTS  NO LOW(C-H)    HIGH(C-H)       NO LOW(C-H)    HIGH(C-H)       NO LOW(C-H)    HIGH(C-H)",
+    "             0  1110  0     1110 14         1  1200  0     1201 14         2  1305  5     1305  9 ",
+    "             3  1400  0     1400  1        ",
+    "0---------------DATA SET NAME----------------   SER NO SEQNO DATE.CRE DATE.EXP DATE.REF EXT DSORG  RECFM OPTCD  BLKSIZE",
+    " USER.PRIVATE.VSAM.DATA                         USER02     1 2020.062 00.000   00.000     1 VS     U     00     4096",
+    "0SMS.IND LRECL KEYLEN INITIAL ALLOC 2ND ALLOC EXTEND LAST BLK(T-R-L) DIR.REM F2 OR F3(C-H-R) DSCB(C-H-R)",
+    "                      CYLS                  1                                                17 12  5",
+    "                  EATTR",
+    "                  NS",
+    "0  EXTENTS  NO LOW(C-H)    HIGH(C-H)       NO LOW(C-H)    HIGH(C-H)       NO LOW(C-H)    HIGH(C-H)",
+    "             0  2000  0     2004 14        ",
+    "0---------------DATA SET NAME----------------   SER NO SEQNO DATE.CRE DATE.EXP DATE.REF EXT DSORG  RECFM OPTCD  BLKSIZE",
+    " USER.PRIVATE.EMPTY                             USER02     1 2020.062 00.000   00.000     0 PS     FB    00     27920",
+    "0SMS.IND LRECL KEYLEN INITIAL ALLOC 2ND ALLOC EXTEND LAST BLK(T-R-L) DIR.REM F2 OR F3(C-H-R) DSCB(C-H-R)",
+    "            80        TRKS                  0 2MB                                            17 12  6",
+    "                  EATTR",
+    "                  NS",
+    "0THE ABOVE DATASET HAS NO EXTENTS",
+    "0THERE ARE   4372 EMPTY CYLINDERS PLUS  12 EMPTY TRACKS ON THIS VOLUME",
+    " THERE ARE   4021 BLANK DSCBS IN THE VTOC ON THIS VOLUME",
+    ]
+)
+
+
+class FakeModule(object):
+    """ Stands in for AnsibleModule, returning canned IEHLIST output. """
+
+    def __init__(self, stdout=LISTVTOC_OUTPUT, rc=0):
+        self.stdout = stdout
+        self.rc = rc
+        self.commands = []
+
+    def run_command(self, args, data=None, **kwargs):
+        self.commands.append((args, data))
+        return self.rc, self.stdout, ""
+
+
+@pytest.fixture
+def mvscmd(tmp_path, monkeypatch):
+    """ Places an executable named mvscmd on PATH that prints the
+    listing written to the returned file, and records its invocation. """
+    listing = tmp_path.joinpath("listing.txt")
+    listing.write_text(LISTVTOC_OUTPUT)
+    script = tmp_path.joinpath("mvscmd")
+    script.write_text(
+        "#!/bin/sh\n"
+        'echo "$@" > {0}/args.txt\n'
+        "cat > {0}/sysin.txt\n"
+        'case "$*" in *VSLOW*) exec sleep 5;; *VFAIL*) exit 12;; esac\n'
+        "cat {1}\n"
+        "exit $(cat {0}/rc.txt 2>/dev/null || echo 0)\n".format(tmp_path, listing)
+    )
+    script.chmod(script.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", "{0}{1}{2}".format(tmp_path, os.pathsep, os.environ.get("PATH")))
+    return tmp_path
+
+
+def test_volume_entry_parsed():
+    vtoc = VolumeTableOfContents(FakeModule())
+    data_sets = vtoc.get_volume_entry("user02")
+    assert [ds.get("data_set_name") for ds in data_sets] == [
+        "USER.PRIVATE.PDS",
+        "USER.PRIVATE.SEQ",
+        "USER.PRIVATE.VSAM.DATA",
+        "USER.PRIVATE.EMPTY",
+    ]
+
+
+def test_no_cache_lists_volume_every_call():
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module)
+    vtoc.get_volume_entry("USER02")
+    vtoc.get_volume_entry("USER02")
+    assert len(module.commands) == 2
+
+
+def test_cache_lists_volume_once():
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module, VolumeTableOfContentsCache())
+    first = vtoc.get_volume_entry("USER02")
+    second = vtoc.get_volume_entry("user02")
+    assert vtoc.get_data_set_entry("user.private.seq", "USER02") is not None
+    assert first is second
+    assert len(module.commands) == 1
+
+
+def test_cache_is_keyed_by_volume():
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module, VolumeTableOfContentsCache())
+    vtoc.get_volume_entry("USER02")
+    vtoc.get_volume_entry("USER03")
+    vtoc.get_volume_entry("USER03")
+    assert len(module.commands) == 2
+
+
+def test_cache_shared_between_instances():
+    module = FakeModule()
+    cache = VolumeTableOfContentsCache()
+    VolumeTableOfContents(module, cache).get_volume_entry("USER02")
+    VolumeTableOfContents(module, cache).get_volume_entry("USER02")
+    assert len(module.commands) == 1
+
+
+@pytest.mark.parametrize("volume", ["USER02", None])
+def test_cache_invalidate(volume):
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module, VolumeTableOfContentsCache())
+    vtoc.get_volume_entry("USER02")
+    vtoc.cache.invalidate(volume)
+    vtoc.get_volume_entry("USER02")
+    assert len(module.commands) == 2
+
+
+def test_cache_snapshot_expires():
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module, VolumeTableOfContentsCache(ttl=-1))
+    vtoc.get_volume_entry("USER02")
+    vtoc.get_volume_entry("USER02")
+    assert len(module.commands) == 2
+
+
+def test_failed_listing_not_cached():
+    module = FakeModule(rc=8)
+    vtoc = VolumeTableOfContents(module, VolumeTableOfContentsCache())
+    assert vtoc.get_volume_entry("USER02") is None
+    assert vtoc.get_volume_entry("USER02") is None
+    assert len(module.commands) == 2
+
+
+def test_volume_contents_behaves_like_list():
+    data_sets = VolumeTableOfContents(FakeModule()).get_volume_entry("USER02")
+    assert isinstance(data_sets, list)
+    assert len(data_sets) == 4
+    assert data_sets[1].get("data_set_name") == "USER.PRIVATE.SEQ"
+
+
+def test_volume_contents_find():
+    data_sets = VolumeTableOfContents(FakeModule()).get_volume_entry("USER02")
+    assert data_sets.find("user.private.seq") is data_sets[1]
+    assert data_sets.find("USER.PRIVATE.MISSING") is None
+    assert (
+        VolumeTableOfContents.find_data_set_in_volume_output(
+            "user.private.vsam.data", data_sets
+        )
+        is data_sets[2]
+    )
+
+
+def test_find_in_plain_list():
+    data_sets = list(VolumeTableOfContents(FakeModule()).get_volume_entry("USER02"))
+    assert (
+        VolumeTableOfContents.find_data_set_in_volume_output("USER.PRIVATE.PDS", data_sets)
+        is data_sets[0]
+    )
+
+
+def test_volume_contents_index_follows_changes():
+    data_sets = VolumeContents([{"data_set_name": "USER.ONE"}])
+    assert data_sets.find("USER.TWO") is None
+    data_sets.append({"data_set_name": "USER.TWO"})
+    assert data_sets.find("USER.TWO") is not None
+    del data_sets[0]
+    assert data_sets.find("USER.ONE") is None
+
+
+def test_volume_contents_index_follows_in_place_add_and_clear():
+    data_sets = VolumeContents([{"data_set_name": "USER.ONE"}])
+    assert data_sets.find("USER.TWO") is None
+    data_sets += [{"data_set_name": "USER.TWO"}]
+    assert isinstance(data_sets, VolumeContents)
+    assert data_sets.find("USER.TWO") is not None
+    assert len(data_sets.find_by_pattern("USER.*")) == 2
+    data_sets.clear()
+    assert data_sets.find("USER.ONE") is None
+    assert data_sets.find_by_pattern("USER.*") == []
+
+
+def test_volume_contents_index_follows_reordering():
+    first = {"data_set_name": "USER.DUP", "sequence": "1"}
+    second = {"data_set_name": "USER.DUP", "sequence": "2"}
+    data_sets = VolumeContents([first, second])
+    assert data_sets.find("USER.DUP") is first
+    data_sets.reverse()
+    assert data_sets.find("USER.DUP") is second
+    data_sets.sort(key=lambda data_set: data_set["sequence"])
+    assert data_sets.find("USER.DUP") is first
+
+
+@pytest.mark.parametrize(
+    "pattern,expected",
+    [
+        ("A.B.**", ["A.B", "A.B.C", "A.B.C.D"]),
+        ("**.B", ["A.B", "A.X.B", "B"]),
+        ("A.**.B", ["A.B", "A.X.B"]),
+        ("**", ["A.B", "A.B.C", "A.B.C.D", "A.BC", "A.X.B", "B"]),
+    ],
+)
+def test_volume_contents_find_by_pattern_zero_qualifiers(pattern, expected):
+    data_sets = VolumeContents(
+        [
+            {"data_set_name": name}
+            for name in ["A.B", "A.B.C", "A.B.C.D", "A.BC", "A.X.B", "B"]
+        ]
+    )
+    found = data_sets.find_by_pattern(pattern)
+    assert [ds.get("data_set_name") for ds in found] == expected
+
+
+def test_volume_contents_first_record_wins():
+    first = {"data_set_name": "USER.DUP", "sequence": "1"}
+    data_sets = VolumeContents([first, {"data_set_name": "USER.DUP", "sequence": "2"}])
+    assert data_sets.find("USER.DUP") is first
+
+
+@pytest.mark.parametrize(
+    "pattern,expected",
+    [
+        ("USER.PRIVATE.*", ["USER.PRIVATE.PDS", "USER.PRIVATE.SEQ", "USER.PRIVATE.EMPTY"]),
+        ("USER.**", ["USER.PRIVATE.PDS", "USER.PRIVATE.SEQ", "USER.PRIVATE.VSAM.DATA", "USER.PRIVATE.EMPTY"]),
+        ("user.private.%%%", ["USER.PRIVATE.PDS", "USER.PRIVATE.SEQ"]),
+        ("*.PRIVATE.VSAM.*", ["USER.PRIVATE.VSAM.DATA"]),
+        ("OTHER.**", []),
+    ],
+)
+def test_volume_contents_find_by_pattern(pattern, expected):
+    data_sets = VolumeTableOfContents(FakeModule()).get_volume_entry("USER02")
+    found = data_sets.find_by_pattern(pattern)
+    assert [ds.get("data_set_name") for ds in found] == expected
+
+
+def test_iter_volume_entries_matches_full_listing(mvscmd):
+    vtoc = VolumeTableOfContents(FakeModule())
+    streamed = list(vtoc.iter_volume_entries("user02"))
+    assert streamed == vtoc.get_volume_entry("USER02")
+    assert "--dd=SYS1.VVDS.VUSER02" in mvscmd.joinpath("args.txt").read_text()
+    assert mvscmd.joinpath("sysin.txt").read_text().strip() == "LISTVTOC FORMAT,VOL=3390=USER02"
+
+
+def test_iter_volume_entries_stop_early(mvscmd):
+    vtoc = VolumeTableOfContents(FakeModule())
+    entries = vtoc.iter_volume_entries("USER02")
+    assert next(entries).get("data_set_name") == "USER.PRIVATE.PDS"
+    entries.close()
+
+
+def test_iter_volume_entries_failure(mvscmd):
+    mvscmd.joinpath("rc.txt").write_text("8")
+    vtoc = VolumeTableOfContents(FakeModule())
+    with pytest.raises(VolumeTableOfContentsError):
+        list(vtoc.iter_volume_entries("USER02"))
+
+
+def test_iter_volume_entries_fills_cache(mvscmd):
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module, VolumeTableOfContentsCache())
+    streamed = list(vtoc.iter_volume_entries("USER02"))
+    assert vtoc.get_volume_entry("USER02") == streamed
+    assert list(vtoc.iter_volume_entries("USER02")) == streamed
+    assert len(module.commands) == 0
+
+
+def test_get_volume_entries_merges_volumes(mvscmd):
+    data_sets = VolumeTableOfContents(FakeModule()).get_volume_entries(
+        ["USER02", "user03", "USER02"], max_workers=2
+    )
+    assert len(data_sets) == 8
+    assert data_sets.errors == {}
+    assert data_sets.find("USER.PRIVATE.SEQ") is data_sets[1]
+    assert len(data_sets.find_by_pattern("USER.PRIVATE.EMPTY")) == 2
+
+
+def test_get_volume_entries_partial_results(mvscmd):
+    data_sets = VolumeTableOfContents(FakeModule()).get_volume_entries(
+        ["VSLOW", "USER02", "VFAIL"], timeout=0.5
+    )
+    assert len(data_sets) == 4
+    assert sorted(data_sets.errors) == ["VFAIL", "VSLOW"]
+    assert "RC=12" in data_sets.errors["VFAIL"]
+    assert "0.5 seconds" in data_sets.errors["VSLOW"]
+
+
+def test_get_volume_entries_uses_cache(mvscmd):
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module, VolumeTableOfContentsCache())
+    vtoc.get_volume_entry("USER02")
+    data_sets = vtoc.get_volume_entries(["USER02", "USER03", "VFAIL"])
+    assert len(data_sets) == 8
+    assert vtoc.cache.get("USER03") is not None
+    assert vtoc.cache.get("VFAIL") is None
+    assert len(module.commands) == 1
+
+
+def test_persistent_cache_reused_between_runs(tmp_path):
+    module = FakeModule()
+    directory = str(tmp_path.joinpath("cache"))
+    listed = VolumeTableOfContents(
+        module, PersistentVolumeTableOfContentsCache(directory)
+    ).get_volume_entry("USER02")
+    listed[1].extents
+    vtoc = VolumeTableOfContents(module, PersistentVolumeTableOfContentsCache(directory))
+    loaded = vtoc.get_volume_entry("user02")
+    assert len(module.commands) == 1
+    assert [ds.to_dict() for ds in loaded] == [ds.to_dict() for ds in listed]
+    assert loaded[0].last_block_pointer.bytes_remaining == 1
+    assert loaded[1].extents == listed[1].extents
+    assert os.listdir(directory) == ["USER02.vtoc"]
+
+
+def test_persistent_cache_targeted_lookups_list_volume(tmp_path):
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(
+        module, PersistentVolumeTableOfContentsCache(str(tmp_path))
+    )
+    assert vtoc.get_data_set_entry("USER.PRIVATE.PDS", "USER02") is not None
+    assert vtoc.get_data_set_entry("USER.PRIVATE.SEQ", "USER02") is not None
+    assert len(module.commands) == 1
+    assert "DSNAME" not in module.commands[0][1]
+
+
+def test_persistent_cache_expires(tmp_path):
+    module = FakeModule()
+    VolumeTableOfContents(
+        module, PersistentVolumeTableOfContentsCache(str(tmp_path))
+    ).get_volume_entry("USER02")
+    path = str(tmp_path.joinpath("USER02.vtoc"))
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    cache = PersistentVolumeTableOfContentsCache(str(tmp_path), max_age=60)
+    assert cache.get("USER02") is None
+    assert not os.path.exists(path)
+    assert PersistentVolumeTableOfContentsCache(str(tmp_path)).get("USER02") is None
+
+
+def test_persistent_cache_invalidate(tmp_path):
+    module = FakeModule()
+    cache = PersistentVolumeTableOfContentsCache(str(tmp_path))
+    vtoc = VolumeTableOfContents(module, cache)
+    vtoc.get_volume_entry("USER02")
+    vtoc.get_volume_entry("USER03")
+    cache.invalidate("USER02")
+    assert os.listdir(str(tmp_path)) == ["USER03.vtoc"]
+    cache.invalidate()
+    assert os.listdir(str(tmp_path)) == []
+
+
+def test_persistent_cache_evicts_oldest(tmp_path):
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module, PersistentVolumeTableOfContentsCache(str(tmp_path)))
+    vtoc.get_volume_entry("USER01")
+    size = os.path.getsize(str(tmp_path.joinpath("USER01.vtoc")))
+    os.utime(str(tmp_path.joinpath("USER01.vtoc")), (time.time() - 10, time.time() - 10))
+    vtoc.cache.max_size = size * 2
+    vtoc.get_volume_entry("USER02")
+    vtoc.get_volume_entry("USER03")
+    assert sorted(os.listdir(str(tmp_path))) == ["USER02.vtoc", "USER03.vtoc"]
+
+
+def test_persistent_cache_ignores_damaged_snapshot(tmp_path):
+    tmp_path.joinpath("USER02.vtoc").write_bytes(b"not a snapshot")
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module, PersistentVolumeTableOfContentsCache(str(tmp_path)))
+    assert len(vtoc.get_volume_entry("USER02")) == 4
+    assert len(module.commands) == 1
+
+
+@pytest.mark.parametrize(
+    "data_sets",
+    [
+        None,
+        {"USER.PRIVATE.PDS": []},
+        ["not an entry"],
+        [[None]],
+        [[{"cylinder": 1}] * len(VtocEntry.__slots__)],
+    ],
+)
+def test_persistent_cache_ignores_malformed_snapshot(tmp_path, data_sets):
+    snapshot = {
+        "version": CACHE_FORMAT_VERSION,
+        "fields": list(VtocEntry.__slots__),
+        "data_sets": data_sets,
+    }
+    path = tmp_path.joinpath("USER02.vtoc")
+    path.write_bytes(zlib.compress(json.dumps(snapshot).encode("utf-8")))
+    cache = PersistentVolumeTableOfContentsCache(str(tmp_path))
+    assert cache.get("USER02") is None
+    assert not path.exists()
+
+
+class TargetedListingRejected(FakeModule):
+    """ Fails any IEHLIST request limited to particular data sets. """
+
+    def run_command(self, args, data=None, **kwargs):
+        self.commands.append((args, data))
+        if "DSNAME" in data:
+            return 12, "", ""
+        return self.rc, self.stdout, ""
+
+
+def test_get_data_set_entries_targeted():
+    module = FakeModule()
+    data_sets = VolumeTableOfContents(module).get_data_set_entries(
+        ["user.private.seq", "USER.PRIVATE.MISSING"], "USER02"
+    )
+    assert [ds.data_set_name for ds in data_sets] == ["USER.PRIVATE.SEQ"]
+    assert len(module.commands) == 1
+    assert module.commands[0][1].split("\n") == [
+        "{0:<71}X".format("  LISTVTOC FORMAT,VOL=3390=USER02,DSNAME=(USER.PRIVATE.SEQ,"),
+        "               USER.PRIVATE.MISSING)",
+    ]
+
+
+def test_get_data_set_entries_uses_snapshot():
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module, VolumeTableOfContentsCache())
+    vtoc.get_volume_entry("USER02")
+    assert vtoc.get_data_set_entry("USER.PRIVATE.PDS", "USER02") is not None
+    assert len(module.commands) == 1
+
+
+def test_get_data_set_entries_falls_back_to_full_listing():
+    module = TargetedListingRejected()
+    vtoc = VolumeTableOfContents(module, VolumeTableOfContentsCache())
+    data_sets = vtoc.get_data_set_entries(["USER.PRIVATE.VSAM.DATA"], "USER02")
+    assert [ds.data_set_name for ds in data_sets] == ["USER.PRIVATE.VSAM.DATA"]
+    assert "DSNAME" not in module.commands[-1][1]
+    assert vtoc.cache.get("USER02") is not None
+
+
+def test_get_data_set_entries_caches_targeted_listing():
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module, VolumeTableOfContentsCache())
+    names = ["USER.PRIVATE.VSAM", "USER.PRIVATE.VSAM.DATA"]
+    first = vtoc.get_data_set_entries(names, "USER02")
+    second = vtoc.get_data_set_entries([name.lower() for name in reversed(names)], "user02")
+    assert [ds.data_set_name for ds in first] == ["USER.PRIVATE.VSAM.DATA"]
+    assert [ds.data_set_name for ds in second] == ["USER.PRIVATE.VSAM.DATA"]
+    assert vtoc.get_data_set_entry("USER.PRIVATE.VSAM", "USER02") is None
+    assert len(module.commands) == 1
+    assert "DSNAME" in module.commands[0][1]
+
+
+def test_get_data_set_entries_lists_volume_once_more():
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module, VolumeTableOfContentsCache())
+    vtoc.get_data_set_entries(["USER.PRIVATE.PDS"], "USER02")
+    assert vtoc.get_data_set_entry("USER.PRIVATE.SEQ", "USER02") is not None
+    assert vtoc.get_data_set_entry("USER.PRIVATE.EMPTY", "USER02") is not None
+    assert len(module.commands) == 2
+    assert "DSNAME" not in module.commands[1][1]
+
+
+def test_get_data_set_entries_invalidate_targeted_listing():
+    module = FakeModule()
+    vtoc = VolumeTableOfContents(module, VolumeTableOfContentsCache())
+    vtoc.get_data_set_entries(["USER.PRIVATE.PDS"], "USER02")
+    vtoc.cache.invalidate("USER02")
+    vtoc.get_data_set_entries(["USER.PRIVATE.PDS"], "USER02")
+    assert len(module.commands) == 2
+    assert "DSNAME" in module.commands[1][1]
+
+
+def test_get_data_set_entries_skips_names_too_long():
+    module = FakeModule()
+    name = "USER.PRIVATE.DATA.SET.NAME.OF.FOURTY.FOUR.CH"
+    assert len(name) == 44
+    data_sets = VolumeTableOfContents(module).get_data_set_entries(
+        [name + ".DATA"], "USER02"
+    )
+    assert len(data_sets) == 0
+    assert module.commands == []
+    VolumeTableOfContents(module).get_data_set_entries([name, name + ".DATA"], "USER02")
+    assert len(module.commands) == 1
+    assert name + ".DATA" not in module.commands[0][1]
+
+
+def test_get_data_set_entries_batches_names():
+    module = FakeModule()
+    names = ["USER.PRIVATE.DATA{0:02d}".format(index) for index in range(25)]
+    VolumeTableOfContents(module).get_data_set_entries(names, "USER02")
+    assert len(module.commands) == 3
+    assert module.commands[2][1].count("USER.PRIVATE.DATA") == 5
+
+
+@pytest.mark.parametrize(
+    "names",
+    [
+        ["USER.PRIVATE.LONG.DATA.SET.NAME{0:02d}".format(index) for index in range(4)],
+        # the first name ends exactly in column 71, without room for its comma
+        ["AA.AAAAA.AA.AAAAAAAA.AAAAAAAA", "BB.BBBBBBBB", "CC.CCCCCCCC"],
+        ["AA.AAAAA.AA.AAAAAAAA.AAAAAAA", "BB.BBBBBBBB", "CC.CCCCCCCC"],
+        ["USER.PRIVATE.DATA{0:02d}".format(index) for index in range(10)],
+    ],
+)
+def test_listvtoc_statement_continued(names):
+    dummy, stdin = VolumeTableOfContents(None)._listvtoc_input("VOL001", names)
+    lines = stdin.split("\n")
+    assert len(lines) > 1
+    for line in lines[:-1]:
+        assert len(line) == 72 and line[71] == "X" and line[:71].rstrip().endswith(",")
+    for line in lines[1:]:
+        assert line[:15].strip() == "" and line[15] != " "
+    assert "".join(line[:71].strip() for line in lines) == (
+        "LISTVTOC FORMAT,VOL=3390=VOL001,DSNAME=({0})".format(",".join(names))
+    )
+    assert len(lines[-1]) <= 71
+
+
+def test_space_map_free_extents():
+    space_map = VolumeTableOfContents(FakeModule()).get_space_map("USER02", 3339)
+    assert [(extent.low, extent.high) for extent in space_map.free_extents] == [
+        ((0, 0), (1108, 14)),
+        ((1111, 0), (1199, 14)),
+        ((1202, 0), (1305, 4)),
+        ((1305, 10), (1399, 14)),
+        ((1400, 2), (1999, 14)),
+        ((2005, 0), (3338, 14)),
+    ]
+    assert space_map.free_tracks == 3339 * 15 - 142
+    assert space_map.largest_free_extent.low == (2005, 0)
+    assert space_map.largest_free_cylinders == 1334
+    assert space_map.fragmentation_index == 599
+
+
+def test_space_map_fits():
+    space_map = VolumeTableOfContents(FakeModule()).get_space_map("USER02", 3339)
+    assert space_map.fits(1334)
+    assert not space_map.fits(1335)
+    assert space_map.fits(2443, extents=2)
+    assert not space_map.fits(2444, extents=2)
+
+
+def test_space_map_empty_and_truncated_volume():
+    empty = VolumeSpaceMap([], 10)
+    assert empty.largest_free_cylinders == 10
+    assert empty.fragmentation_index == 0
+    truncated = VolumeSpaceMap(
+        VolumeTableOfContents(FakeModule()).get_volume_entry("USER02"), 1110
+    )
+    assert [(extent.low, extent.high) for extent in truncated.free_extents] == [
+        ((0, 0), (1108, 14))
+    ]
+    assert not VolumeSpaceMap([], 0).fits(1)
+
+
+def test_diff_volume_entries():
+    vtoc = VolumeTableOfContents(None)
+    sections = vtoc._separate_data_set_sections(LISTVTOC_OUTPUT)
+    changed_listing = "\n".join(
+        [
+            sections[0].replace("2020.078", "2020.101"),
+            sections[1].replace("             3  1400  0     1400  1", "             3  1400  0     1400  4"),
+            sections[1].replace("USER.PRIVATE.SEQ", "USER.PRIVATE.NEW"),
+            sections[2],
+        ]
+    )
+    previous = vtoc._process_output(LISTVTOC_OUTPUT)
+    current = vtoc._process_output(changed_listing)
+    diff = VolumeTableOfContents.diff_volume_entries(previous, current)
+    assert [ds.data_set_name for ds in diff.added] == ["USER.PRIVATE.NEW"]
+    assert [ds.data_set_name for ds in diff.removed] == ["USER.PRIVATE.EMPTY"]
+    assert [(change.current.data_set_name, change.fields) for change in diff.changed] == [
+        ("USER.PRIVATE.PDS", ["last_referenced_date"]),
+        ("USER.PRIVATE.SEQ", ["extents"]),
+    ]
+    assert diff.changed[1].current.extents[3].tracks == 5
+
+
+def test_diff_volume_entries_unchanged():
+    data_sets = VolumeTableOfContents(FakeModule()).get_volume_entry("USER02")
+    diff = VolumeTableOfContents.diff_volume_entries(data_sets, list(reversed(data_sets)))
+    assert diff == ([], [], [])
+
+
+def test_separate_data_set_sections():
+    sections = VolumeTableOfContents(None)._separate_data_set_sections(LISTVTOC_OUTPUT)
+    assert len(sections) == 4
+    assert all(section.startswith("0---------------DATA SET NAME") for section in sections)
+
+
+EXPECTED_SEQUENTIAL_DATA_SET = {
+    "block_size": "27998",
+    "creation_date": "2020.062",
+    "data_set_name": "USER.PRIVATE.SEQ",
+    "data_set_organization": "PS",
+    "dscb_format_1_or_8": {"cylinder": "17", "record": "4", "track": "12"},
+    "expiration_date": "00.000",
+    "extended_attributes": "NS",
+    "extents": [
+        {"high": {"cylinder": "1110", "track": "14"}, "low": {"cylinder": "1110", "track": "0"}, "number": "0"},
+        {"high": {"cylinder": "1201", "track": "14"}, "low": {"cylinder": "1200", "track": "0"}, "number": "1"},
+        {"high": {"cylinder": "1305", "track": "9"}, "low": {"cylinder": "1305", "track": "5"}, "number": "2"},
+        {"high": {"cylinder": "1400", "track": "1"}, "low": {"cylinder": "1400", "track": "0"}, "number": "3"},
+    ],
+    "last_referenced_date": "2020.078",
+    "number_of_extents": "4",
+    "option_code": "00",
+    "original_space_secondary": "1024KB",
+    "record_format": "VB",
+    "record_length": "137",
+    "sequence": "1",
+    "sms_attributes": "S",
+    "space_secondary": "15",
+    "space_type": "TRKS",
+    "volume": "USER02",
+}
+
+EXPECTED_PARTITIONED_DATA_SET = {
+    "average_block_size": "27998",
+    "block_size": "27920",
+    "creation_date": "2020.062",
+    "data_set_name": "USER.PRIVATE.PDS",
+    "data_set_organization": "PO",
+    "dscb_format_1_or_8": {"cylinder": "17", "record": "3", "track": "12"},
+    "expiration_date": "00.000",
+    "extended_attributes": "NS",
+    "extents": [
+        {"high": {"cylinder": "1109", "track": "14"}, "low": {"cylinder": "1109", "track": "0"}, "number": "0"}
+    ],
+    "last_block_pointer": {"block": "3", "bytes_remaining": "1", "track": "0"},
+    "last_directory_block_bytes_used": "21",
+    "last_referenced_date": "2020.078",
+    "number_of_extents": "1",
+    "option_code": "00",
+    "record_format": "FB",
+    "record_length": "80",
+    "sequence": "1",
+    "space_secondary": "1",
+    "space_type": "CYLS",
+    "volume": "USER02",
+}
+
+EXPECTED_EMPTY_DATA_SET = {
+    "block_size": "27920",
+    "creation_date": "2020.062",
+    "data_set_name": "USER.PRIVATE.EMPTY",
+    "data_set_organization": "PS",
+    "dscb_format_1_or_8": {"cylinder": "17", "record": "6", "track": "12"},
+    "expiration_date": "00.000",
+    "extended_attributes": "NS",
+    "last_referenced_date": "00.000",
+    "number_of_extents": "0",
+    "option_code": "00",
+    "original_space_secondary": "2MB",
+    "record_format": "FB",
+    "record_length": "80",
+    "sequence": "1",
+    "space_secondary": "0",
+    "space_type": "TRKS",
+    "volume": "USER02",
+}
+
+
+@pytest.mark.parametrize(
+    "index,expected",
+    [
+        (0, EXPECTED_PARTITIONED_DATA_SET),
+        (1, EXPECTED_SEQUENTIAL_DATA_SET),
+        (3, EXPECTED_EMPTY_DATA_SET),
+    ],
+)
+def test_parse_data_set_info(index, expected):
+    vtoc = VolumeTableOfContents(None)
+    section = vtoc._separate_data_set_sections(LISTVTOC_OUTPUT)[index]
+    assert vtoc._parse_data_set_info(section).to_dict() == expected
+
+
+def test_vtoc_entry_typed_fields():
+    data_sets = VolumeTableOfContents(FakeModule()).get_volume_entry("USER02")
+    partitioned = data_sets[0]
+    assert isinstance(partitioned, VtocEntry)
+    assert partitioned.block_size == 27920
+    assert partitioned.number_of_extents == 1
+    assert partitioned.last_block_pointer == (0, 3, 1)
+    assert partitioned.dscb_format_1_or_8.record == 3
+    assert partitioned.dscb_format_2_or_3 is None
+    assert data_sets[2].last_block_pointer is None
+    with pytest.raises(AttributeError):
+        partitioned.dsorg
+
+
+def test_vtoc_entry_extents_parsed_on_access():
+    sequential = VolumeTableOfContents(FakeModule()).get_volume_entry("USER02")[1]
+    assert sequential._extents is None
+    assert len(sequential.extents) == 4
+    assert sequential.extents is sequential.extents
+    assert VolumeTableOfContents(FakeModule()).get_volume_entry("USER02")[3].extents is None
+
+
+def test_extents_decoded_to_integers():
+    sequential = VolumeTableOfContents(FakeModule()).get_volume_entry("USER02")[1]
+    assert [extent.number for extent in sequential.extents] == [0, 1, 2, 3]
+    assert sequential.extents[1].low == (1200, 0)
+    assert sequential.extents[1].high.cylinder == 1201
+    assert [extent.tracks for extent in sequential.extents] == [15, 30, 5, 2]
+
+
+def test_parse_extents_as_strings():
+    section = VolumeTableOfContents(None)._separate_data_set_sections(LISTVTOC_OUTPUT)[1]
+    extents = VolumeTableOfContents._parse_extents(section.split("\n")[6:], as_strings=True)
+    assert extents == {"extents": EXPECTED_SEQUENTIAL_DATA_SET["extents"]}
+
+
+def test_vtoc_entry_extents_damaged():
+    data_set = VtocEntry({"data_set_name": "USER.BROKEN"}, ["0  EXTENTS  NO", "   garbage"])
+    with pytest.raises(VolumeTableOfContentsError):
+        data_set.extents
+
+
+def test_vtoc_entry_dictionary_access():
+    empty = VolumeTableOfContents(FakeModule()).get_volume_entry("USER02")[3]
+    assert empty.get("block_size") == "27920"
+    assert empty["dscb_format_1_or_8"] == {"cylinder": "17", "track": "12", "record": "6"}
+    assert empty.get("extents", []) == []
+    assert "last_block_pointer" not in empty
+    with pytest.raises(KeyError):
+        empty["extents"]
+
+
+def test_table_row_layout_reused():
+    vtoc = VolumeTableOfContents(None)
+    sections = [section.split("\n") for section in vtoc._separate_data_set_sections(LISTVTOC_OUTPUT)]
+    regex = TABLE_ROW_REGEXES[0]
+    layouts = [vtoc._table_row_layout(regex, section[0]) for section in sections]
+    assert all(layout is layouts[0] for layout in layouts)
+    assert [field[2] for field in layouts[0]][:3] == ["data_set_name", "volume", "sequence"]
+
+
+def test_parse_table_rows():
+    vtoc = VolumeTableOfContents(None)
+    section = vtoc._separate_data_set_sections(LISTVTOC_OUTPUT)[1].split("\n")
+    rows = [
+        vtoc._parse_table_row(regex, section[index * 2], section[index * 2 + 1])
+        for index, regex in enumerate(TABLE_ROW_REGEXES)
+    ]
+    assert rows == [
+        {
+            "data_set_name": "USER.PRIVATE.SEQ",
+            "volume": "USER02",
+            "sequence": "1",
+            "creation_date": "2020.062",
+            "expiration_date": "00.000",
+            "last_referenced_date": "2020.078",
+            "number_of_extents": "4",
+            "data_set_organization": "PS",
+            "record_format": "VB",
+            "option_code": "00",
+            "block_size": "27998",
+        },
+        {
+            "sms_attributes": "S",
+            "record_length": "137",
+            "space_type": "TRKS",
+            "space_secondary": "15",
+            "original_space_secondary": "1024KB",
+            "dscb_format_1_or_8": {"cylinder": "17", "track": "12", "record": "4"},
+        },
+        {"extended_attributes": "NS"},
+    ]
@@ -90,6 +90,15 @@ def test_job_submit_LOCAL(ansible_zos_module):
         assert result.get("changed") is True
 
 
+def test_job_submit_content(ansible_zos_module):
+    hosts = ansible_zos_module
+    results = hosts.all.zos_job_submit(content=JCL_FILE_CONTENTS, wait=True)
+    for result in results.contacted.values():
+        assert result.get("jobs")[0].get("ret_code").get("msg_code") == "0000"
+        assert result.get("jobs")[0].get("ret_code").get("code") == 0
+        assert result.get("changed") is True
+
+
 # * currently don't have volume support from ZOAU python API, so this will not be reproduceable
 # * in CI/CD testing environment (for now)
 # def test_job_submit_PDS_volume(ansible_zos_module):
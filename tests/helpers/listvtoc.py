@@ -0,0 +1,234 @@
+# Copyright (c) IBM Corporation 2020
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+from __future__ import (absolute_import, division, print_function)
+
+__metaclass__ = type
+
+import random
+
+from ibm_zos_core.plugins.module_utils.vtoc import TABLE_FIELDS, TABLE_ROW_REGEXES
+
+# Generates synthetic IEHLIST LISTVTOC FORMAT output so VTOC parsing
+# can be exercised without access to a z/OS system.
+
+DATA_SET_HEADER = (
+    "0---------------DATA SET NAME----------------   SER NO SEQNO DATE.CRE DATE.EXP "
+    "DATE.REF EXT DSORG  RECFM OPTCD  BLKSIZE"
+)
+ALLOCATION_HEADER = (
+    "0SMS.IND LRECL KEYLEN INITIAL ALLOC 2ND ALLOC EXTEND LAST BLK(T-R-L) DIR.REM "
+    "F2 OR F3(C-H-R) DSCB(C-H-R)"
+)
+ATTRIBUTE_HEADER = "                  EATTR"
+EXTENTS_HEADER = (
+    "0  EXTENTS  NO LOW(C-H)    HIGH(C-H)       NO LOW(C-H)    HIGH(C-H)       "
+    "NO LOW(C-H)    HIGH(C-H)"
+)
+NO_EXTENTS = "0THE ABOVE DATASET HAS NO EXTENTS"
+EXTENT_INDENT = 12
+# Width of one NO/LOW/HIGH column group, the last group on a row is 7 blanks shorter
+EXTENT_WIDTH = 31
+EXTENTS_PER_ROW = 3
+SECTIONS_PER_PAGE = 6
+TRACKS_PER_CYLINDER = 15
+# Cylinders on a 3390 volume which is not an extended address volume
+CYLINDERS_PER_VOLUME = 65520
+
+# (dsorg, recfm, lrecl, blksize, low level qualifiers)
+DATA_SET_KINDS = [
+    ("PS", "FB", "80", "27920", ["SEQ"]),
+    ("PS", "VB", "137", "27998", ["LOG"]),
+    ("PO", "FB", "80", "27920", ["PDS"]),
+    ("PO", "U", "", "6144", ["LOADLIB"]),
+    ("VS", "U", "", "4096", ["KSDS.DATA", "KSDS.INDEX"]),
+    ("VS", "U", "", "4096", ["ESDS.DATA"]),
+]
+
+
+def _place(line, column, value):
+    """ Writes value into line starting at column, padding with blanks. """
+    if len(line) < column:
+        line += " " * (column - len(line))
+    return line[:column] + value + line[column + len(value):]
+
+
+def _row(header, values, right_aligned=()):
+    """ Builds a data row lined up with the columns of a header row.
+    values is a list of (column title, value) pairs. """
+    line = ""
+    for title, value in values:
+        column = header.index(title)
+        if title in right_aligned:
+            column = column + len(title) - len(value)
+        line = _place(line, column, value)
+    return line
+
+
+def _page_header(volume, page):
+    return [
+        "1                                       SYSTEMS SUPPORT UTILITIES---IEHLIST"
+        "                         PAGE {0:>4}".format(page),
+        "0    CONTENTS OF VTOC ON VOL {0}  <THIS VOLUME IS NOT CURRENTLY SMS MANAGED>".format(
+            volume
+        ),
+        " THERE IS A 2 LEVEL VTOC INDEX",
+        " DATA SETS ARE LISTED IN ALPHANUMERIC ORDER",
+    ]
+
+
+def _extent_rows(extents):
+    rows = []
+    for start in range(0, len(extents), EXTENTS_PER_ROW):
+        row = " " * EXTENT_INDENT
+        for number, low, high in extents[start:start + EXTENTS_PER_ROW]:
+            # extent numbers past 99 take up the blank after the number
+            row += "{0:<3}{1:>5}{2:>3}    {3:>5}{4:>3}        ".format(
+                "{0:>2}".format(number), low[0], low[1], high[0], high[1]
+            )
+        rows.append(row[:EXTENT_INDENT + EXTENT_WIDTH * EXTENTS_PER_ROW - 7])
+    return rows
+
+
+def _data_set_section(name, volume, kind, extents, sequence, dscb_record):
+    dsorg, recfm, lrecl, blksize, dummy = kind
+    lines = [DATA_SET_HEADER]
+    lines.append(
+        " "
+        + name.ljust(47)
+        + _row(
+            DATA_SET_HEADER,
+            [
+                ("SER NO", volume),
+                ("SEQNO", str(sequence)),
+                ("DATE.CRE", "2020.062"),
+                ("DATE.EXP", "00.000"),
+                ("DATE.REF", "2020.078"),
+                ("EXT", str(len(extents))),
+                ("DSORG", dsorg),
+                ("RECFM", recfm),
+                ("OPTCD", "00"),
+                ("BLKSIZE", blksize),
+            ],
+            right_aligned=("SEQNO", "EXT"),
+        )[48:]
+    )
+    lines.append(ALLOCATION_HEADER)
+    allocation = [
+        ("LRECL", lrecl),
+        ("INITIAL ALLOC", "CYLS" if dsorg == "VS" else "TRKS"),
+        ("2ND ALLOC", str(len(extents))),
+        ("DSCB(C-H-R)", "  0  0{0:>3}".format(dscb_record)),
+    ]
+    if dsorg == "PO":
+        allocation.append(("DIR.REM", "21"))
+    if dsorg in ("PS", "PO"):
+        allocation.append(("EXTEND", "{0}AV".format(blksize)))
+        allocation.append(("LAST BLK(T-R-L)", "  1  12  0"))
+    lines.append(_row(ALLOCATION_HEADER, allocation, right_aligned=("LRECL", "2ND ALLOC")))
+    lines.append(ATTRIBUTE_HEADER)
+    lines.append("                  NS")
+    if extents:
+        lines.append(EXTENTS_HEADER)
+        lines.extend(_extent_rows(extents))
+    else:
+        lines.append(NO_EXTENTS)
+    return lines
+
+
+def iter_listvtoc_lines(data_set_count, volume="USER01", seed=0, max_extents=16):
+    """ Yields the lines of a synthetic LISTVTOC FORMAT listing holding
+    data_set_count data sets, without line endings. Data sets are a mix of
+    sequential, partitioned and VSAM components, some without extents and
+    some with up to max_extents extents. Extents do not overlap until the
+    listing holds more than fits on a single volume, then allocation
+    wraps around to the start of the volume. """
+    generator = random.Random(seed)
+    next_track = TRACKS_PER_CYLINDER
+    page = 1
+    for line in _page_header(volume, page):
+        yield line
+    index = 0
+    while index < data_set_count:
+        kind = DATA_SET_KINDS[index % len(DATA_SET_KINDS)]
+        base = "USER{0}.APP{1:05d}.D{2:07d}".format(
+            index % 7, index // 1000, index
+        )
+        for low_level_qualifier in kind[4]:
+            if index >= data_set_count:
+                break
+            if index > 0 and index % SECTIONS_PER_PAGE == 0:
+                page += 1
+                for line in _page_header(volume, page):
+                    yield line
+            extent_count = 0
+            if generator.random() > 0.05:
+                extent_count = 1 + int(generator.paretovariate(1.5)) % max_extents
+            extents = []
+            for number in range(extent_count):
+                size = generator.choice([1, 2, 5, 15, 30, 75])
+                if next_track + size > CYLINDERS_PER_VOLUME * TRACKS_PER_CYLINDER:
+                    next_track = TRACKS_PER_CYLINDER
+                low = next_track
+                high = low + size - 1
+                extents.append(
+                    (
+                        number,
+                        divmod(low, TRACKS_PER_CYLINDER),
+                        divmod(high, TRACKS_PER_CYLINDER),
+                    )
+                )
+                next_track = high + 1 + generator.choice([0, 0, 0, 3, 15])
+            for line in _data_set_section(
+                "{0}.{1}".format(base, low_level_qualifier),
+                volume,
+                kind,
+                extents,
+                1,
+                index % 47 + 1,
+            ):
+                yield line
+            index += 1
+    yield "0THERE ARE   4372 EMPTY CYLINDERS PLUS  12 EMPTY TRACKS ON THIS VOLUME"
+    yield " THERE ARE   4021 BLANK DSCBS IN THE VTOC ON THIS VOLUME"
+
+
+def generate_listvtoc_output(data_set_count, volume="USER01", seed=0, max_extents=16):
+    """ Returns a synthetic LISTVTOC FORMAT listing as a single string,
+    as returned in the IEHLIST sysprint. """
+    return "\n".join(
+        iter_listvtoc_lines(data_set_count, volume, seed, max_extents)
+    ) + "\n"
+
+
+def parse_table_rows_per_row_regex(vtoc, lines):
+    """ Reference parser for the table rows of a data set section, which
+    matches the header of every row instead of reusing a cached column
+    layout. Used to check the results of the parser in the module util.
+
+    Arguments:
+        vtoc {VolumeTableOfContents} -- Formats the fields which need more than renaming.
+        lines {list[str]} -- Single data set section of the LISTVTOC output, split into lines.
+
+    Returns:
+        dict -- Structured data for the table rows of the section.
+    """
+    data_set_info = {}
+    for index, regex in enumerate(TABLE_ROW_REGEXES):
+        fields = regex.findall(lines[index * 2])
+        if isinstance(fields[0], str):
+            fields = [[fields[0]]]
+        count = 0
+        for field in fields[0]:
+            end = count + len(field)
+            value = lines[index * 2 + 1][count:end].strip()
+            count = end
+            if not value:
+                continue
+            field_name = field.strip(" -0")
+            name, formatter = TABLE_FIELDS.get(field_name, (field_name, None))
+            if formatter is None:
+                data_set_info[name] = value
+            else:
+                vtoc._format_field_value(name, formatter, value, data_set_info)
+    return data_set_info
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) IBM Corporation 2020
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ibm_zos_core.plugins.module_utils.job import (
+    JOB_STATUS_ABEND,
+    JOB_STATUS_CC,
+    classify_job_status,
+)
+from timeit import default_timer
+import os
+import random
+import re
+
+JOB_COUNT = 100000
+
+# Regression threshold, may be raised through the environment on slow machines
+MAX_SECONDS_PER_RECORD = float(
+    os.environ.get("JOB_STATUS_MAX_SECONDS_PER_RECORD", "0.00002")
+)
+
+RETURN_CODE_MESSAGES = (
+    ["CC {0:04d}".format(rc) for rc in (0, 0, 0, 0, 4, 4, 8, 12, 16)]
+    + ["ABEND S0C4", "ABEND S222", "ABEND S806", "ABEND U0100", "ABEND U4038"]
+    + ["JCL ERROR", "CANCELED", "", "CONV ERR", "SEC ERROR"]
+)
+
+
+def generate_return_code_messages(count):
+    generator = random.Random(count)
+    return [generator.choice(RETURN_CODE_MESSAGES) for dummy in range(count)]
+
+
+def reference_classify(rc_str):
+    """ Reference classifier compiling its patterns on every call,
+    the way return code messages were parsed before. """
+    rc = None
+    match = re.search(r"\s*CC\s*([0-9]+)", rc_str)
+    if match:
+        rc = int(match.group(1))
+    code = None
+    match = re.search(r"(?:\s*CC\s*([0-9]+))|(?:ABEND\s*((?:S|U)[0-9A-F]+))", rc_str)
+    if match:
+        code = match.group(1) or match.group(2)
+    return rc, code
+
+
+def test_job_status_classifier_throughput():
+    messages = generate_return_code_messages(JOB_COUNT)
+
+    start = default_timer()
+    reference = [reference_classify(message) for message in messages]
+    reference_time = default_timer() - start
+
+    start = default_timer()
+    statuses = [classify_job_status(message) for message in messages]
+    classify_time = default_timer() - start
+
+    assert [(status.return_code, status.code) for status in statuses] == reference
+    assert sum(1 for status in statuses if status.status == JOB_STATUS_CC) > 0
+    assert sum(1 for status in statuses if status.status == JOB_STATUS_ABEND) > 0
+    print(
+        "\nJob status, {0} jobs: per-call regex {1:.0f} jobs/s, "
+        "classifier {2:.0f} jobs/s".format(
+            JOB_COUNT, JOB_COUNT / reference_time, JOB_COUNT / classify_time
+        )
+    )
+    assert classify_time / JOB_COUNT < MAX_SECONDS_PER_RECORD
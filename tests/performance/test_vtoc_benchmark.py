@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) IBM Corporation 2020
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from ibm_zos_core.plugins.module_utils.vtoc import (
+    TABLE_ROW_REGEXES,
+    VolumeTableOfContents,
+)
+from ibm_zos_core.tests.helpers.listvtoc import (
+    generate_listvtoc_output,
+    iter_listvtoc_lines,
+    parse_table_rows_per_row_regex,
+)
+from timeit import default_timer
+import os
+import tracemalloc
+import pytest
+
+DATA_SET_COUNT = 100000
+
+# Regression thresholds, may be raised through the environment on slow machines
+MAX_SECONDS_PER_RECORD = float(os.environ.get("VTOC_MAX_SECONDS_PER_RECORD", "0.0002"))
+MAX_PEAK_BYTES_PER_RECORD = int(os.environ.get("VTOC_MAX_PEAK_BYTES_PER_RECORD", "8192"))
+
+
+def parse_rows_column_layout(vtoc, lines):
+    data_set_info = {}
+    for index, regex in enumerate(TABLE_ROW_REGEXES):
+        data_set_info.update(
+            vtoc._parse_table_row(regex, lines[index * 2], lines[index * 2 + 1])
+        )
+    return data_set_info
+
+
+def test_table_row_parser_throughput():
+    vtoc = VolumeTableOfContents(None)
+    sections = list(
+        vtoc._iter_data_set_sections(iter_listvtoc_lines(DATA_SET_COUNT))
+    )
+    assert len(sections) == DATA_SET_COUNT
+
+    start = default_timer()
+    reference = [parse_table_rows_per_row_regex(vtoc, section) for section in sections]
+    reference_time = default_timer() - start
+
+    start = default_timer()
+    parsed = [parse_rows_column_layout(vtoc, section) for section in sections]
+    parsed_time = default_timer() - start
+
+    assert parsed == reference
+    print(
+        "\nLISTVTOC table rows, {0} data sets: per-row regex {1:.0f} records/s, "
+        "column layout {2:.0f} records/s".format(
+            DATA_SET_COUNT,
+            DATA_SET_COUNT / reference_time,
+            DATA_SET_COUNT / parsed_time,
+        )
+    )
+
+
+def best_time(function, repeat):
+    best = None
+    for dummy in range(repeat):
+        start = default_timer()
+        function()
+        elapsed = default_timer() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best
+
+
+def parse_with_extents(listing):
+    data_sets = VolumeTableOfContents(None)._process_output(listing)
+    for data_set in data_sets:
+        data_set.extents
+    return data_sets
+
+
+@pytest.mark.parametrize("data_set_count,repeat", [(1000, 5), (10000, 3), (100000, 1)])
+def test_process_output_regression(data_set_count, repeat):
+    listing = generate_listvtoc_output(data_set_count)
+    vtoc = VolumeTableOfContents(None)
+    assert len(vtoc._process_output(listing)) == data_set_count
+
+    parse_time = best_time(lambda: vtoc._process_output(listing), repeat)
+    full_time = best_time(lambda: parse_with_extents(listing), repeat)
+
+    tracemalloc.start()
+    try:
+        data_sets = parse_with_extents(listing)
+        dummy, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del data_sets
+
+    print(
+        "\nLISTVTOC {0} data sets: {1:.0f} records/s, {2:.0f} records/s including extents, "
+        "peak memory {3:.1f} MiB".format(
+            data_set_count,
+            data_set_count / parse_time,
+            data_set_count / full_time,
+            peak / 1024.0 / 1024.0,
+        )
+    )
+    assert full_time / data_set_count < MAX_SECONDS_PER_RECORD
+    assert peak / data_set_count < MAX_PEAK_BYTES_PER_RECORD
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) IBM Corporation 2020
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+IMPORT_NAME = "ibm_zos_core.plugins.modules.zos_job_query"
+
+
+@pytest.mark.parametrize(
+    "status,return_code,expected",
+    [
+        ("CC", "0000", {"msg": "CC 0000", "code": "0000"}),
+        ("ABEND", "S0C4", {"msg": "ABEND S0C4", "code": "S0C4"}),
+        ("ABENDU", "0100", {"msg": "ABENDU", "code": "0100"}),
+        ("ABENDU0100", "?", {"msg": "ABENDU0100", "code": "U0100"}),
+        ("ABEND S0C4", "0000", {"msg": "ABEND S0C4", "code": "S0C4"}),
+        ("ABEND", "?", {"msg": "ABEND ?", "code": "?"}),
+        ("JCLERR", "?", {"msg": "JCLERR", "code": "null"}),
+        ("AC", "?", "null"),
+        ("SEC", "?", {"msg": "SEC", "code": "?"}),
+    ],
+)
+def test_parsing_jobs_return_code(zos_import_mocker, status, return_code, expected):
+    mocker, importer = zos_import_mocker
+    zos_job_query = importer(IMPORT_NAME)
+    jobs = zos_job_query.parsing_jobs(
+        [
+            dict(
+                name="HELLO",
+                owner="OMVSADM",
+                id="JOB00134",
+                status=status,
+                **{"return": return_code}
+            )
+        ]
+    )
+    assert jobs[0].get("ret_code") == expected
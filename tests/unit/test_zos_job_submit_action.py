@@ -0,0 +1,24 @@
+# -*- coding: utf-8 -*-
+
+# Copyright (c) IBM Corporation 2020
+# Apache License, Version 2.0 (see https://opensource.org/licenses/Apache-2.0)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import os
+import subprocess
+import sys
+
+IMPORT_ACTION_PLUGIN = """
+import sys
+from ibm_zos_core.plugins.action.zos_job_submit import ActionModule
+assert "zoautil_py" not in sys.modules
+"""
+
+
+def test_action_plugin_imports_on_controller():
+    # A fresh interpreter, so no z/OS module can be left over from other tests.
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(p for p in sys.path if p))
+    subprocess.check_call([sys.executable, "-c", IMPORT_ACTION_PLUGIN], env=env)